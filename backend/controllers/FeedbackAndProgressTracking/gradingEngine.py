@@ -0,0 +1,186 @@
+from typing import List, Optional, Dict, Any, Tuple
+import asyncio
+import time
+
+import numpy as np
+
+from db.config import settings
+from db.database import db
+
+
+class AnswerKey:
+    """
+    Pre-normalized answer key of one assignment.
+    answers[i] is the lowercased/stripped correct answer of question i, points[i] its score value.
+    """
+    __slots__ = ("answers", "points", "max_score", "version")
+
+    def __init__(self, answers: List[str], points: List[float], version: int = 0):
+        self.answers = answers
+        self.points = points
+        self.max_score = float(sum(points))
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+
+class GradingEngine:
+
+    @staticmethod
+    def normalize_answer(value: Any) -> str:
+        """Normalize strings (strip whitespace, lowercase) for comparison"""
+        return str(value).strip().lower()
+
+    @staticmethod
+    def parse_answers(raw: Any) -> List[Dict[str, Any]]:
+        """
+        The pool's JSONB codec already decodes the answers column; anything
+        that is not a list (NULL, a scalar) is treated as an empty key.
+        """
+        return raw if isinstance(raw, list) else []
+
+    @staticmethod
+    def normalize_key(correct_answers_data: List[Dict[str, Any]], version: int = 0) -> AnswerKey:
+        """Build an AnswerKey from the answers list stored on the assignment"""
+        answers = []
+        points = []
+        for ans_item in correct_answers_data or []:
+            points.append(float(ans_item.get("score_value", 0.0)))
+            answers.append(GradingEngine.normalize_answer(ans_item.get("correct_answer", "")))
+        return AnswerKey(answers, points, version)
+
+    @staticmethod
+    def grade(chosen_options: Optional[List[str]], key: AnswerKey) -> Tuple[float, float]:
+        """
+        Grade one submission against a normalized key.
+        Returns (earned_score, max_possible_score).
+        """
+        if not key.answers:
+            return 0.0, 0.0
+
+        earned_score = 0.0
+        if chosen_options:
+            normalize = GradingEngine.normalize_answer
+            # zip stops at the shorter list: unanswered questions earn nothing
+            for user_ans, correct_text, points in zip(chosen_options, key.answers, key.points):
+                if normalize(user_ans) == correct_text:
+                    earned_score += points
+        return earned_score, key.max_score
+
+    @staticmethod
+    def grade_batch(choices_list: List[Optional[List[str]]], key: AnswerKey) -> List[Tuple[float, float]]:
+        """Grade many submissions against one pre-normalized key"""
+        grade = GradingEngine.grade
+        return [grade(choices, key) for choices in choices_list]
+
+    @staticmethod
+    def grade_matrix(choices_list: List[Optional[List[str]]], key: AnswerKey) -> np.ndarray:
+        """
+        Vectorized grading for bulk re-grades.
+        Each distinct raw choice is normalized once and encoded as the integer id
+        of the correct answer it equals (-1 if none); the (n, questions) code matrix
+        is then compared with the key in one numpy op and scored with one
+        matrix-vector product. Returns earned scores in input order.
+        """
+        n = len(choices_list)
+        width = len(key.answers)
+        if n == 0 or width == 0:
+            return np.zeros(n, dtype=np.float64)
+
+        codes: Dict[str, int] = {}
+        for text in key.answers:
+            codes.setdefault(text, len(codes))
+        correct_codes = np.fromiter((codes[text] for text in key.answers), dtype=np.intp, count=width)
+
+        lengths = np.fromiter((len(choices) if choices else 0 for choices in choices_list), dtype=np.intp, count=n)
+        np.minimum(lengths, width, out=lengths)
+        flat: List[str] = []
+        for choices in choices_list:
+            if choices:
+                flat.extend(choices[:width])
+
+        normalize = GradingEngine.normalize_answer
+        lookup = {raw: codes.get(normalize(raw), -1) for raw in set(flat)}
+        flat_codes = np.fromiter(map(lookup.__getitem__, flat), dtype=np.intp, count=len(flat))
+
+        # Unanswered cells keep -2, which never matches a correct code
+        matrix = np.full((n, width), -2, dtype=np.intp)
+        matrix[np.arange(width) < lengths[:, None]] = flat_codes
+        return (matrix == correct_codes).astype(np.float64) @ np.asarray(key.points, dtype=np.float64)
+
+
+class AnswerKeyCache:
+    """
+    In-process cache of normalized answer keys, keyed by (class_id, session_id).
+
+    Every invalidation bumps the key's version, so a load that started before an
+    assignment was edited is returned to its caller but never stored. Concurrent
+    misses for the same assignment share one database fetch. Entries also expire
+    after ANSWER_KEY_CACHE_TTL seconds, which bounds staleness across workers.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[int, int], Tuple[AnswerKey, float]] = {}
+        self._versions: Dict[Tuple[int, int], int] = {}
+        self._loading: Dict[Tuple[int, int], asyncio.Future] = {}
+
+    async def get(self, class_id: int, session_id: int) -> Optional[AnswerKey]:
+        """Return the normalized key, or None if the assignment does not exist"""
+        cache_key = (class_id, session_id)
+        entry = self._entries.get(cache_key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        loading = self._loading.get(cache_key)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[cache_key] = future
+        try:
+            answer_key = await self._load(cache_key)
+            future.set_result(answer_key)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(cache_key, None)
+        return answer_key
+
+    async def _load(self, cache_key: Tuple[int, int]) -> Optional[AnswerKey]:
+        version = self._versions.get(cache_key, 0)
+        query = """
+            SELECT answers
+            FROM public.assignments
+            WHERE class_id = $1 AND session_id = $2;
+        """
+        row = await db.execute_single(query, *cache_key)
+        if not row:
+            return None
+
+        answer_key = GradingEngine.normalize_key(GradingEngine.parse_answers(row.get("answers")), version)
+        if self._versions.get(cache_key, 0) == version:
+            if len(self._entries) >= self.max_entries:
+                # Evict the oldest insertion
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[cache_key] = (answer_key, time.monotonic() + self.ttl_seconds)
+        return answer_key
+
+    def invalidate(self, class_id: int, session_id: int) -> None:
+        """Drop the cached key after the assignment was created, edited or deleted"""
+        cache_key = (class_id, session_id)
+        self._versions[cache_key] = self._versions.get(cache_key, 0) + 1
+        self._entries.pop(cache_key, None)
+
+    def clear(self) -> None:
+        for cache_key in list(self._entries):
+            self.invalidate(*cache_key)
+
+
+# Global instance
+answer_key_cache = AnswerKeyCache(ttl_seconds=settings.ANSWER_KEY_CACHE_TTL)
@@ -1,10 +1,11 @@
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from datetime import datetime
-import json
 
 from db.database import db
 from models.FeedbackAndProgressTracking.submissionModel import SubmissionCreate
+from controllers.FeedbackAndProgressTracking.gradingEngine import GradingEngine, answer_key_cache
+from controllers.FeedbackAndProgressTracking.assignmentController import AssignmentController
 
 class SubmissionController:
 
@@ -23,29 +24,19 @@ class SubmissionController:
         Returns:
             Tuple containing (earned_score, max_possible_score)
         """
-        if not correct_answers_data:
-            return 0.0, 0.0
-            
-        earned_score = 0.0
-        max_possible_score = 0.0
-        
-        # Loop through the official answer key
-        for i, ans_item in enumerate(correct_answers_data):
-            # 1. Accumulate Max Score (Add points regardless of user answer)
-            points = float(ans_item.get("score_value", 0.0))
-            max_possible_score += points
+        key = GradingEngine.normalize_key(correct_answers_data)
+        return GradingEngine.grade(chosen_options, key)
 
-            # 2. Calculate Earned Score
-            # Ensure user provided an answer at this index to avoid index errors
-            if chosen_options and i < len(chosen_options):
-                # Normalize strings (strip whitespace, lowercase) for comparison
-                user_ans = str(chosen_options[i]).strip().lower()
-                correct_text = str(ans_item.get("correct_answer", "")).strip().lower()
-                
-                if user_ans == correct_text:
-                    earned_score += points
-        
-        return earned_score, max_possible_score
+    @staticmethod
+    async def grade_submissions(class_id: int, session_id: int, choices_list: List[Optional[List[str]]]) -> List[Tuple[float, float]]:
+        """
+        Batch grading path: grades many submissions of one assignment against
+        its cached, pre-normalized answer key.
+        """
+        key = await answer_key_cache.get(class_id, session_id)
+        if key is None:
+            raise ValueError("Assignment not found for this class and session.")
+        return GradingEngine.grade_batch(choices_list, key)
 
     # =================================================================
     # 1. CREATE SUBMISSION
@@ -53,43 +44,18 @@ class SubmissionController:
     @staticmethod
     async def create_submission(mentee_id: UUID, data: SubmissionCreate) -> Optional[Dict[str, Any]]:
         """
-        Fetches assignment answers, grades the submission, and saves it.
+        Grades the submission against the assignment's answer key and saves it.
         """
-        # A. Fetch assignment answers to grade against
-        query_assign = """
-            SELECT answers 
-            FROM public.assignments 
-            WHERE class_id = $1 AND session_id = $2;
-        """
-        assignment = await db.execute_single(query_assign, data.class_id, data.session_id)
+        # A. Normalized answer key (cached per assignment, invalidated on edit)
+        key = await answer_key_cache.get(data.class_id, data.session_id)
         
-        if not assignment:
+        if key is None:
             raise ValueError("Assignment not found for this class and session.")
 
-        # B. Parse JSON answers from DB
-        # Asyncpg might return JSONB as a String or a List depending on configuration
-        db_answers_raw = assignment.get('answers')
-        db_answers_list = []
-
-        if db_answers_raw:
-            if isinstance(db_answers_raw, str):
-                try:
-                    db_answers_list = json.loads(db_answers_raw)
-                except json.JSONDecodeError:
-                    db_answers_list = [] # Handle corrupt JSON gracefully
-            elif isinstance(db_answers_raw, list):
-                db_answers_list = db_answers_raw
+        # B. Calculate Scores (homework has an empty key and scores 0/0)
+        score, max_score = GradingEngine.grade(data.choices, key)
         
-        # C. Calculate Scores
-        score = 0.0
-        max_score = 0.0
-
-        # Only calculate if there are answers (i.e., it's a Quiz, not Homework)
-        if db_answers_list:
-            current_choices = data.choices if data.choices else []
-            score, max_score = SubmissionController.calculate_grading(current_choices, db_answers_list)
-        
-        # D. Insert into Database
+        # C. Insert into Database
         # We insert score, max_score and the raw choices
         query_insert = """
             INSERT INTO public.submission (class_id, session_id, mentee_id, choices, score, max_score, created_at)
@@ -139,4 +105,57 @@ class SubmissionController:
                 WHERE class_id = $1 AND session_id = $2
                 ORDER BY created_at DESC;
             """
-            return await db.execute_query(query, class_id, session_id)
\ No newline at end of file
+            return await db.execute_query(query, class_id, session_id)
+
+    # =================================================================
+    # 4. RE-GRADE SUBMISSIONS (after the answer key changed)
+    # =================================================================
+    @staticmethod
+    async def regrade_submissions(class_id: int, session_id: int, chunk_size: int = 2000) -> Dict[str, Any]:
+        """
+        Re-grades every submission of a session against the current answer key.
+        Submissions are streamed through a server-side cursor (db.stream_chunks) and
+        graded in vectorized chunks; all changed scores are written back with one bulk UPDATE.
+        """
+        key = await AssignmentController.get_answer_key(class_id, session_id, fresh=True)
+        if key is None:
+            raise ValueError("Assignment not found for this class and session.")
+
+        ids: List[int] = []
+        scores: List[float] = []
+        total = 0
+
+        query = """
+            SELECT id, choices, score, max_score
+            FROM public.submission
+            WHERE class_id = $1 AND session_id = $2;
+        """
+        async for chunk in db.stream_chunks(query, class_id, session_id, chunk_size=chunk_size):
+            total += SubmissionController._collect_changed_scores(chunk, key, ids, scores)
+
+        if ids:
+            update_query = """
+                UPDATE public.submission AS s
+                SET score = v.score, max_score = $3
+                FROM unnest($1::bigint[], $2::float8[]) AS v(id, score)
+                WHERE s.id = v.id;
+            """
+            await db.execute_command(update_query, ids, scores, key.max_score)
+
+        return {
+            "class_id": class_id,
+            "session_id": session_id,
+            "submissions_regraded": total,
+            "scores_changed": len(ids),
+            "max_score": key.max_score
+        }
+
+    @staticmethod
+    def _collect_changed_scores(rows: List[Any], key: Any, ids: List[int], scores: List[float]) -> int:
+        """Grade one chunk and append (id, score) pairs whose stored values differ"""
+        new_scores = GradingEngine.grade_matrix([row["choices"] for row in rows], key)
+        for row, new_score in zip(rows, new_scores.tolist()):
+            if row["score"] != new_score or row["max_score"] != key.max_score:
+                ids.append(row["id"])
+                scores.append(new_score)
+        return len(rows)
@@ -0,0 +1,265 @@
+from typing import List, Optional, Dict, Any, Tuple
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID, uuid4
+import asyncio
+import time
+
+from db.config import settings
+from db.database import db
+from models.FeedbackAndProgressTracking.submissionModel import SubmissionCreate
+from controllers.FeedbackAndProgressTracking.gradingEngine import GradingEngine, answer_key_cache
+
+# Queued by drain(): the flusher finishes the batch it holds, then exits
+_STOP = object()
+
+
+class SubmissionIngestQueue:
+    """
+    Deadline-burst ingestion for quiz submissions.
+
+    Requests are validated, stamped with their acceptance time and put on a
+    bounded in-memory queue; the caller gets a ticket right away. A single
+    background flusher drains the queue in batches, grades each batch per
+    assignment with the vectorized grader and writes it with one COPY, so a
+    burst costs one pooled connection instead of one per request.
+
+    Tickets live in this worker process only and expire after
+    SUBMISSION_TICKET_TTL seconds; graded rows are also visible through the
+    normal submission history endpoints.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float, ticket_ttl: int):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ticket_ttl = ticket_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._tickets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    # =================================================================
+    # PUBLIC API
+    # =================================================================
+    async def enqueue(self, mentee_id: UUID, data: SubmissionCreate) -> Dict[str, Any]:
+        """
+        Validate and queue a submission.
+        Raises ValueError if the assignment does not exist and asyncio.QueueFull
+        when the queue is at capacity.
+        """
+        if await answer_key_cache.get(data.class_id, data.session_id) is None:
+            raise ValueError("Assignment not found for this class and session.")
+
+        self._ensure_worker()
+        ticket_id = uuid4().hex
+        item = {
+            "ticket_id": ticket_id,
+            "class_id": data.class_id,
+            "session_id": data.session_id,
+            "mentee_id": mentee_id,
+            "choices": data.choices,
+            "created_at": datetime.now()
+        }
+        self._queue.put_nowait(item)
+
+        ticket = {
+            "ticket_id": ticket_id,
+            "mentee_id": mentee_id,
+            "status": "queued",
+            "submission": None,
+            "error": None,
+            "expires_at": time.monotonic() + self.ticket_ttl
+        }
+        self._tickets[ticket_id] = ticket
+        self._expire_tickets()
+        return ticket
+
+    def get_ticket(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        self._expire_tickets()
+        return self._tickets.get(ticket_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            "tickets": len(self._tickets),
+            "worker_running": self._worker is not None and not self._worker.done()
+        }
+
+    async def drain(self) -> None:
+        """
+        Flush everything still queued (used on shutdown).
+        The flusher is stopped with a sentinel rather than cancelled, so a batch it
+        has already taken off the queue is written and its tickets resolved.
+        """
+        self._closing = True
+        if self._worker is not None and not self._worker.done():
+            await self._queue.put(_STOP)
+            try:
+                await self._worker
+            except Exception as e:
+                print(f"❌ Submission flusher stopped with an error: {e}")
+        self._worker = None
+        if self._queue is None:
+            return
+        batch = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+        if batch:
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                print(f"❌ Submission flush failed: {e}")
+                self._fail(batch, str(e))
+
+    # =================================================================
+    # FLUSHER
+    # =================================================================
+    def _ensure_worker(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        # While draining, late items are left for drain()'s final sweep
+        if not self._closing and (self._worker is None or self._worker.done()):
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                print(f"❌ Submission flush failed: {e}")
+                self._fail(batch, str(e))
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        # A. Grade in bulk, one pass per assignment
+        groups: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+        for item in batch:
+            groups.setdefault((item["class_id"], item["session_id"]), []).append(item)
+
+        rows = []
+        for (class_id, session_id), items in groups.items():
+            key = await answer_key_cache.get(class_id, session_id)
+            if key is None:
+                self._fail(items, "Assignment not found for this class and session.")
+                continue
+            scores = GradingEngine.grade_matrix([item["choices"] for item in items], key)
+            for item, score in zip(items, scores.tolist()):
+                item["score"] = score
+                item["max_score"] = key.max_score
+                rows.append(item)
+
+        if not rows:
+            return
+
+        # B. Insert with COPY; ids are reserved up front so tickets can be resolved
+        columns = ["id", "class_id", "session_id", "mentee_id", "choices", "score", "max_score", "created_at"]
+        try:
+            async with db.unit_of_work() as uow:
+                id_rows = await uow.fetch_records(
+                    "SELECT nextval(pg_get_serial_sequence('public.submission', 'id')) AS id FROM generate_series(1, $1);",
+                    len(rows)
+                )
+                for item, id_row in zip(rows, id_rows):
+                    item["id"] = id_row["id"]
+                await uow.copy_records_to_table(
+                    "submission",
+                    schema_name="public",
+                    columns=columns,
+                    records=[tuple(item[column] for column in columns) for item in rows]
+                )
+        except Exception as e:
+            # One bad row (e.g. a deleted session) must not fail the whole burst
+            print(f"⚠️ Batched submission insert failed, retrying row by row: {e}")
+            await self._insert_individually(rows)
+            return
+
+        for item in rows:
+            self._resolve(item)
+
+    async def _insert_individually(self, rows: List[Dict[str, Any]]) -> None:
+        query_insert = """
+            INSERT INTO public.submission (class_id, session_id, mentee_id, choices, score, max_score, created_at)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            RETURNING id;
+        """
+        for item in rows:
+            try:
+                inserted = await db.execute_single(
+                    query_insert,
+                    item["class_id"],
+                    item["session_id"],
+                    item["mentee_id"],
+                    item["choices"],
+                    item["score"],
+                    item["max_score"],
+                    item["created_at"]
+                )
+                item["id"] = inserted["id"]
+                self._resolve(item)
+            except Exception as e:
+                self._fail([item], str(e))
+
+    # =================================================================
+    # TICKETS
+    # =================================================================
+    def _resolve(self, item: Dict[str, Any]) -> None:
+        ticket = self._tickets.get(item["ticket_id"])
+        if ticket is None:
+            return
+        ticket["status"] = "graded"
+        ticket["submission"] = {
+            "id": item["id"],
+            "class_id": item["class_id"],
+            "session_id": item["session_id"],
+            "mentee_id": item["mentee_id"],
+            "choices": item["choices"],
+            "score": item["score"],
+            "max_score": item["max_score"],
+            "created_at": item["created_at"]
+        }
+
+    def _fail(self, items: List[Dict[str, Any]], error: str) -> None:
+        for item in items:
+            ticket = self._tickets.get(item["ticket_id"])
+            if ticket is not None and ticket["status"] == "queued":
+                ticket["status"] = "failed"
+                ticket["error"] = error
+
+    def _expire_tickets(self) -> None:
+        now = time.monotonic()
+        while self._tickets:
+            ticket_id, ticket = next(iter(self._tickets.items()))
+            if ticket["expires_at"] > now:
+                break
+            self._tickets.popitem(last=False)
+
+
+# Global instance
+submission_queue = SubmissionIngestQueue(
+    max_size=settings.SUBMISSION_QUEUE_MAX_SIZE,
+    batch_size=settings.SUBMISSION_QUEUE_BATCH_SIZE,
+    flush_interval=settings.SUBMISSION_QUEUE_FLUSH_MS / 1000,
+    ticket_ttl=settings.SUBMISSION_TICKET_TTL
+)
@@ -36,3 +36,24 @@ class AttendanceController:
                 "success": False,
                 "error": str(e)
             }
+
+    @staticmethod
+    async def sync_attendance(tutor_id: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Controller to apply a queued batch of offline attendance marks.
+        """
+        try:
+            results = await AttendanceModel.apply_sync_batch(tutor_id, records)
+            statuses = [result["status"] for result in results]
+            return {
+                "success": True,
+                "results": results,
+                "applied": statuses.count("applied"),
+                "duplicates": statuses.count("duplicate"),
+                "rejected": statuses.count("rejected")
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
@@ -0,0 +1,152 @@
+from typing import Dict, Any, Optional, AsyncIterator, AsyncGenerator
+from contextlib import aclosing
+from datetime import datetime, date, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from db.config import settings
+from middleware.conditional import etag_matches, make_etag
+from models.sessionModel import SessionModel
+
+# Bump when the generated .ics layout changes so cached feeds are refetched
+ICS_FORMAT_VERSION = 1
+LOCAL_TZ = ZoneInfo(settings.CALENDAR_TIMEZONE)
+
+
+class CalendarController:
+    @staticmethod
+    def period_start(session_date: date, period: int) -> datetime:
+        """Period p starts at (p + 5):00 local time (period 2 = 07:00)"""
+        return datetime.combine(session_date, time(hour=period + 5), tzinfo=LOCAL_TZ)
+
+    @staticmethod
+    def period_end(session_date: date, period: int) -> datetime:
+        """Each period lasts 50 minutes"""
+        return CalendarController.period_start(session_date, period) + timedelta(minutes=50)
+
+    @staticmethod
+    def _escape(value: Any) -> str:
+        return (
+            str(value or "")
+            .replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\n", "\\n")
+        )
+
+    @staticmethod
+    def _fold(line: str) -> str:
+        """RFC 5545 line folding: at most 75 octets per line, continuation starts with a space"""
+        encoded = line.encode("utf-8")
+        if len(encoded) <= 75:
+            return line + "\r\n"
+        parts = []
+        current = ""
+        limit = 75
+        for char in line:
+            if len((current + char).encode("utf-8")) > limit:
+                parts.append(current)
+                current = char
+                limit = 74  # continuation lines lose one octet to the leading space
+            else:
+                current += char
+        parts.append(current)
+        return "\r\n ".join(parts) + "\r\n"
+
+    @staticmethod
+    def _utc(value: datetime) -> str:
+        return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    @staticmethod
+    def render_event(session: Dict[str, Any], role: str) -> str:
+        fold = CalendarController._fold
+        escape = CalendarController._escape
+        start = CalendarController.period_start(session["session_date"], session["start_time"])
+        # A session without an end period lasts one period
+        last_period = session.get("end_time")
+        if last_period is None:
+            last_period = session["start_time"]
+        end = CalendarController.period_end(session["session_date"], last_period)
+        stamp = session.get("updated_at") or session.get("created_at") or datetime.now(timezone.utc)
+
+        description = f"Semester {session.get('semester')}"
+        if role == "mentee" and session.get("tutor_name"):
+            description += f"\nTutor: {session['tutor_name']}"
+
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{session['class_id']}-{session['session_id']}@tutor-support-system",
+            f"DTSTAMP:{CalendarController._utc(stamp)}",
+            f"DTSTART:{CalendarController._utc(start)}",
+            f"DTEND:{CalendarController._utc(end)}",
+            f"SUMMARY:{escape(session.get('subject_code'))} - {escape(session.get('subject_name'))}",
+            f"LOCATION:{escape(session.get('location'))}",
+            f"DESCRIPTION:{escape(description)}",
+            f"STATUS:{'CANCELLED' if session.get('session_status') == 'cancelled' else 'CONFIRMED'}",
+            "END:VEVENT",
+        ]
+        return "".join(fold(line) for line in lines)
+
+    @staticmethod
+    async def stream_ics(sessions: AsyncGenerator[Any, None], role: str) -> AsyncIterator[bytes]:
+        """
+        Yield the calendar piece by piece while rows arrive from the database cursor,
+        so neither the rows nor the .ics text are ever held in memory as a whole
+        """
+        yield (
+            "BEGIN:VCALENDAR\r\n"
+            "VERSION:2.0\r\n"
+            "PRODID:-//Tutor Support System//Schedule//EN\r\n"
+            "CALSCALE:GREGORIAN\r\n"
+            "METHOD:PUBLISH\r\n"
+            "X-WR-CALNAME:Tutor Support System\r\n"
+        ).encode("utf-8")
+        # Closing the generator releases the cursor's connection if the client disconnects
+        async with aclosing(sessions):
+            batch = []
+            async for session in sessions:
+                if session.get("session_date") is None or session.get("start_time") is None:
+                    continue
+                batch.append(CalendarController.render_event(session, role))
+                if len(batch) >= 100:
+                    yield "".join(batch).encode("utf-8")
+                    batch = []
+            if batch:
+                yield "".join(batch).encode("utf-8")
+        yield b"END:VCALENDAR\r\n"
+
+    @staticmethod
+    async def get_feed(user_id: str, role: str, if_none_match: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the .ics feed of a mentee or tutor.
+        The ETag comes from a cheap stamp (count + md5 of the rows' ids and write
+        times), so an unchanged calendar is answered with not_modified before the
+        session join runs. No Last-Modified: a reschedule can lower MAX(updated_at).
+        """
+        try:
+            stamp = await SessionModel.get_schedule_stamp(user_id, role)
+            etag = make_etag(ICS_FORMAT_VERSION, role, user_id, stamp["count"], stamp["version"])
+            headers = {
+                "ETag": etag,
+                "Cache-Control": "private, no-cache"
+            }
+
+            if etag_matches(if_none_match, etag):
+                return {"success": True, "not_modified": True, "headers": headers}
+
+            # Rows are only pulled once the response starts streaming
+            if role == "tutor":
+                sessions = SessionModel.stream_sessions_by_tutor(user_id)
+            else:
+                sessions = SessionModel.stream_sessions_by_mentee(user_id)
+
+            return {
+                "success": True,
+                "not_modified": False,
+                "headers": headers,
+                "body": CalendarController.stream_ics(sessions, role)
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to build calendar feed: {str(e)}"
+            }
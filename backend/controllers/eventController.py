@@ -0,0 +1,72 @@
+from typing import Dict, Any, List, Optional, AsyncIterator
+import asyncio
+import json
+
+from fastapi import Request
+
+from db.config import settings
+from db.events import event_broker, Subscription
+from models.classModel import ClassModel
+from models.registrationModel import RegistrationModel
+
+# Clients reconnect after this many milliseconds when the stream drops
+RETRY_MS = 3000
+MAX_CLASS_IDS = 200
+
+
+class EventController:
+    @staticmethod
+    async def subscribe(user_id: str, role: str, class_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Register an SSE subscriber.
+        Without class_id filters, mentees follow their registered classes (and keep
+        following as they register/cancel) and tutors follow the classes they teach.
+        """
+        try:
+            follow_registrations = False
+            if class_ids:
+                if len(class_ids) > MAX_CLASS_IDS:
+                    return {
+                        "success": False,
+                        "error": f"At most {MAX_CLASS_IDS} class_id values are allowed"
+                    }
+            elif role == "mentee":
+                class_ids = await RegistrationModel.get_class_ids_by_mentee(user_id)
+                follow_registrations = True
+            elif role == "tutor":
+                class_ids = await ClassModel.get_class_ids_by_tutor(user_id)
+            else:
+                class_ids = []
+
+            subscription = event_broker.subscribe(user_id, class_ids, follow_registrations)
+            return {
+                "success": True,
+                "subscription": subscription
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to open event stream: {str(e)}"
+            }
+
+    @staticmethod
+    async def stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+        """
+        Format queued events as text/event-stream.
+        A comment line is sent every SSE_HEARTBEAT_SECONDS so proxies keep the
+        connection open; the subscription is dropped when the client goes away.
+        """
+        try:
+            yield f"retry: {RETRY_MS}\n"
+            yield f"event: ready\ndata: {json.dumps({'class_ids': sorted(subscription.class_ids)})}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
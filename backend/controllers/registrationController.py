@@ -1,5 +1,9 @@
 from models.registrationModel import RegistrationModel
-from typing import Dict, Any
+from models.lotteryModel import LotteryModel
+from typing import Dict, Any, List, Tuple, AsyncIterator
+from uuid import UUID
+import csv
+import json
 
 class RegistrationController:
     @staticmethod
@@ -12,6 +16,16 @@ class RegistrationController:
             }
         """
         try:
+            # Lottery mode: only record the entry, seats are assigned at the draw
+            lottery = await LotteryModel.get_lottery_for_class(class_id)
+            if lottery:
+                if lottery["closed"]:
+                    return {
+                        "success": False,
+                        "error": "Registration lottery has closed, results are pending"
+                    }
+                return await LotteryModel.record_entry(lottery["id"], class_id, mentee_id)
+
             # Check for time conflicts first
             conflict_check = await RegistrationModel.check_time_conflict(mentee_id, class_id)
             
@@ -126,4 +140,212 @@ class RegistrationController:
             return {
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+    @staticmethod
+    async def join_waitlist(class_id: int, mentee_id: str) -> Dict[str, Any]:
+        """
+        Join the waitlist of a full class; the head is promoted automatically when a seat frees up
+        """
+        try:
+            return await RegistrationModel.join_waitlist(class_id, mentee_id)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    @staticmethod
+    async def leave_waitlist(class_id: int, mentee_id: str) -> Dict[str, Any]:
+        try:
+            return await RegistrationModel.leave_waitlist(class_id, mentee_id)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    @staticmethod
+    async def get_waitlist_position(class_id: int, mentee_id: str) -> Dict[str, Any]:
+        try:
+            position = await RegistrationModel.get_waitlist_position(class_id, mentee_id)
+            if not position:
+                return {
+                    "success": False,
+                    "error": "Not on the waitlist for this class"
+                }
+            return {
+                "success": True,
+                "data": position
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    @staticmethod
+    async def create_lottery(created_by: str, lottery_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Open a lottery window for a class or a whole semester
+        """
+        try:
+            if not lottery_data.get("class_id") and not lottery_data.get("semester"):
+                return {
+                    "success": False,
+                    "error": "Either class_id or semester is required"
+                }
+            lottery = await LotteryModel.create_lottery(
+                created_by,
+                lottery_data["closes_at"],
+                class_id=lottery_data.get("class_id"),
+                semester=lottery_data.get("semester"),
+                opens_at=lottery_data.get("opens_at")
+            )
+            return {
+                "success": True,
+                "lottery": lottery,
+                "message": "Lottery created successfully"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    @staticmethod
+    async def draw_lottery(lottery_id: int) -> Dict[str, Any]:
+        try:
+            return await LotteryModel.draw_lottery(lottery_id)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    @staticmethod
+    async def get_lottery_entries(lottery_id: int, mentee_id: str) -> Dict[str, Any]:
+        try:
+            entries = await LotteryModel.get_entries_by_mentee(lottery_id, mentee_id)
+            return {
+                "success": True,
+                "entries": entries,
+                "count": len(entries)
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    @staticmethod
+    async def parse_bulk_rows(
+        chunks: AsyncIterator[bytes],
+        content_type: str
+    ) -> Tuple[List[tuple], List[Dict[str, Any]]]:
+        """
+        Read (mentee_id, class_id) pairs from a CSV, NDJSON or JSON array body.
+        CSV and NDJSON are parsed line by line as the body streams in.
+        Returns (valid rows as (row_no, UUID, int), report entries for unparsable rows).
+        """
+        rows: List[tuple] = []
+        invalid: List[Dict[str, Any]] = []
+
+        def add(row_no: int, mentee_id: Any, class_id: Any) -> None:
+            try:
+                rows.append((row_no, UUID(str(mentee_id).strip()), int(str(class_id).strip())))
+            except (TypeError, ValueError):
+                invalid.append({
+                    "row": row_no,
+                    "mentee_id": mentee_id,
+                    "class_id": class_id,
+                    "status": "rejected",
+                    "reason": "Invalid mentee_id or class_id"
+                })
+
+        async def lines() -> AsyncIterator[str]:
+            buffer = b""
+            async for chunk in chunks:
+                buffer += chunk
+                *complete, buffer = buffer.split(b"\n")
+                for line in complete:
+                    yield line.decode("utf-8-sig").rstrip("\r")
+            if buffer:
+                yield buffer.decode("utf-8-sig").rstrip("\r")
+
+        if "ndjson" in content_type:
+            row_no = 0
+            async for line in lines():
+                if not line.strip():
+                    continue
+                row_no += 1
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    item = {}
+                item = item if isinstance(item, dict) else {}
+                add(row_no, item.get("mentee_id"), item.get("class_id"))
+
+        elif "json" in content_type:
+            body = b"".join([chunk async for chunk in chunks])
+            data = json.loads(body or b"[]")
+            if isinstance(data, dict):
+                data = data.get("records", [])
+            if not isinstance(data, list):
+                raise ValueError('Invalid JSON body: expected an array of records or {"records": [...]}')
+            for row_no, item in enumerate(data, start=1):
+                item = item if isinstance(item, dict) else {}
+                add(row_no, item.get("mentee_id"), item.get("class_id"))
+
+        else:
+            # CSV: optional header naming mentee_id/class_id, otherwise mentee_id,class_id
+            mentee_col, class_col = 0, 1
+            row_no = 0
+            first = True
+            async for line in lines():
+                if not line.strip():
+                    continue
+                fields = next(csv.reader([line]))
+                if first:
+                    first = False
+                    header = [field.strip().lower() for field in fields]
+                    if "mentee_id" in header and "class_id" in header:
+                        mentee_col, class_col = header.index("mentee_id"), header.index("class_id")
+                        continue
+                row_no += 1
+                add(
+                    row_no,
+                    fields[mentee_col] if len(fields) > mentee_col else None,
+                    fields[class_col] if len(fields) > class_col else None
+                )
+
+        return rows, invalid
+
+    @staticmethod
+    async def bulk_register(chunks: AsyncIterator[bytes], content_type: str) -> Dict[str, Any]:
+        """
+        Department bulk enrollment with a per-row report
+        """
+        try:
+            rows, invalid = await RegistrationController.parse_bulk_rows(chunks, content_type)
+            report = await RegistrationModel.bulk_register(rows) if rows else []
+            report = sorted(report + invalid, key=lambda entry: entry["row"])
+            accepted = sum(1 for entry in report if entry["status"] == "accepted")
+            return {
+                "success": True,
+                "total": len(report),
+                "accepted": accepted,
+                "rejected": len(report) - accepted,
+                "report": report,
+                "message": "Bulk registration processed"
+            }
+        except json.JSONDecodeError as e:
+            return {
+                "success": False,
+                "error": f"Invalid JSON body: {str(e)}"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
@@ -1,4 +1,5 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from datetime import date
 from models.sessionModel import SessionModel
 
 
@@ -6,17 +7,51 @@ class SessionController:
     # ==================== MENTEE ENDPOINTS ====================
     
     @staticmethod
-    async def get_sessions_by_mentee(mentee_id: str) -> Dict[str, Any]:
+    async def _list_sessions(
+        fetch,
+        user_id: str,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        upcoming: Optional[int],
+        limit: Optional[int],
+        cursor: Optional[str]
+    ) -> Dict[str, Any]:
         """
-        Get all sessions for a mentee
+        Shared windowing for mentee/tutor listings.
+        upcoming=N returns the next N sessions from today; limit pages through the
+        window and next_cursor (if any) continues after the last returned row.
         """
         try:
-            sessions = await SessionModel.get_sessions_by_mentee(mentee_id)
-            
+            after = SessionModel.decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return {
+                "success": False,
+                "error": "Invalid cursor",
+                "sessions": []
+            }
+
+        try:
+            page_size = upcoming if upcoming is not None else limit
+            # Fetch one extra row to know whether another page exists
+            sessions = await fetch(
+                user_id,
+                date_from=date_from,
+                date_to=date_to,
+                upcoming=upcoming is not None,
+                after=after,
+                limit=page_size + 1 if page_size is not None else None
+            )
+
+            next_cursor = None
+            if page_size is not None and len(sessions) > page_size:
+                sessions = sessions[:page_size]
+                next_cursor = SessionModel.encode_cursor(sessions[-1])
+
             return {
                 "success": True,
                 "sessions": sessions,
                 "count": len(sessions),
+                "next_cursor": next_cursor,
                 "message": "Sessions retrieved successfully"
             }
         except Exception as e:
@@ -26,6 +61,22 @@ class SessionController:
                 "sessions": []
             }
 
+    @staticmethod
+    async def get_sessions_by_mentee(
+        mentee_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        upcoming: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get sessions for a mentee, optionally windowed / paged
+        """
+        return await SessionController._list_sessions(
+            SessionModel.get_sessions_by_mentee, mentee_id, date_from, date_to, upcoming, limit, cursor
+        )
+
     @staticmethod
     async def get_sessions_by_mentee_and_class(mentee_id: str, class_id: int) -> Dict[str, Any]:
         """
@@ -56,25 +107,20 @@ class SessionController:
     # ==================== TUTOR ENDPOINTS ====================
     
     @staticmethod
-    async def get_sessions_by_tutor(tutor_id: str) -> Dict[str, Any]:
+    async def get_sessions_by_tutor(
+        tutor_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        upcoming: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Get all sessions for a tutor
+        Get sessions for a tutor, optionally windowed / paged
         """
-        try:
-            sessions = await SessionModel.get_sessions_by_tutor(tutor_id)
-            
-            return {
-                "success": True,
-                "sessions": sessions,
-                "count": len(sessions),
-                "message": "Sessions retrieved successfully"
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Failed to get sessions: {str(e)}",
-                "sessions": []
-            }
+        return await SessionController._list_sessions(
+            SessionModel.get_sessions_by_tutor, tutor_id, date_from, date_to, upcoming, limit, cursor
+        )
 
     @staticmethod
     async def get_sessions_by_tutor_and_class(tutor_id: str, class_id: int) -> Dict[str, Any]:
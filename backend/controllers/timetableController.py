@@ -0,0 +1,35 @@
+from typing import Dict, Any
+from models.timetableModel import TimetableModel
+
+
+class TimetableController:
+    @staticmethod
+    async def get_free_slots(user_id: str, semester: str, role: str) -> Dict[str, Any]:
+        """
+        Free periods of a mentee or tutor for one semester, read from the occupancy grid
+        """
+        try:
+            if role not in ("mentee", "tutor"):
+                return {
+                    "success": False,
+                    "error": "Role must be mentee or tutor"
+                }
+
+            occupancy = await TimetableModel.get_occupancy(user_id, semester, role)
+            # No grid yet means nothing booked in that semester
+            days = TimetableModel.decode_free_slots(occupancy["slots"] if occupancy else None)
+
+            return {
+                "success": True,
+                "user_id": user_id,
+                "semester": semester,
+                "role": role,
+                "days": days,
+                "free_count": sum(len(day["free_periods"]) for day in days),
+                "message": "Free slots retrieved successfully"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to fetch free slots: {str(e)}"
+            }
@@ -1,7 +1,7 @@
 from typing import Dict, Any
 from models.userModel import UserModel
 from middleware.auth import create_access_token
-import bcrypt
+from middleware.password import password_hasher, PasswordHasherBusy
 
 
 class UserController:
@@ -36,6 +36,13 @@ class UserController:
                 "user": user,
                 "message": "User created successfully"
             }
+        except PasswordHasherBusy as e:
+            return {
+                "success": False,
+                "busy": True,
+                "error": str(e),
+                "data": None
+            }
         except Exception as e:
             if "unique constraint" in str(e).lower():
                  return {
@@ -73,16 +80,21 @@ class UserController:
                     "data": None
                 }
 
-            if not bcrypt.checkpw(
-                password.encode('utf-8'),
-                user["password"].encode('utf-8')
-            ):
+            if not await password_hasher.verify(password, user["password"]):
                 return {
                     "success": False,
                     "error": "Invalid email or password",
                     "data": None
                 }
 
+            # Cost factor changed since this hash was made: upgrade it while we have the plain password
+            if password_hasher.needs_rehash(user["password"]):
+                try:
+                    new_hash = await password_hasher.hash(password)
+                    await UserModel.update_password_hash(user["id"], new_hash)
+                except Exception as e:
+                    print(f"⚠️ Password rehash skipped for user {user['id']}: {e}")
+
             token_data = {
                 "sub": str(user["id"]),
                 "role": user["role"]
@@ -100,6 +112,13 @@ class UserController:
                 },
                 "message": "Login successful"
             }
+        except PasswordHasherBusy as e:
+            return {
+                "success": False,
+                "busy": True,
+                "error": str(e),
+                "data": None
+            }
         except Exception as e:
             return {
                 "success": False,
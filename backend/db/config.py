@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -8,6 +8,14 @@ class Settings(BaseSettings):
     DB_POOL_MIN_SIZE: int = 5
     DB_POOL_MAX_SIZE: int = 20
     DB_COMMAND_TIMEOUT: int = 60
+    DB_ACQUIRE_TIMEOUT: float = 30.0  # seconds to wait for a free pool connection (0 = forever)
+    DB_STREAM_PREFETCH: int = 500  # rows per round trip when streaming through a cursor
+    DB_PROFILER_ENABLED: bool = False  # per-query stats; can be toggled at runtime by admins
+    DB_SLOW_QUERY_MS: int = 500  # profiled queries slower than this are logged
+    DB_EXPLAIN_SLOW_QUERIES: bool = False  # diagnostics mode: capture EXPLAIN ANALYZE of slow reads
+    DB_EXPLAIN_SAMPLE_RATE: float = 1.0  # share of slow reads whose plan is captured
+    DB_EXPLAIN_TIMEOUT_MS: int = 10000
+    DATABASE_LISTEN_URL: Optional[str] = None  # session-mode URL for LISTEN (defaults to DATABASE_URL)
 
     # Server Configuration
     HOST: str = "127.0.0.1"
@@ -23,6 +31,28 @@ class Settings(BaseSettings):
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:5173"
 
+    # Grading Configuration
+    ANSWER_KEY_CACHE_TTL: int = 300  # seconds a normalized answer key stays cached
+    SUBMISSION_QUEUE_MAX_SIZE: int = 5000
+    SUBMISSION_QUEUE_BATCH_SIZE: int = 200
+    SUBMISSION_QUEUE_FLUSH_MS: int = 200
+    SUBMISSION_TICKET_TTL: int = 900  # seconds a queued submission's ticket can be polled
+
+    # Password Hashing Configuration
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # jobs allowed to wait behind busy workers
+
+    # Calendar Feed Configuration
+    CALENDAR_TIMEZONE: str = "Asia/Ho_Chi_Minh"  # local time of class periods
+
+    # Server-Sent Events Configuration
+    SSE_QUEUE_SIZE: int = 64  # buffered events per client before it is told to resync
+    SSE_HEARTBEAT_SECONDS: int = 15
+
+    # HTTP Caching Configuration
+    ETAG_MAX_BODY_BYTES: int = 1048576  # larger JSON bodies are not buffered for hashing
+
     # Use model_config instead of Config class (Pydantic v2)
     model_config = {
         "env_file": ".env",
@@ -1,11 +1,119 @@
+from contextlib import aclosing, asynccontextmanager
 import asyncpg  # type: ignore
+import orjson
 from db.config import settings
-from typing import List, Dict, Any, Optional
+from db.metrics import PoolMetrics
+from db.profiler import query_profiler
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+import asyncio
+import re
+import time
+
+
+def _json_default(value: Any) -> Any:
+    # Pydantic models (e.g. AnswerItem) can be written to json/jsonb columns as they are
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def encode_json(value: Any) -> str:
+    return orjson.dumps(value, default=_json_default).decode("utf-8")
+
+
+_PLACEHOLDER = re.compile(r"\$(\d+)")
+
+
+def build_batch_query(queries: Tuple[Tuple[Any, ...], ...]) -> Tuple[str, List[Any]]:
+    """
+    Fold independent SELECTs into one statement: each becomes a json_agg subquery
+    column (r0, r1, ...) and its $n placeholders are renumbered after the previous
+    queries' arguments. Queries must not contain a literal "$<digit>" in strings.
+    """
+    parts = []
+    args: List[Any] = []
+    for index, (query, *query_args) in enumerate(queries):
+        offset = len(args)
+        sql = _PLACEHOLDER.sub(lambda m: f"${int(m.group(1)) + offset}", query.strip().rstrip(";"))
+        parts.append(f"(SELECT COALESCE(json_agg(q), '[]'::json) FROM ({sql}) q) AS r{index}")
+        args.extend(query_args)
+    return "SELECT\n" + ",\n".join(parts), args
+
+
+class UnitOfWork:
+    """
+    The DatabasePool query helpers bound to one connection.
+    Obtained from `db.unit_of_work()`; every call runs on the same connection
+    (and inside the same transaction, if one was opened).
+    """
+
+    def __init__(self, connection: asyncpg.Connection):  # type: ignore
+        self.connection = connection
+
+    def transaction(self, **kwargs: Any):
+        """Nested/explicit transaction (savepoint when one is already open)"""
+        return self.connection.transaction(**kwargs)
+
+    async def _run(self, method: Any, query: str, args: Tuple[Any, ...]) -> Any:
+        """Call a connection method, timing it when the query profiler is on"""
+        if not query_profiler.enabled:
+            return await method(query, *args)
+        caller = query_profiler.caller()
+        started = time.perf_counter()
+        try:
+            result = await method(query, *args)
+        except Exception:
+            query_profiler.record(query, args, time.perf_counter() - started, None, caller, failed=True)
+            raise
+        elapsed = time.perf_counter() - started
+        if query_profiler.record(query, args, elapsed, result, caller):
+            query_profiler.start_capture(query, db.capture_plan(query, args, elapsed, caller))
+        return result
+
+    async def execute_query(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        rows = await self._run(self.connection.fetch, query, args)
+        return [dict(row) for row in rows]
+
+    async def fetch_records(self, query: str, *args: Any) -> List[asyncpg.Record]:  # type: ignore
+        return await self._run(self.connection.fetch, query, args)
+
+    async def execute_single(self, query: str, *args: Any) -> Optional[Dict[str, Any]]:
+        row = await self._run(self.connection.fetchrow, query, args)
+        return dict(row) if row else None
+
+    async def fetch_value(self, query: str, *args: Any) -> Any:
+        """First column of the first row (e.g. RETURNING id)"""
+        return await self._run(self.connection.fetchval, query, args)
+
+    async def execute_command(self, query: str, *args: Any) -> str:
+        return await self._run(self.connection.execute, query, args)
+
+    async def batch_read(self, *queries: Tuple[Any, ...]) -> List[List[Dict[str, Any]]]:
+        batch_query, args = build_batch_query(queries)
+        row = await self._run(self.connection.fetchrow, batch_query, tuple(args))
+        return [row[f"r{index}"] for index in range(len(queries))]
+
+    async def copy_records_to_table(
+        self,
+        table_name: str,
+        records: Any,
+        columns: List[str],
+        schema_name: Optional[str] = None
+    ) -> str:
+        """connection.copy_records_to_table(), profiled under the label COPY table (columns) FROM STDIN"""
+        async def copy(query: str) -> str:
+            return await self.connection.copy_records_to_table(
+                table_name, records=records, columns=columns, schema_name=schema_name
+            )
+
+        target = f"{schema_name}.{table_name}" if schema_name else table_name
+        return await self._run(copy, f"COPY {target} ({', '.join(columns)}) FROM STDIN", ())
 
 
 class DatabasePool:
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None  # type: ignore
+        self.metrics = PoolMetrics()
 
     async def initialize(self):
         """Initialize the connection pool"""
@@ -15,42 +123,182 @@ class DatabasePool:
                 min_size=settings.DB_POOL_MIN_SIZE,
                 max_size=settings.DB_POOL_MAX_SIZE,
                 command_timeout=settings.DB_COMMAND_TIMEOUT,
-                statement_cache_size=0  # Disable prepared statements
+                statement_cache_size=0,  # Disable prepared statements
+                init=self._init_connection
             )
         except Exception as e:
             print(f"❌ Failed to initialize database pool: {e}")
             raise
 
+    @staticmethod
+    async def _init_connection(connection: asyncpg.Connection) -> None:  # type: ignore
+        """
+        Runs once per new pool connection.
+        json/jsonb values are decoded to Python objects at the protocol layer and
+        Python objects are encoded on the way in, so callers pass lists/dicts
+        (not json.dumps strings) and never json.loads results.
+        """
+        for type_name in ("json", "jsonb"):
+            await connection.set_type_codec(
+                type_name,
+                encoder=encode_json,
+                decoder=orjson.loads,
+                schema="pg_catalog"
+            )
+
     async def close(self):
         if self.pool:
             await self.pool.close()
             print("Database pool closed")
 
-    async def execute_query(self, query: str, *args: Any) -> List[Dict[str, Any]]:
-        """Execute a SELECT query and return results as list of dicts"""
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:  # type: ignore
+        """
+        pool.acquire() with instrumentation: time spent waiting for a free
+        connection, time the connection is held, waiters and timeouts.
+        """
         if self.pool is None:
             raise RuntimeError("Database pool not initialized")
-        async with self.pool.acquire() as connection:
-            rows = await connection.fetch(query, *args)
-            return [dict(row) for row in rows]
+        metrics = self.metrics
+        metrics.waiting += 1
+        metrics.max_waiting = max(metrics.max_waiting, metrics.waiting)
+        started = time.perf_counter()
+        try:
+            connection = await self.pool.acquire(timeout=settings.DB_ACQUIRE_TIMEOUT or None)
+        except asyncio.TimeoutError:
+            metrics.timeouts += 1
+            raise
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.waiting -= 1
+        acquired_at = time.perf_counter()
+        metrics.acquired += 1
+        metrics.acquire_wait.observe(acquired_at - started)
+        try:
+            yield connection
+        finally:
+            metrics.hold.observe(time.perf_counter() - acquired_at)
+            await self.pool.release(connection)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.metrics.snapshot(self.pool)
+
+    @asynccontextmanager
+    async def unit_of_work(self, transaction: bool = True) -> AsyncIterator["UnitOfWork"]:
+        """
+        One pool connection for a multi-statement operation:
+
+            async with db.unit_of_work() as uow:
+                row = await uow.execute_single("... FOR UPDATE", class_id)
+                await uow.execute_command("UPDATE ...", class_id)
+
+        transaction=True (default) wraps the block in a transaction that commits on
+        exit and rolls back on exception; transaction=False only shares the connection.
+        """
+        async with self.acquire() as connection:
+            if transaction:
+                async with connection.transaction():
+                    yield UnitOfWork(connection)
+            else:
+                yield UnitOfWork(connection)
+
+    async def execute_query(self, query: str, *args: Any) -> List[Dict[str, Any]]:
+        """Execute a SELECT query and return results as list of dicts"""
+        async with self.unit_of_work(transaction=False) as uow:
+            return await uow.execute_query(query, *args)
+
+    async def fetch_records(self, query: str, *args: Any) -> List[asyncpg.Record]:  # type: ignore
+        """
+        Execute a SELECT query and return the asyncpg Records as they are.
+        Records are read-only mappings (row["col"], row.get("col"), keys()/items())
+        but iterate over values, so only use this where rows are read, not edited;
+        it saves building a dict per row on listings that are only serialized.
+        """
+        async with self.unit_of_work(transaction=False) as uow:
+            return await uow.fetch_records(query, *args)
+
+    async def stream(
+        self, query: str, *args: Any, prefetch: Optional[int] = None
+    ) -> AsyncIterator[asyncpg.Record]:  # type: ignore
+        """
+        Iterate a large SELECT through a server-side cursor in constant memory.
+        Rows are fetched `prefetch` at a time (DB_STREAM_PREFETCH by default) inside
+        a read-only transaction, which cursors require and which also works behind
+        the transaction pooler. The connection is held until iteration finishes;
+        if you may stop early, wrap it: `async with aclosing(db.stream(...)) as rows`.
+        """
+        async with self.acquire() as connection:
+            async with connection.transaction(readonly=True):
+                async for row in connection.cursor(
+                    query, *args, prefetch=prefetch or settings.DB_STREAM_PREFETCH
+                ):
+                    yield row
+
+    async def stream_chunks(
+        self, query: str, *args: Any, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[List[asyncpg.Record]]:  # type: ignore
+        """Same as stream(), grouped into lists of chunk_size rows for batch processing"""
+        chunk_size = chunk_size or settings.DB_STREAM_PREFETCH
+        chunk = []
+        async with aclosing(self.stream(query, *args, prefetch=chunk_size)) as rows:
+            async for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
 
     async def execute_single(
         self, query: str, *args: Any
     ) -> Optional[Dict[str, Any]]:
         """Execute a query and return single result as dict"""
-        if self.pool is None:
-            raise RuntimeError("Database pool not initialized")
-        async with self.pool.acquire() as connection:
-            row = await connection.fetchrow(query, *args)
-            return dict(row) if row else None
+        async with self.unit_of_work(transaction=False) as uow:
+            return await uow.execute_single(query, *args)
 
     async def execute_command(self, query: str, *args: Any) -> str:
         """Execute INSERT, UPDATE, DELETE commands"""
-        if self.pool is None:
-            raise RuntimeError("Database pool not initialized")
-        async with self.pool.acquire() as connection:
-            result = await connection.execute(query, *args)
-            return result
+        async with self.unit_of_work(transaction=False) as uow:
+            return await uow.execute_command(query, *args)
+
+    async def batch_read(self, *queries: Tuple[Any, ...]) -> List[List[Dict[str, Any]]]:
+        """
+        Run several independent SELECTs in a single round trip:
+
+            registrations, classes = await db.batch_read(
+                ("SELECT ... LIMIT $1", 20),
+                ("SELECT ... WHERE tutor_id = $1", tutor_id),
+            )
+
+        Returns one list of rows per query, in order. Rows travel as JSON
+        (json_agg), so values are JSON types: timestamps/dates come back as ISO
+        strings, UUIDs as strings, numerics as numbers. Each query keeps its own
+        ORDER BY (json_agg reads the sorted subquery in order).
+        """
+        async with self.unit_of_work(transaction=False) as uow:
+            return await uow.batch_read(*queries)
+
+    async def capture_plan(self, query: str, args: Tuple[Any, ...], observed: float, caller: str) -> None:
+        """
+        Re-run a slow read under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) on its own
+        connection, inside a read-only transaction that is always rolled back and
+        bounded by DB_EXPLAIN_TIMEOUT_MS, then store the plan in the query profiler.
+        """
+        try:
+            async with self.acquire() as connection:
+                transaction = connection.transaction(readonly=True)
+                await transaction.start()
+                try:
+                    await connection.execute(f"SET LOCAL statement_timeout = {int(settings.DB_EXPLAIN_TIMEOUT_MS)}")
+                    plan = await connection.fetchval("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, *args)
+                finally:
+                    await transaction.rollback()
+            query_profiler.store_plan(query, observed, caller, plan=plan)
+        except Exception as e:
+            print(f"⚠️ Failed to capture query plan: {e}")
+            query_profiler.store_plan(query, observed, caller, error=str(e))
 
     async def test_connection(self) -> Dict[str, str]:
         try:
@@ -0,0 +1,174 @@
+import asyncio
+import json
+from typing import Dict, Any, Optional, Set, Iterable
+
+import asyncpg  # type: ignore
+
+from db.config import settings
+
+# Channels written by the triggers in system_schema.sql / promote_waitlist_head()
+CHANNELS = ("schedule_events", "waitlist_promoted")
+
+
+class Subscription:
+    """One SSE client: the classes it follows, its user id and a bounded event queue"""
+    __slots__ = ("user_id", "class_ids", "follow_registrations", "queue")
+
+    def __init__(self, user_id: str, class_ids: Iterable[int], follow_registrations: bool, queue_size: int):
+        self.user_id = user_id
+        self.class_ids: Set[int] = set(class_ids)
+        self.follow_registrations = follow_registrations
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop the backlog and tell it to refetch instead of buffering forever
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+
+class EventBroker:
+    """
+    Fans Postgres NOTIFY events out to in-process subscribers.
+
+    A single dedicated connection (outside the pool) LISTENs on CHANNELS; every
+    notification is routed through two indexes, class_id -> subscriptions and
+    user_id -> subscriptions, so dispatch cost depends on the number of matching
+    clients, not on the number of connected ones. The connection is started on
+    the first subscription and re-established with backoff if it drops.
+
+    LISTEN needs a session-level connection: behind a transaction pooler set
+    DATABASE_LISTEN_URL to a direct/session-mode URL.
+    """
+
+    def __init__(self, dsn: str, queue_size: int, heartbeat: int):
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._by_class: Dict[int, Set[Subscription]] = {}
+        self._by_user: Dict[str, Set[Subscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._conn: Optional[asyncpg.Connection] = None
+        self._delivered = 0
+
+    # =================================================================
+    # SUBSCRIPTIONS
+    # =================================================================
+    def subscribe(self, user_id: str, class_ids: Iterable[int], follow_registrations: bool = False) -> Subscription:
+        self._ensure_listener()
+        subscription = Subscription(user_id, class_ids, follow_registrations, self.queue_size)
+        self._by_user.setdefault(user_id, set()).add(subscription)
+        for class_id in subscription.class_ids:
+            self._by_class.setdefault(class_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._discard(self._by_user, subscription.user_id, subscription)
+        for class_id in subscription.class_ids:
+            self._discard(self._by_class, class_id, subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": sum(len(subs) for subs in self._by_user.values()),
+            "classes_followed": len(self._by_class),
+            "listening": self._conn is not None and not self._conn.is_closed(),
+            "delivered": self._delivered
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[Subscription]], key: Any, subscription: Subscription) -> None:
+        subs = index.get(key)
+        if subs is not None:
+            subs.discard(subscription)
+            if not subs:
+                del index[key]
+
+    # =================================================================
+    # DISPATCH
+    # =================================================================
+    def _on_notify(self, connection, pid, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            return
+        if channel == "waitlist_promoted":
+            event["type"] = "waitlist_promoted"
+        self.dispatch(event)
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        class_id = event.get("class_id")
+        user_id = event.get("mentee_id")
+
+        personal = event.get("type") in ("registration_changed", "waitlist_promoted")
+        # Class followers see seat counts via class_updated; who registered stays private
+        targets: Set[Subscription] = set() if personal else set(self._by_class.get(class_id, ()))
+        if user_id is not None:
+            user_subs = self._by_user.get(str(user_id), ())
+            targets.update(user_subs)
+            # Registration changes move the user's own class subscriptions along
+            if personal and class_id is not None:
+                for subscription in user_subs:
+                    if not subscription.follow_registrations:
+                        continue
+                    if event.get("op") == "DELETE":
+                        subscription.class_ids.discard(class_id)
+                        self._discard(self._by_class, class_id, subscription)
+                    else:
+                        subscription.class_ids.add(class_id)
+                        self._by_class.setdefault(class_id, set()).add(subscription)
+
+        for subscription in targets:
+            subscription.push(event)
+        self._delivered += len(targets)
+
+    # =================================================================
+    # LISTENER CONNECTION
+    # =================================================================
+    def _ensure_listener(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        backoff = 1
+        while True:
+            try:
+                self._conn = await asyncpg.connect(self.dsn, statement_cache_size=0)
+                for channel in CHANNELS:
+                    await self._conn.add_listener(channel, self._on_notify)
+                print("✅ Event broker listening")
+                backoff = 1
+                # Notifications arrive via callbacks; just watch the connection
+                while not self._conn.is_closed():
+                    await asyncio.sleep(self.heartbeat)
+                    await self._conn.execute("SELECT 1")
+            except Exception as e:
+                print(f"⚠️ Event broker connection lost: {e}")
+            finally:
+                if self._conn is not None and not self._conn.is_closed():
+                    await self._conn.close()
+            # Events may have been missed while disconnected
+            for subs in self._by_user.values():
+                for subscription in subs:
+                    subscription.push({"type": "resync"})
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+# Global instance
+event_broker = EventBroker(
+    dsn=settings.DATABASE_LISTEN_URL or settings.DATABASE_URL,
+    queue_size=settings.SSE_QUEUE_SIZE,
+    heartbeat=settings.SSE_HEARTBEAT_SECONDS
+)
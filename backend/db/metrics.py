@@ -0,0 +1,98 @@
+from typing import Dict, Any, List, Optional, Sequence
+import bisect
+
+# Latency buckets in seconds (upper bounds), shared by pool and HTTP metrics
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram: O(log buckets) per observation, constant memory.
+    Quantiles are estimated by linear interpolation inside the matching bucket.
+    """
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+    def cumulative(self) -> List[int]:
+        """Counts per upper bound, cumulative (Prometheus `le` semantics)"""
+        total = 0
+        result = []
+        for bucket_count in self.counts:
+            total += bucket_count
+            result.append(total)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            "count": self.count,
+            "avg_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.50)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+            "max_ms": ms(self.max) if self.count else None,
+            "buckets_ms": {
+                ("+Inf" if index == len(self.buckets) else str(self.buckets[index] * 1000)): total
+                for index, total in enumerate(self.cumulative())
+            }
+        }
+
+
+class PoolMetrics:
+    """Counters kept by DatabasePool around every pool.acquire()/release()"""
+
+    def __init__(self):
+        self.acquire_wait = Histogram()
+        self.hold = Histogram()
+        self.acquired = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.waiting = 0
+        self.max_waiting = 0
+
+    def snapshot(self, pool: Any) -> Dict[str, Any]:
+        size = pool.get_size() if pool is not None else 0
+        idle = pool.get_idle_size() if pool is not None else 0
+        return {
+            "initialized": pool is not None,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "min_size": pool.get_min_size() if pool is not None else None,
+            "max_size": pool.get_max_size() if pool is not None else None,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "acquire_wait": self.acquire_wait.snapshot(),
+            "hold": self.hold.snapshot()
+        }
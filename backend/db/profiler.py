@@ -0,0 +1,297 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Sequence, Set, Tuple
+import asyncio
+import hashlib
+import random
+import re
+import sys
+import time
+
+from db.config import settings
+from db.metrics import Histogram
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+# EXPLAIN ANALYZE executes the statement: only plain reads qualify (FOR UPDATE fails read-only)
+_WRITE_KEYWORD = re.compile(r"\b(insert|update|delete|merge|nextval|pg_advisory\w*)\b", re.IGNORECASE)
+PLAN_REFRESH_SECONDS = 600  # a fingerprint's plan is captured again at most this often
+# Frames in these files are plumbing, not the code that issued the query
+_SKIPPED_FILES = ("/db/database.py", "/db/profiler.py", "contextlib.py")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> Tuple[str, str]:
+    """
+    (id, normalized SQL) of a query: literals become ?, whitespace is collapsed.
+    Queries here are mostly constant strings, so the cache makes this a dict lookup.
+    """
+    normalized = _STRING_LITERAL.sub("?", query)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized
+
+
+def row_count(result: Any) -> int:
+    """Rows returned (fetch/fetchrow) or affected ("UPDATE 3" from execute)"""
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, str):
+        tail = result.rsplit(" ", 1)[-1]
+        return int(tail) if tail.isdigit() else 0
+    return 1
+
+
+class QueryStats:
+    __slots__ = ("sql", "count", "errors", "rows", "latency", "callers")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = Histogram()
+        self.callers: Dict[str, int] = {}
+
+
+class QueryProfiler:
+    """
+    Per-fingerprint query statistics, switched on and off at runtime.
+
+    UnitOfWork checks `enabled` before every statement; when it is off that
+    attribute read is the only cost. Every db helper and db.unit_of_work() block
+    goes through it (COPY too, see UnitOfWork.copy_records_to_table); db.stream()
+    cursors and the EXPLAIN runs of capture_plan() are not recorded. When on, each statement records its
+    latency, row count and the model/controller method that issued it, and
+    statements slower than slow_query_ms are printed with their parameters
+    reduced to type names.
+
+    Diagnostics mode (explain=True) additionally asks for the plan of a sampled
+    share of slow reads; DatabasePool.capture_plan() re-runs them under
+    EXPLAIN (ANALYZE, BUFFERS) and hands the result back to store_plan().
+    At most one capture runs at a time.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        slow_query_ms: int,
+        explain: bool = False,
+        explain_sample_rate: float = 1.0,
+        max_fingerprints: int = 1000
+    ):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self.explain_sample_rate = explain_sample_rate
+        self.max_fingerprints = max_fingerprints
+        self._stats: Dict[str, QueryStats] = {}
+        self._plans: Dict[str, Dict[str, Any]] = {}
+        self._capturing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._dropped = 0
+        self._slow = 0
+
+    # =================================================================
+    # RECORDING
+    # =================================================================
+    @staticmethod
+    def caller() -> str:
+        """module.Class.method of the first frame outside the database layer"""
+        frame = sys._getframe(1)
+        while frame is not None:
+            code = frame.f_code
+            if not code.co_filename.endswith(_SKIPPED_FILES):
+                qualname = getattr(code, "co_qualname", code.co_name)
+                return f"{frame.f_globals.get('__name__', '?')}.{qualname}"
+            frame = frame.f_back
+        return "unknown"
+
+    def record(
+        self,
+        query: str,
+        args: Sequence[Any],
+        elapsed: float,
+        result: Any,
+        caller: str,
+        failed: bool = False
+    ) -> bool:
+        """Record one statement; True when its plan should be captured"""
+        query_id, normalized = fingerprint(query)
+        stats = self._stats.get(query_id)
+        if stats is None:
+            if len(self._stats) >= self.max_fingerprints:
+                self._dropped += 1
+                return False
+            stats = self._stats[query_id] = QueryStats(normalized)
+
+        stats.count += 1
+        stats.latency.observe(elapsed)
+        stats.callers[caller] = stats.callers.get(caller, 0) + 1
+        if failed:
+            stats.errors += 1
+        else:
+            stats.rows += row_count(result)
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= self.slow_query_ms:
+            self._slow += 1
+            params = ", ".join(f"${i}=<{type(arg).__name__}>" for i, arg in enumerate(args, start=1))
+            print(
+                f"🐢 Slow query {elapsed_ms:.1f} ms [{query_id}] from {caller}: "
+                f"{normalized[:300]} ({params or 'no params'})"
+            )
+            return not failed and self._wants_plan(query_id, normalized)
+        return False
+
+    # =================================================================
+    # PLAN CAPTURE (diagnostics mode)
+    # =================================================================
+    def _wants_plan(self, query_id: str, normalized: str) -> bool:
+        if not self.explain or self._capturing:
+            return False
+        if not normalized.lstrip("(").lower().startswith(("select", "with")) or _WRITE_KEYWORD.search(normalized):
+            return False
+        previous = self._plans.get(query_id)
+        if previous is not None and time.monotonic() - previous["_captured"] < PLAN_REFRESH_SECONDS:
+            return False
+        return random.random() < self.explain_sample_rate
+
+    def start_capture(self, query: str, capture: Any) -> None:
+        """Run a capture_plan() coroutine in the background, keeping a reference to it"""
+        query_id = fingerprint(query)[0]
+        self._capturing.add(query_id)
+        task = asyncio.create_task(capture)
+        self._tasks.add(task)
+
+        def done(finished: asyncio.Task) -> None:
+            self._tasks.discard(finished)
+            self._capturing.discard(query_id)
+
+        task.add_done_callback(done)
+
+    def store_plan(
+        self,
+        query: str,
+        observed: float,
+        caller: str,
+        plan: Any = None,
+        error: Optional[str] = None
+    ) -> None:
+        query_id, normalized = fingerprint(query)
+        if query_id not in self._plans and len(self._plans) >= self.max_fingerprints:
+            return
+        self._plans[query_id] = {
+            "fingerprint": query_id,
+            "sql": normalized,
+            "caller": caller,
+            "observed_ms": round(observed * 1000, 3),
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "plan": plan,
+            "error": error,
+            "_captured": time.monotonic()
+        }
+
+    def plans(self) -> List[Dict[str, Any]]:
+        """Captured plans without the plan bodies, slowest observation first"""
+        summaries = []
+        for entry in self._plans.values():
+            plan = entry["plan"]
+            top = plan[0] if isinstance(plan, list) and plan else {}
+            summaries.append({
+                "fingerprint": entry["fingerprint"],
+                "sql": entry["sql"],
+                "caller": entry["caller"],
+                "observed_ms": entry["observed_ms"],
+                "execution_ms": top.get("Execution Time"),
+                "planning_ms": top.get("Planning Time"),
+                "captured_at": entry["captured_at"],
+                "error": entry["error"]
+            })
+        summaries.sort(key=lambda summary: summary["observed_ms"], reverse=True)
+        return summaries
+
+    def get_plan(self, query_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._plans.get(query_id)
+        if entry is None:
+            return None
+        return {key: value for key, value in entry.items() if not key.startswith("_")}
+
+    # =================================================================
+    # CONTROL / REPORTING
+    # =================================================================
+    def configure(
+        self,
+        enabled: Optional[bool] = None,
+        slow_query_ms: Optional[int] = None,
+        explain: Optional[bool] = None,
+        explain_sample_rate: Optional[float] = None
+    ) -> Dict[str, Any]:
+        if enabled is not None:
+            self.enabled = enabled
+        if slow_query_ms is not None:
+            self.slow_query_ms = slow_query_ms
+        if explain is not None:
+            self.explain = explain
+        if explain_sample_rate is not None:
+            self.explain_sample_rate = explain_sample_rate
+        return self.status()
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._plans.clear()
+        self._dropped = 0
+        self._slow = 0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "slow_query_ms": self.slow_query_ms,
+            "explain": self.explain,
+            "explain_sample_rate": self.explain_sample_rate,
+            "plans": len(self._plans),
+            "capturing": len(self._capturing),
+            "fingerprints": len(self._stats),
+            "max_fingerprints": self.max_fingerprints,
+            "dropped": self._dropped,
+            "slow_queries": self._slow
+        }
+
+    def report(self, sort: str = "total", limit: int = 50) -> List[Dict[str, Any]]:
+        """Fingerprints ordered by total time (or count / p95 / rows), heaviest first"""
+        entries = []
+        for query_id, stats in self._stats.items():
+            latency = stats.latency
+            p95 = latency.quantile(0.95) or 0.0
+            entries.append({
+                "fingerprint": query_id,
+                "sql": stats.sql,
+                "count": stats.count,
+                "errors": stats.errors,
+                "total_ms": round(latency.sum * 1000, 3),
+                "avg_ms": round(latency.sum / latency.count * 1000, 3) if latency.count else 0.0,
+                "p95_ms": round(p95 * 1000, 3),
+                "max_ms": round(latency.max * 1000, 3),
+                "rows": stats.rows,
+                "callers": dict(sorted(stats.callers.items(), key=lambda item: -item[1]))
+            })
+        sort_key = {
+            "total": "total_ms",
+            "count": "count",
+            "p95": "p95_ms",
+            "rows": "rows"
+        }.get(sort, "total_ms")
+        entries.sort(key=lambda entry: entry[sort_key], reverse=True)
+        return entries[:limit]
+
+
+# Global instance
+query_profiler = QueryProfiler(
+    enabled=settings.DB_PROFILER_ENABLED,
+    slow_query_ms=settings.DB_SLOW_QUERY_MS,
+    explain=settings.DB_EXPLAIN_SLOW_QUERIES,
+    explain_sample_rate=settings.DB_EXPLAIN_SAMPLE_RATE
+)
@@ -6,7 +6,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 
 from db.config import settings
+from db.database import db
 from middleware.database import DatabaseMiddleware
+from middleware.conditional import ETagMiddleware
+from middleware.metrics import MetricsMiddleware, process_metrics
 
 # Import route modules
 
@@ -25,6 +28,11 @@ from routes import session_route
 
 from routes.FeedbackAndProgressTracking import assignmentRoute, feedbackRoute, progressRoute, submissionRoute
 from routes import attendance_route
+from routes import timetable_route
+from routes import event_route
+from controllers.FeedbackAndProgressTracking.submissionQueue import submission_queue
+from middleware.password import password_hasher
+from db.events import event_broker
 
 app = FastAPI(
     title=settings.API_TITLE,
@@ -38,6 +46,9 @@ app = FastAPI(
 # Add database middleware FIRST (before CORS)
 app.add_middleware(DatabaseMiddleware)
 
+# Body-hash ETags / 304 for JSON GETs without their own validator
+app.add_middleware(ETagMiddleware)
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -47,6 +58,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is outermost: request metrics cover CORS and the other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include route modules
 app.include_router(system_route.router)  # Root and system endpoints
 app.include_router(user_route.router)    # /users endpoints
@@ -77,11 +91,27 @@ app.include_router(note_route.router)
 #session modules
 app.include_router(session_route.router)
 
+# Timetable routes
+app.include_router(timetable_route.router)
+
+# Server-Sent Events
+app.include_router(event_route.router)
+
 # Root endpoint
 @app.get("/")
 async def root():
     return {"status": "ok", "message": "Tutor Support System API"}
 
+# Flush queued submissions before the pool goes away
+@app.on_event("shutdown")
+async def shutdown():
+    await event_broker.close()
+    await process_metrics.close()
+    if db.pool is not None:
+        await submission_queue.drain()
+        await db.close()
+    password_hasher.shutdown()
+
 # Handle favicon request
 @app.get("/favicon.ico")
 async def favicon():
@@ -3,14 +3,17 @@ import os
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import List
+from typing import List, Optional
 
 # Cấu hình JWT từ biến môi trường
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = os.getenv("JWT_ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+FEED_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_FEED_TOKEN_EXPIRE_DAYS", "365"))
+FEED_TOKEN_SCOPE = "calendar_feed"
 
 security_scheme = HTTPBearer()
+optional_security_scheme = HTTPBearer(auto_error=False)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -24,6 +27,30 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
+def create_feed_token(user_id: str, role: str) -> str:
+    """
+    Sinh token dài hạn cho link lịch (.ics): calendar apps cannot send a Bearer header,
+    so the token travels in the URL and is only valid for the feed scope.
+    """
+    return create_access_token(
+        data={"sub": user_id, "role": role, "scope": FEED_TOKEN_SCOPE},
+        expires_delta=timedelta(days=FEED_TOKEN_EXPIRE_DAYS)
+    )
+
+
+def verify_feed_token(token: str) -> dict:
+    """
+    Kiểm tra token của link lịch; access tokens thường không được chấp nhận ở đây
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid calendar feed token")
+    if payload.get("scope") != FEED_TOKEN_SCOPE or not payload.get("sub"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid calendar feed token")
+    return payload
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security_scheme)):
     """
     Middleware kiểm tra JWT trong các route được bảo vệ
@@ -39,12 +66,31 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security_sc
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
-        if user_id is None:
+        # Scoped tokens (e.g. calendar feed links) are not session credentials
+        if user_id is None or payload.get("scope"):
             raise credentials_exception
         return payload  
     except JWTError:
         raise credentials_exception
     
+def verify_token_or_query(
+    access_token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security_scheme)
+):
+    """
+    Giống verify_token nhưng cũng nhận ?access_token=...: the browser EventSource API
+    cannot set an Authorization header. Only plain access tokens are accepted.
+    """
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+
 def authorize(allowed_roles: List[str]):
     """
     Hàm "Factory" tạo ra một dependency
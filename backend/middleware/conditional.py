@@ -0,0 +1,127 @@
+from typing import Any, Awaitable, Callable, List, Optional
+import hashlib
+
+from fastapi import HTTPException, Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.config import settings
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x" (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == bare:
+            return True
+    return False
+
+
+def conditional_get(stamp: Callable[..., Awaitable[Any]]):
+    """
+    Dependency factory: answer 304 before the route body runs.
+
+    `stamp` is called with the route's path params and returns a cheap version
+    stamp (see VersionModel). The ETag is derived from the stamp and the URL, so
+    an unchanged resource skips the model query and the JSON serialization.
+    If the stamp itself fails the request simply proceeds without a validator.
+    """
+
+    async def check_version(request: Request, response: Response):
+        try:
+            version = await stamp(**request.path_params)
+        except Exception as e:
+            print(f"⚠️ Version stamp failed for {request.url.path}: {e}")
+            return
+        etag = make_etag(request.url.path, request.url.query, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return check_version
+
+
+class ETagMiddleware:
+    """
+    Body-hash ETags for every JSON GET that did not set its own validator.
+
+    This saves bandwidth and client-side parsing only (the query still runs);
+    routes that can produce a cheap version stamp should use conditional_get.
+    Bodies larger than ETAG_MAX_BODY_BYTES and streamed responses pass through.
+    Pure ASGI (not BaseHTTPMiddleware) so the body is buffered exactly once.
+    """
+
+    def __init__(self, app: ASGIApp, max_body: int = settings.ETAG_MAX_BODY_BYTES):
+        self.app = app
+        self.max_body = max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] != 200
+                    or "etag" in headers
+                    or not headers.get("content-type", "").startswith("application/json")
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more_body = message.get("more_body", False)
+            if size > self.max_body:
+                # Too large to hold: flush what we have and stop buffering
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": more_body})
+                return
+            if more_body:
+                return
+
+            body = b"".join(chunks)
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            if etag_matches(if_none_match, etag):
+                start["status"] = 304
+                del headers["content-length"]
+                del headers["content-type"]
+                body = b""
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
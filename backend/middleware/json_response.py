@@ -0,0 +1,50 @@
+from typing import Any
+from datetime import timedelta
+from decimal import Decimal
+import uuid
+
+import asyncpg  # type: ignore
+import orjson
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_default(value: Any) -> Any:
+    """
+    Types orjson does not know natively (datetime, date, uuid.UUID, enums are native).
+    asyncpg Records are handed over as plain dicts, Decimals follow jsonable_encoder
+    (int when integral, float otherwise) so payloads do not change shape.
+    asyncpg decodes uuid columns to its own UUID subclass, which orjson only
+    accepts as the exact uuid.UUID type, so UUIDs land here and become strings.
+    """
+    if isinstance(value, asyncpg.Record):
+        return dict(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=encode_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    Return it directly from a route (`return FastJSONResponse(result)`) so FastAPI
+    skips jsonable_encoder: rows, datetimes, UUIDs and Decimals go straight to bytes
+    in one pass. Headers set by dependencies on the injected `response` are not
+    merged into a returned Response, so pass them along with headers=response.headers.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
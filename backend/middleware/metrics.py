@@ -0,0 +1,230 @@
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import gc
+import os
+import resource
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.database import db
+from db.metrics import Histogram
+
+# GC pauses are mostly well under a millisecond
+GC_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+LOOP_LAG_INTERVAL = 0.5  # seconds between event-loop lag probes
+PROCESS_START_TIME = time.time()
+
+
+class RequestMetrics:
+    """Request counters and latency histograms keyed by (method, route template, status)"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, elapsed: Optional[float]) -> None:
+        key = (method, route, str(status))
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if status >= 500:
+            self.errors[(method, route)] = self.errors.get((method, route), 0) + 1
+        if elapsed is not None:
+            histogram = self.latency.get((method, route))
+            if histogram is None:
+                histogram = self.latency[(method, route)] = Histogram()
+            histogram.observe(elapsed)
+
+
+class ProcessMetrics:
+    """
+    Event-loop lag (a probe that measures how late its own sleep wakes up)
+    and GC pauses per generation (gc.callbacks start/stop).
+    """
+
+    def __init__(self):
+        self.loop_lag = Histogram()
+        self.loop_lag_last = 0.0
+        self.gc_pauses: Dict[int, Histogram] = {generation: Histogram(GC_BUCKETS) for generation in range(3)}
+        self._gc_started: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self.gc_pauses[info["generation"]].observe(time.perf_counter() - self._gc_started)
+            self._gc_started = None
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._probe_loop_lag())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _probe_loop_lag(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            self.loop_lag_last = max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL)
+            self.loop_lag.observe(self.loop_lag_last)
+
+    @staticmethod
+    def resident_memory() -> int:
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            # Peak RSS (kilobytes on Linux) where /proc is unavailable
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @staticmethod
+    def open_fds() -> Optional[int]:
+        try:
+            return len(os.listdir("/proc/self/fd"))
+        except OSError:
+            return None
+
+
+class MetricsMiddleware:
+    """
+    Counts every HTTP request by method, route template (e.g. /classes/{class_id},
+    never the raw path, so label cardinality stays bounded) and status, and
+    times it until the last body chunk is sent. Server-sent event streams are
+    counted but not timed. Pure ASGI: one perf_counter pair and a dict update
+    per request, no body buffering.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        process_metrics.ensure_started()
+        started = time.perf_counter()
+        status = 500
+        streaming = False
+        request_metrics.in_flight += 1
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type":
+                        streaming = value.startswith(b"text/event-stream")
+                        break
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            request_metrics.in_flight -= 1
+            # The router leaves the matched route in the (shared) scope
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+            elapsed = None if streaming else time.perf_counter() - started
+            request_metrics.observe(scope["method"], template, status, elapsed)
+
+
+# =================================================================
+# PROMETHEUS TEXT FORMAT
+# =================================================================
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _header(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: List[str], name: str, histogram: Histogram, **labels: Any) -> None:
+    bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+    for bound, total in zip(bounds, histogram.cumulative()):
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {total}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def render_prometheus() -> str:
+    """All metrics of this worker in Prometheus text exposition format 0.0.4"""
+    lines: List[str] = []
+
+    # HTTP
+    _header(lines, "http_requests_total", "counter", "HTTP requests by method, route template and status.")
+    for (method, route, status), count in request_metrics.requests.items():
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+    _header(lines, "http_request_errors_total", "counter", "HTTP requests answered with a 5xx status.")
+    for (method, route), count in request_metrics.errors.items():
+        lines.append(f"http_request_errors_total{_labels(method=method, route=route)} {count}")
+    _header(lines, "http_request_duration_seconds", "histogram", "HTTP request latency until the last body chunk.")
+    for (method, route), histogram in request_metrics.latency.items():
+        _histogram(lines, "http_request_duration_seconds", histogram, method=method, route=route)
+    _header(lines, "http_requests_in_flight", "gauge", "HTTP requests currently being served.")
+    lines.append(f"http_requests_in_flight {request_metrics.in_flight}")
+
+    # Process
+    _header(lines, "process_resident_memory_bytes", "gauge", "Resident memory size in bytes.")
+    lines.append(f"process_resident_memory_bytes {ProcessMetrics.resident_memory()}")
+    _header(lines, "process_cpu_seconds_total", "counter", "User and system CPU time spent in seconds.")
+    lines.append(f"process_cpu_seconds_total {time.process_time()}")
+    open_fds = ProcessMetrics.open_fds()
+    if open_fds is not None:
+        _header(lines, "process_open_fds", "gauge", "Number of open file descriptors.")
+        lines.append(f"process_open_fds {open_fds}")
+    _header(lines, "process_start_time_seconds", "gauge", "Start time of the process since unix epoch in seconds.")
+    lines.append(f"process_start_time_seconds {PROCESS_START_TIME}")
+    _header(lines, "event_loop_lag_seconds", "histogram", "How late the event loop woke a periodic probe.")
+    _histogram(lines, "event_loop_lag_seconds", process_metrics.loop_lag)
+    _header(lines, "event_loop_lag_last_seconds", "gauge", "Most recent event loop lag probe.")
+    lines.append(f"event_loop_lag_last_seconds {process_metrics.loop_lag_last}")
+    _header(lines, "python_gc_pause_seconds", "histogram", "Garbage collector pause time by generation.")
+    for generation, histogram in process_metrics.gc_pauses.items():
+        _histogram(lines, "python_gc_pause_seconds", histogram, generation=generation)
+
+    # Database pool
+    pool = db.pool_stats()
+    _header(lines, "db_pool_connections", "gauge", "Pool connections by state.")
+    lines.append(f"db_pool_connections{_labels(state='in_use')} {pool['in_use']}")
+    lines.append(f"db_pool_connections{_labels(state='idle')} {pool['idle']}")
+    if pool["max_size"] is not None:
+        _header(lines, "db_pool_max_connections", "gauge", "Configured maximum pool size.")
+        lines.append(f"db_pool_max_connections {pool['max_size']}")
+    _header(lines, "db_pool_waiting", "gauge", "Callers currently waiting for a pool connection.")
+    lines.append(f"db_pool_waiting {pool['waiting']}")
+    _header(lines, "db_pool_acquires_total", "counter", "Connections handed out by the pool.")
+    lines.append(f"db_pool_acquires_total {pool['acquired']}")
+    _header(lines, "db_pool_acquire_timeouts_total", "counter", "Acquires that hit DB_ACQUIRE_TIMEOUT.")
+    lines.append(f"db_pool_acquire_timeouts_total {pool['timeouts']}")
+    _header(lines, "db_pool_acquire_errors_total", "counter", "Acquires that failed with an error.")
+    lines.append(f"db_pool_acquire_errors_total {pool['errors']}")
+    _header(lines, "db_pool_acquire_wait_seconds", "histogram", "Time spent waiting for a pool connection.")
+    _histogram(lines, "db_pool_acquire_wait_seconds", db.metrics.acquire_wait)
+    _header(lines, "db_pool_connection_hold_seconds", "histogram", "Time a pool connection is held.")
+    _histogram(lines, "db_pool_connection_hold_seconds", db.metrics.hold)
+
+    return "\n".join(lines) + "\n"
+
+
+# Global instances
+request_metrics = RequestMetrics()
+process_metrics = ProcessMetrics()
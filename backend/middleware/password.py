@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+import asyncio
+import time
+
+import bcrypt
+
+from db.config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify jobs are already waiting"""
+
+
+class PasswordHasher:
+    """
+    Chạy bcrypt trên một thread pool riêng, có giới hạn hàng đợi.
+
+    bcrypt releases the GIL while it works, so moving hashpw/checkpw off the
+    event loop lets other requests keep flowing during a login rush. Jobs
+    beyond PASSWORD_HASH_MAX_QUEUE are rejected with PasswordHasherBusy
+    instead of piling up behind the workers.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_queue: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # =================================================================
+    # PUBLIC API
+    # =================================================================
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured cost factor"""
+        hashed = await self._submit(self._hash_sync, password, self.rounds)
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(self._verify_sync, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when the stored hash was made with a different cost factor ($2b$<cost>$...)"""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "in_flight": self._pending,
+            "queue_depth": max(0, self._pending - self.workers),
+            "max_queue": self.max_queue,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._wait_total / self._completed * 1000, 2) if self._completed else 0.0,
+            "max_wait_ms": round(self._wait_max * 1000, 2)
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # =================================================================
+    # INTERNAL
+    # =================================================================
+    async def _submit(self, func, *args):
+        if self._pending - self.workers >= self.max_queue:
+            self._rejected += 1
+            raise PasswordHasherBusy("Too many password operations in progress, please retry shortly.")
+
+        self._pending += 1
+        queued_at = time.monotonic()
+
+        def job():
+            # Runs on a worker thread: only record when it actually started
+            started_at = time.monotonic()
+            return started_at, func(*args)
+
+        try:
+            started_at, result = await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            self._pending -= 1
+
+        wait = started_at - queued_at
+        self._completed += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        return result
+
+    @staticmethod
+    def _hash_sync(password: str, rounds: int) -> bytes:
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds))
+
+    @staticmethod
+    def _verify_sync(password: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+        except ValueError:
+            # Malformed hash in the database
+            return False
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
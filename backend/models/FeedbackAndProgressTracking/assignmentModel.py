@@ -42,7 +42,13 @@ class AssignmentCreate(AssignmentBase):
     class_id: int
     session_id: int
 
-# 5. Response Schema (Output)
+# 5. Answer Key Update Schema (Input)
+class AssignmentAnswersUpdate(BaseModel):
+    answers: List[AnswerItem]
+    # Re-grade existing submissions against the corrected key
+    regrade: bool = True
+
+# 6. Response Schema (Output)
 class AssignmentResponse(AssignmentBase):
     class_id: int
     session_id: int
@@ -18,66 +18,61 @@ class AdminModel:
         Returns: Dictionary with total counts and session statistics
         """
         try:
-            # Total Mentees (active users with mentee role)
-            mentee_result = await db.execute_single(
-                """
+            # Seven independent counts, one round trip (db.batch_read)
+            (
+                mentee_result,
+                tutor_result,
+                classes_result,
+                sessions_result,
+                subjects_result,
+                upcoming_result,
+                completed_result
+            ) = await db.batch_read(
+                # Total Mentees (active users with mentee role)
+                ("""
                 SELECT COUNT(DISTINCT m.user_id) as count 
                 FROM mentee m
                 JOIN public.user u ON m.user_id = u.id
-                """
-            )
-            total_mentees = mentee_result['count'] if mentee_result else 0
-
-            # Total Tutors (active users with tutor role)
-            tutor_result = await db.execute_single(
-                """
+                """,),
+                # Total Tutors (active users with tutor role)
+                ("""
                 SELECT COUNT(DISTINCT t.user_id) as count 
                 FROM tutor t
                 JOIN public.user u ON t.user_id = u.id
-                """
-            )
-            total_tutors = tutor_result['count'] if tutor_result else 0
-
-            # Total Classes (active)
-            classes_result = await db.execute_single(
-                """
+                """,),
+                # Total Classes (active)
+                ("""
                 SELECT COUNT(*) as count 
                 FROM classes 
                 WHERE class_status != 'cancelled'
-                """
-            )
-            total_classes = classes_result['count'] if classes_result else 0
-
-            # Total Sessions
-            sessions_result = await db.execute_single(
-                "SELECT COUNT(*) as count FROM sessions"
-            )
-            total_sessions = sessions_result['count'] if sessions_result else 0
-
-            # Total Subjects (distinct)
-            subjects_result = await db.execute_single(
-                "SELECT COUNT(*) as count FROM subjects"
-            )
-            total_subjects = subjects_result['count'] if subjects_result else 0
-
-            # Upcoming Sessions
-            upcoming_result = await db.execute_single(
-                """
+                """,),
+                # Total Sessions
+                ("SELECT COUNT(*) as count FROM sessions",),
+                # Total Subjects (distinct)
+                ("SELECT COUNT(*) as count FROM subjects",),
+                # Upcoming Sessions
+                ("""
                 SELECT COUNT(*) as count FROM sessions 
                 WHERE session_date >= NOW() 
                 AND session_status = 'scheduled'
-                """
-            )
-            upcoming_sessions = upcoming_result['count'] if upcoming_result else 0
-
-            # Completed Sessions
-            completed_result = await db.execute_single(
-                """
+                """,),
+                # Completed Sessions
+                ("""
                 SELECT COUNT(*) as count FROM sessions 
                 WHERE session_status = 'completed'
-                """
+                """,)
             )
-            completed_sessions = completed_result['count'] if completed_result else 0
+
+            def first_count(rows: List[Dict[str, Any]]) -> int:
+                return rows[0]['count'] if rows else 0
+
+            total_mentees = first_count(mentee_result)
+            total_tutors = first_count(tutor_result)
+            total_classes = first_count(classes_result)
+            total_sessions = first_count(sessions_result)
+            total_subjects = first_count(subjects_result)
+            upcoming_sessions = first_count(upcoming_result)
+            completed_sessions = first_count(completed_result)
 
             return {
                 "totalMentees": total_mentees,
@@ -105,9 +100,10 @@ class AdminModel:
         try:
             activities = []
 
-            # Recent Registrations
-            registrations = await db.execute_query(
-                """
+            # Registrations, class creations and session completions: one round trip
+            registrations, class_creations, session_completions = await db.batch_read(
+                # Recent Registrations
+                ("""
                 SELECT 
                     cr.mentee_id::text || '_' || cr.class_id::text as id,
                     'registration' as type,
@@ -122,13 +118,9 @@ class AdminModel:
                 WHERE cr.registration_log IS NOT NULL
                 ORDER BY cr.registration_log DESC
                 LIMIT 20
-                """
-            )
-            activities.extend(registrations)
-
-            # Recent Class Creations
-            class_creations = await db.execute_query(
-                """
+                """,),
+                # Recent Class Creations
+                ("""
                 SELECT 
                     c.id::text as id,
                     'class_created' as type,
@@ -141,13 +133,9 @@ class AdminModel:
                 JOIN public.user u ON c.tutor_id = u.id
                 ORDER BY c.created_at DESC
                 LIMIT 20
-                """
-            )
-            activities.extend(class_creations)
-
-            # Recent Session Updates (sessions that were marked as completed)
-            session_completions = await db.execute_query(
-                """
+                """,),
+                # Recent Session Updates (sessions that were marked as completed)
+                ("""
                 SELECT 
                     sess.class_id::text || '_' || sess.session_id::text as id,
                     'session_completed' as type,
@@ -162,10 +150,17 @@ class AdminModel:
                 WHERE sess.session_status = 'completed'
                 ORDER BY sess.updated_at DESC
                 LIMIT 20
-                """
+                """,)
             )
+            activities.extend(registrations)
+            activities.extend(class_creations)
             activities.extend(session_completions)
 
+            # batch_read returns timestamps as JSON strings
+            for activity in activities:
+                if activity['timestamp']:
+                    activity['timestamp'] = datetime.fromisoformat(activity['timestamp'])
+
             # Sort all activities by timestamp descending
             activities.sort(key=lambda x: x['timestamp'], reverse=True)
 
@@ -1,5 +1,5 @@
-from db.database import db
-from typing import List, Dict, Any
+from db.database import db, UnitOfWork
+from typing import List, Dict, Any, Optional
 
 class AttendanceModel:
     @staticmethod
@@ -26,3 +26,121 @@ class AttendanceModel:
             DO UPDATE SET attendance_mark = $4;
         """
         await db.execute_command(query, session_id, class_id, mentee_id, attended)
+
+    @staticmethod
+    async def apply_sync_batch(tutor_id: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Applies a batch of offline attendance marks in one transaction.
+        Each record carries a client-generated idempotency_key; keys that were
+        already applied are reported as duplicates without touching attendance.
+        Returns one result per input record, in input order.
+        """
+        keys = [record["idempotency_key"] for record in records]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+
+        async with db.unit_of_work(transaction=False) as uow:
+            # Replays are answered from the log with a single indexed lookup
+            applied_rows = await uow.fetch_records(
+                """
+                SELECT idempotency_key FROM attendance_sync_log
+                WHERE idempotency_key = ANY($1::text[])
+                """,
+                keys
+            )
+            already_applied = {row["idempotency_key"] for row in applied_rows}
+
+            pending: Dict[str, int] = {}  # idempotency_key -> index of first occurrence
+            for index, record in enumerate(records):
+                key = record["idempotency_key"]
+                if key in already_applied or key in pending:
+                    results[index] = {"key": key, "status": "duplicate"}
+                else:
+                    pending[key] = index
+
+            if pending:
+                pending_records = [records[index] for index in pending.values()]
+                async with uow.transaction():
+                    rejected = await AttendanceModel._find_rejected_marks(uow, tutor_id, pending_records)
+                    accepted = [r for r in pending_records if r["idempotency_key"] not in rejected]
+
+                    # Claim the keys; a concurrent flush of the same queue loses the race here
+                    claimed_rows = await uow.fetch_records(
+                        """
+                        INSERT INTO attendance_sync_log
+                            (idempotency_key, tutor_id, mentee_id, class_id, session_id, attendance_mark)
+                        SELECT t.idempotency_key, $6, t.mentee_id, t.class_id, t.session_id, t.attendance_mark
+                        FROM unnest($1::text[], $2::uuid[], $3::int[], $4::int[], $5::bool[])
+                            AS t(idempotency_key, mentee_id, class_id, session_id, attendance_mark)
+                        ON CONFLICT (idempotency_key) DO NOTHING
+                        RETURNING idempotency_key
+                        """,
+                        [r["idempotency_key"] for r in accepted],
+                        [r["mentee_id"] for r in accepted],
+                        [r["class_id"] for r in accepted],
+                        [r["session_id"] for r in accepted],
+                        [r["attended"] for r in accepted],
+                        tutor_id
+                    )
+                    claimed = {row["idempotency_key"] for row in claimed_rows}
+
+                    # Later marks for the same mentee/session win (records arrive oldest first)
+                    latest: Dict[tuple, Dict[str, Any]] = {}
+                    for record in accepted:
+                        if record["idempotency_key"] in claimed:
+                            target = (str(record["mentee_id"]), record["class_id"], record["session_id"])
+                            latest[target] = record
+
+                    if latest:
+                        marks = list(latest.values())
+                        await uow.execute_command(
+                            """
+                            INSERT INTO attendance (session_id, class_id, mentee_id, attendance_mark)
+                            SELECT * FROM unnest($1::int[], $2::int[], $3::uuid[], $4::bool[])
+                            ON CONFLICT (mentee_id, class_id, session_id)
+                            DO UPDATE SET attendance_mark = EXCLUDED.attendance_mark
+                            """,
+                            [r["session_id"] for r in marks],
+                            [r["class_id"] for r in marks],
+                            [r["mentee_id"] for r in marks],
+                            [r["attended"] for r in marks]
+                        )
+
+                for key, index in pending.items():
+                    if key in rejected:
+                        results[index] = {"key": key, "status": "rejected", "error": rejected[key]}
+                    elif key in claimed:
+                        results[index] = {"key": key, "status": "applied"}
+                    else:
+                        results[index] = {"key": key, "status": "duplicate"}
+
+        return results
+
+    @staticmethod
+    async def _find_rejected_marks(uow: UnitOfWork, tutor_id: str, records: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Set-wise validation of a sync batch.
+        Returns {idempotency_key: reason} for marks that cannot be applied.
+        """
+        rows = await uow.fetch_records(
+            """
+            SELECT
+                t.idempotency_key,
+                CASE
+                    WHEN s.session_id IS NULL THEN 'Session not found'
+                    WHEN c.id IS NULL THEN 'You don''t have permission to mark attendance for this class'
+                    WHEN cr.mentee_id IS NULL THEN 'Mentee is not registered for this class'
+                END AS reason
+            FROM unnest($1::text[], $2::uuid[], $3::int[], $4::int[])
+                AS t(idempotency_key, mentee_id, class_id, session_id)
+            LEFT JOIN sessions s ON s.class_id = t.class_id AND s.session_id = t.session_id
+            LEFT JOIN classes c ON c.id = t.class_id AND c.tutor_id = $5
+            LEFT JOIN class_registrations cr ON cr.class_id = t.class_id AND cr.mentee_id = t.mentee_id
+            WHERE s.session_id IS NULL OR c.id IS NULL OR cr.mentee_id IS NULL
+            """,
+            [r["idempotency_key"] for r in records],
+            [r["mentee_id"] for r in records],
+            [r["class_id"] for r in records],
+            [r["session_id"] for r in records],
+            tutor_id
+        )
+        return {row["idempotency_key"]: row["reason"] for row in rows}
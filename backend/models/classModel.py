@@ -1,11 +1,13 @@
 from typing import List, Dict, Any, Optional
 from db.database import db
+from asyncpg import Record  # type: ignore
+from models.timetableModel import TimetableModel
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 class ClassModel:
     @staticmethod
-    async def get_all_classes() -> List[Dict[str, Any]]:
+    async def get_all_classes() -> List[Record]:
         """
         Get all classes with optional filters
         Returns classes with their subject info and time slots
@@ -42,7 +44,7 @@ class ClassModel:
         
         query += " ORDER BY c.created_at DESC"
         
-        return await db.execute_query(query, *params)
+        return await db.fetch_records(query, *params)
 
     @staticmethod
     async def get_class_by_id(class_id: int) -> Optional[Dict[str, Any]]:
@@ -77,7 +79,7 @@ class ClassModel:
         result = await db.execute_query(query, class_id)
         return result[0] if result else None
     
-    async def get_class_by_subject(subject_id: int) -> List[Dict[str, Any]]:
+    async def get_class_by_subject(subject_id: int) -> List[Record]:
         """Get classes by subject ID"""
         query = """
             SELECT 
@@ -107,7 +109,7 @@ class ClassModel:
             WHERE c.subject_id = $1
             ORDER BY c.created_at DESC
         """
-        return await db.execute_query(query, subject_id)
+        return await db.fetch_records(query, subject_id)
 
     @staticmethod
     async def create_class(tutor_id: str, class_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -127,7 +129,12 @@ class ClassModel:
         registration_deadline = class_data.get("registration_deadline")
         semester = class_data.get("semester")
 
-        # Check for time overlap with existing classes for the same tutor
+        # Check for time overlap with existing classes for the same tutor.
+        # The tutor's occupancy grid answers "no overlap" with one AND; the range scan
+        # below only runs to name the conflicting class (or when no grid exists yet).
+        busy = await TimetableModel.has_overlap(
+            tutor_id, semester, 'tutor', week_day, start_time, end_time
+        )
         overlap_check_query = """
             SELECT id, start_time, end_time, week_day
             FROM classes 
@@ -142,7 +149,7 @@ class ClassModel:
             )
         """
         
-        existing_classes = await db.execute_query(
+        existing_classes = [] if busy is False else await db.execute_query(
             overlap_check_query, 
             tutor_id, 
             week_day, 
@@ -199,7 +206,7 @@ class ClassModel:
         return {"id": class_id[0]['id'] if class_id else None}
     
     @staticmethod
-    async def get_classes_by_tutor(tutor_id: str) -> List[Dict[str, Any]]:
+    async def get_classes_by_tutor(tutor_id: str) -> List[Record]:
         """Get all classes by tutor ID"""
         query = """
             SELECT 
@@ -228,7 +235,14 @@ class ClassModel:
             WHERE c.tutor_id = $1
             ORDER BY c.created_at DESC
         """
-        return await db.execute_query(query, tutor_id)
+        return await db.fetch_records(query, tutor_id)
+
+    @staticmethod
+    async def get_class_ids_by_tutor(tutor_id: str) -> List[int]:
+        """Ids of the classes taught by a tutor"""
+        query = "SELECT id FROM classes WHERE tutor_id = $1"
+        rows = await db.execute_query(query, tutor_id)
+        return [row["id"] for row in rows]
 
     @staticmethod
     async def update_class_status(class_id: int) -> Optional[Dict[str, Any]]:
@@ -448,78 +462,94 @@ class ClassModel:
                 "message": "No confirmed classes without sessions found"
             }
         
+        lock_query = """
+            SELECT EXISTS (SELECT 1 FROM sessions s WHERE s.class_id = c.id)
+            FROM classes c
+            WHERE c.id = $1
+            FOR UPDATE
+        """
+        insert_session_query = """
+            INSERT INTO sessions (
+                class_id,
+                session_id,
+                session_date,
+                session_status,
+                location,
+                start_time,
+                end_time,
+                week_day,
+                created_at,
+                updated_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW(), NOW())
+            RETURNING class_id, session_id, session_date
+        """
+
         total_sessions_created = 0
         classes_processed = 0
         created_sessions_details = []
         
-        for class_data in confirmed_classes:
-            class_id = class_data['id']
-            num_of_weeks = class_data['num_of_weeks']
-            week_day = class_data['week_day']
-            location = class_data['location']
-            start_time = class_data['start_time']
-            end_time = class_data['end_time']
-            registration_deadline = class_data['registration_deadline']
+        # One connection for the whole run; each class gets its own transaction so a
+        # failure leaves no half-generated class behind and does not undo the others
+        async with db.unit_of_work(transaction=False) as uow:
+            for class_data in confirmed_classes:
+                async with uow.transaction():
+                    class_id = class_data['id']
+                    # Lock the class and re-check: another run may have generated it meanwhile
+                    # (None means the class was deleted)
+                    already_generated = await uow.fetch_value(lock_query, class_id)
+                    if already_generated is not False:
+                        continue
+
+                    num_of_weeks = class_data['num_of_weeks']
+                    week_day = class_data['week_day']
+                    location = class_data['location']
+                    start_time = class_data['start_time']
+                    end_time = class_data['end_time']
+                    registration_deadline = class_data['registration_deadline']
             
-            # Handle timezone for registration_deadline
-            if registration_deadline.tzinfo is not None:
-                registration_deadline = registration_deadline.replace(tzinfo=None)
+                    # Handle timezone for registration_deadline
+                    if registration_deadline.tzinfo is not None:
+                        registration_deadline = registration_deadline.replace(tzinfo=None)
             
-            # Get the first session date (first week_day after registration_deadline)
-            first_session_date = ClassModel._get_first_weekday_after_date(
-                registration_deadline, 
-                week_day
-            )
+                    # Get the first session date (first week_day after registration_deadline)
+                    first_session_date = ClassModel._get_first_weekday_after_date(
+                        registration_deadline, 
+                        week_day
+                    )
             
-            sessions_for_class = []
+                    sessions_for_class = []
             
-            # Create sessions for each week
-            for week_num in range(num_of_weeks):
-                session_date = first_session_date + timedelta(weeks=week_num)
-                session_id = week_num + 1  # session_id starts from 1
-                
-                insert_session_query = """
-                    INSERT INTO sessions (
-                        class_id,
-                        session_id,
-                        session_date,
-                        session_status,
-                        location,
-                        start_time,
-                        end_time,
-                        week_day,
-                        created_at,
-                        updated_at
-                    )
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW(), NOW())
-                    RETURNING class_id, session_id, session_date
-                """
-                
-                result = await db.execute_query(
-                    insert_session_query,
-                    class_id,
-                    session_id,
-                    session_date.date(),  # Convert to date only
-                    'scheduled',  # Default session status
-                    location,
-                    start_time,
-                    end_time,
-                    week_day
-                )
+                    # Create sessions for each week
+                    for week_num in range(num_of_weeks):
+                        session_date = first_session_date + timedelta(weeks=week_num)
+                        session_id = week_num + 1  # session_id starts from 1
+
+                        result = await uow.execute_single(
+                            insert_session_query,
+                            class_id,
+                            session_id,
+                            session_date.date(),  # Convert to date only
+                            'scheduled',  # Default session status
+                            location,
+                            start_time,
+                            end_time,
+                            week_day
+                        )
                 
-                if result:
-                    sessions_for_class.append({
-                        "session_id": session_id,
-                        "session_date": str(session_date.date())
-                    })
-                    total_sessions_created += 1
+                        if result:
+                            sessions_for_class.append({
+                                "session_id": session_id,
+                                "session_date": str(session_date.date())
+                            })
+                            total_sessions_created += 1
             
-            classes_processed += 1
-            created_sessions_details.append({
-                "class_id": class_id,
-                "sessions_created": len(sessions_for_class),
-                "sessions": sessions_for_class
-            })
+                    classes_processed += 1
+                    created_sessions_details.append({
+                        "class_id": class_id,
+                        "sessions_created": len(sessions_for_class),
+                        "sessions": sessions_for_class
+                    })
         
         return {
             "classes_processed": classes_processed,
@@ -548,97 +578,98 @@ class ClassModel:
                 c.class_status
             FROM classes c
             WHERE c.id = $1
+            FOR UPDATE
         """
-        
-        result = await db.execute_query(get_class_query, class_id)
-        
-        if not result:
-            return None
-        
-        class_data = result[0]
-        
-        # Check if class is confirmed
-        if class_data['class_status'] != 'confirmed':
-            return {
-                "class_id": class_id,
-                "sessions_created": 0,
-                "error": f"Class status is '{class_data['class_status']}', not 'confirmed'"
-            }
-        
-        # Check if sessions already exist
         check_sessions_query = """
             SELECT COUNT(*) as count FROM sessions WHERE class_id = $1
         """
-        existing_sessions = await db.execute_query(check_sessions_query, class_id)
-        
-        if existing_sessions and existing_sessions[0]['count'] > 0:
-            return {
-                "class_id": class_id,
-                "sessions_created": 0,
-                "error": "Sessions already exist for this class"
-            }
-        
-        num_of_weeks = class_data['num_of_weeks']
-        week_day = class_data['week_day']
-        location = class_data['location']
-        start_time = class_data['start_time']
-        end_time = class_data['end_time']
-        registration_deadline = class_data['registration_deadline']
-        
-        # Handle timezone for registration_deadline
-        if registration_deadline.tzinfo is not None:
-            registration_deadline = registration_deadline.replace(tzinfo=None)
-        
-        # Get the first session date
-        first_session_date = ClassModel._get_first_weekday_after_date(
-            registration_deadline, 
-            week_day
-        )
-        
-        sessions_created = []
-        
-        # Create sessions for each week
-        for week_num in range(num_of_weeks):
-            session_date = first_session_date + timedelta(weeks=week_num)
-            session_id = week_num + 1
-            
-            insert_session_query = """
-                INSERT INTO sessions (
-                    class_id,
-                    session_id,
-                    session_date,
-                    session_status,
-                    location,
-                    start_time,
-                    end_time,
-                    week_day,
-                    created_at,
-                    updated_at
-                )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW(), NOW())
-                RETURNING class_id, session_id, session_date
-            """
-            
-            insert_result = await db.execute_query(
-                insert_session_query,
+        insert_session_query = """
+            INSERT INTO sessions (
                 class_id,
                 session_id,
-                session_date.date(),
-                'scheduled',
+                session_date,
+                session_status,
                 location,
                 start_time,
                 end_time,
+                week_day,
+                created_at,
+                updated_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW(), NOW())
+            RETURNING class_id, session_id, session_date
+        """
+
+        # The class row lock serializes concurrent generation for the same class;
+        # all weeks are inserted on one connection and commit (or roll back) together
+        async with db.unit_of_work() as uow:
+            class_data = await uow.execute_single(get_class_query, class_id)
+            
+            if not class_data:
+                return None
+            
+            # Check if class is confirmed
+            if class_data['class_status'] != 'confirmed':
+                return {
+                    "class_id": class_id,
+                    "sessions_created": 0,
+                    "error": f"Class status is '{class_data['class_status']}', not 'confirmed'"
+                }
+            
+            # Check if sessions already exist
+            existing_sessions = await uow.execute_single(check_sessions_query, class_id)
+            
+            if existing_sessions and existing_sessions['count'] > 0:
+                return {
+                    "class_id": class_id,
+                    "sessions_created": 0,
+                    "error": "Sessions already exist for this class"
+                }
+            
+            num_of_weeks = class_data['num_of_weeks']
+            week_day = class_data['week_day']
+            location = class_data['location']
+            start_time = class_data['start_time']
+            end_time = class_data['end_time']
+            registration_deadline = class_data['registration_deadline']
+            
+            # Handle timezone for registration_deadline
+            if registration_deadline.tzinfo is not None:
+                registration_deadline = registration_deadline.replace(tzinfo=None)
+            
+            # Get the first session date
+            first_session_date = ClassModel._get_first_weekday_after_date(
+                registration_deadline, 
                 week_day
             )
             
-            if insert_result:
-                sessions_created.append({
-                    "session_id": session_id,
-                    "session_date": str(session_date.date())
-                })
+            sessions_created = []
+            
+            # Create sessions for each week
+            for week_num in range(num_of_weeks):
+                session_date = first_session_date + timedelta(weeks=week_num)
+                session_id = week_num + 1
+                
+                insert_result = await uow.execute_single(
+                    insert_session_query,
+                    class_id,
+                    session_id,
+                    session_date.date(),
+                    'scheduled',
+                    location,
+                    start_time,
+                    end_time,
+                    week_day
+                )
+                
+                if insert_result:
+                    sessions_created.append({
+                        "session_id": session_id,
+                        "session_date": str(session_date.date())
+                    })
         
         return {
             "class_id": class_id,
             "sessions_created": len(sessions_created),
             "sessions": sessions_created
-        }
\ No newline at end of file
+        }
@@ -93,5 +93,7 @@ class LearningResource:
                 print(f"Error deleting file from storage: {e}")
         
         # Delete from database (first from class_resources due to foreign key constraint)
-        await db.execute_command("DELETE FROM class_resources WHERE resource_id = $1", resource_id)
-        await db.execute_command("DELETE FROM learning_resources WHERE id = $1", resource_id)
\ No newline at end of file
+        # in one transaction, so a failure cannot leave the resource half-detached
+        async with db.unit_of_work() as uow:
+            await uow.execute_command("DELETE FROM class_resources WHERE resource_id = $1", resource_id)
+            await uow.execute_command("DELETE FROM learning_resources WHERE id = $1", resource_id)
\ No newline at end of file
@@ -0,0 +1,273 @@
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+from uuid import UUID
+import random
+import secrets
+
+from db.database import db
+from models.timetableModel import TimetableModel
+
+
+class LotteryModel:
+    @staticmethod
+    async def create_lottery(
+        created_by: str,
+        closes_at: datetime,
+        class_id: Optional[int] = None,
+        semester: Optional[str] = None,
+        opens_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        query = """
+            INSERT INTO registration_lotteries (class_id, semester, opens_at, closes_at, seed, created_by)
+            VALUES ($1, $2, COALESCE($3, NOW()), $4, $5, $6)
+            RETURNING id, class_id, semester, opens_at, closes_at, status, created_at
+        """
+        # 63-bit seed fits BIGINT; it is kept so a draw can be audited and replayed
+        return await db.execute_single(
+            query, class_id, semester, opens_at, closes_at, secrets.randbits(63), created_by
+        )
+
+    @staticmethod
+    async def get_lottery_for_class(class_id: int) -> Optional[Dict[str, Any]]:
+        """
+        The not-yet-drawn lottery covering a class (class-level wins over semester-level), if any
+        """
+        query = """
+            SELECT
+                l.id,
+                l.closes_at,
+                (l.closes_at <= NOW()) as closed
+            FROM classes c
+            JOIN registration_lotteries l
+                ON l.status = 'open'
+                AND l.opens_at <= NOW()
+                AND (l.class_id = c.id OR (l.class_id IS NULL AND l.semester = c.semester::TEXT))
+            WHERE c.id = $1
+            ORDER BY l.class_id NULLS LAST, l.id
+            LIMIT 1
+        """
+        return await db.execute_single(query, class_id)
+
+    @staticmethod
+    async def record_entry(lottery_id: int, class_id: int, mentee_id: str) -> Dict[str, Any]:
+        """
+        Record a lottery entry; repeating the request is a no-op
+        """
+        query = """
+            INSERT INTO lottery_entries (lottery_id, class_id, mentee_id)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (lottery_id, class_id, mentee_id) DO NOTHING
+            RETURNING entered_at
+        """
+        inserted = await db.execute_single(query, lottery_id, class_id, mentee_id)
+        return {
+            "success": True,
+            "message": "Lottery entry recorded" if inserted else "Lottery entry already recorded",
+            "data": {
+                "lottery_id": lottery_id,
+                "class_id": class_id,
+                "mentee_id": mentee_id,
+                "status": "pending"
+            }
+        }
+
+    @staticmethod
+    async def get_entries_by_mentee(lottery_id: int, mentee_id: str) -> List[Dict[str, Any]]:
+        query = """
+            SELECT lottery_id, class_id, mentee_id, entered_at, COALESCE(result, 'pending') as result
+            FROM lottery_entries
+            WHERE lottery_id = $1 AND mentee_id = $2
+            ORDER BY class_id
+        """
+        return await db.execute_query(query, lottery_id, mentee_id)
+
+    @staticmethod
+    async def draw_lottery(lottery_id: int) -> Dict[str, Any]:
+        """
+        Assign seats for every entry of a closed lottery in one transaction.
+        Entries are shuffled with the lottery seed and admitted greedily while the class
+        has seats, the mentee holds no class of that subject in the semester and the
+        class fits the mentee's occupancy grid (grids are updated as seats are given).
+        Entries made after the class's registration_deadline are not admitted, and a
+        class without a capacity counts as full.
+        """
+        async with db.unit_of_work() as uow:
+            lottery = await uow.execute_single(
+                """
+                SELECT id, status, seed, (closes_at > NOW()) as still_open
+                FROM registration_lotteries
+                WHERE id = $1
+                FOR UPDATE
+                """,
+                lottery_id
+            )
+            if not lottery:
+                return {"success": False, "error": "Lottery not found"}
+            if lottery["status"] != "open":
+                return {"success": False, "error": "Lottery has already been drawn"}
+            if lottery["still_open"]:
+                return {"success": False, "error": "Lottery is still open"}
+
+            entries = await uow.fetch_records(
+                """
+                SELECT
+                    e.class_id,
+                    e.mentee_id,
+                    COALESCE(e.entered_at > c.registration_deadline, FALSE) as late
+                FROM lottery_entries e
+                LEFT JOIN classes c ON e.class_id = c.id
+                WHERE e.lottery_id = $1
+                ORDER BY e.class_id, e.mentee_id
+                """,
+                lottery_id
+            )
+            class_ids = sorted({entry["class_id"] for entry in entries})
+            mentee_ids = list({entry["mentee_id"] for entry in entries})
+            late = {(entry["class_id"], entry["mentee_id"]) for entry in entries if entry["late"]}
+
+            # Lock every class involved, in id order like reschedule_registration()
+            classes = {
+                row["id"]: dict(row) for row in await uow.fetch_records(
+                    """
+                    SELECT
+                        id,
+                        subject_id,
+                        semester::TEXT as semester,
+                        week_day::TEXT as week_day,
+                        start_time,
+                        end_time,
+                        capacity,
+                        current_enrolled
+                    FROM classes
+                    WHERE id = ANY($1::int[])
+                    ORDER BY id
+                    FOR UPDATE
+                    """,
+                    class_ids
+                )
+            }
+            semesters = list({c["semester"] for c in classes.values()})
+
+            grids: Dict[Tuple[UUID, str], int] = {
+                (row["user_id"], row["semester"]): int(row["slots"], 2)
+                for row in await uow.fetch_records(
+                    """
+                    SELECT user_id, semester, slots::TEXT as slots
+                    FROM timetable_occupancy
+                    WHERE role = 'mentee'
+                    AND user_id = ANY($1::uuid[])
+                    AND semester = ANY($2::text[])
+                    """,
+                    mentee_ids,
+                    semesters
+                )
+            }
+            taken = {
+                (row["mentee_id"], row["semester"], row["subject_id"])
+                for row in await uow.fetch_records(
+                    """
+                    SELECT DISTINCT cr.mentee_id, c.semester::TEXT as semester, c.subject_id
+                    FROM class_registrations cr
+                    JOIN classes c ON cr.class_id = c.id
+                    WHERE cr.mentee_id = ANY($1::uuid[])
+                    AND c.semester::TEXT = ANY($2::text[])
+                    """,
+                    mentee_ids,
+                    semesters
+                )
+            }
+
+            # One pass over the shuffled entries
+            order = [(entry["class_id"], entry["mentee_id"]) for entry in entries]
+            random.Random(lottery["seed"]).shuffle(order)
+
+            seats = {
+                class_id: c["capacity"] - (c["current_enrolled"] or 0) if c["capacity"] is not None else 0
+                for class_id, c in classes.items()
+            }
+            admitted: Dict[int, int] = {}
+            results: Dict[str, List[Any]] = {"class_id": [], "mentee_id": [], "result": []}
+            for class_id, mentee_id in order:
+                class_data = classes.get(class_id)
+                if class_data is None:
+                    result = "class_not_found"
+                else:
+                    grid_key = (mentee_id, class_data["semester"])
+                    subject_key = (mentee_id, class_data["semester"], class_data["subject_id"])
+                    mask = TimetableModel.class_mask(
+                        class_data["week_day"], class_data["start_time"], class_data["end_time"], "mentee"
+                    )
+                    if (class_id, mentee_id) in late:
+                        result = "deadline_passed"
+                    elif seats[class_id] <= 0:
+                        result = "class_full"
+                    elif subject_key in taken:
+                        result = "subject_taken"
+                    elif grids.get(grid_key, 0) & mask:
+                        result = "time_conflict"
+                    else:
+                        result = "admitted"
+                        seats[class_id] -= 1
+                        admitted[class_id] = admitted.get(class_id, 0) + 1
+                        taken.add(subject_key)
+                        grids[grid_key] = grids.get(grid_key, 0) | mask
+                results["class_id"].append(class_id)
+                results["mentee_id"].append(mentee_id)
+                results["result"].append(result)
+
+            # Bulk writes: registrations, one counter update per class, entry results
+            await uow.execute_command(
+                """
+                INSERT INTO class_registrations (class_id, mentee_id, registration_log)
+                SELECT r.class_id, r.mentee_id, NOW()
+                FROM unnest($1::int[], $2::uuid[], $3::text[]) AS r(class_id, mentee_id, result)
+                WHERE r.result = 'admitted'
+                """,
+                results["class_id"],
+                results["mentee_id"],
+                results["result"]
+            )
+            await uow.execute_command(
+                """
+                UPDATE classes c
+                SET current_enrolled = COALESCE(c.current_enrolled, 0) + a.admitted
+                FROM unnest($1::int[], $2::int[]) AS a(class_id, admitted)
+                WHERE c.id = a.class_id
+                """,
+                list(admitted.keys()),
+                list(admitted.values())
+            )
+            await uow.execute_command(
+                """
+                UPDATE lottery_entries e
+                SET result = r.result
+                FROM unnest($2::int[], $3::uuid[], $4::text[]) AS r(class_id, mentee_id, result)
+                WHERE e.lottery_id = $1
+                AND e.class_id = r.class_id
+                AND e.mentee_id = r.mentee_id
+                """,
+                lottery_id,
+                results["class_id"],
+                results["mentee_id"],
+                results["result"]
+            )
+            await uow.execute_command(
+                "UPDATE registration_lotteries SET status = 'drawn', drawn_at = NOW() WHERE id = $1",
+                lottery_id
+            )
+
+        outcome: Dict[str, int] = {}
+        for result in results["result"]:
+            outcome[result] = outcome.get(result, 0) + 1
+        return {
+            "success": True,
+            "message": "Lottery drawn successfully",
+            "data": {
+                "lottery_id": lottery_id,
+                "entries": len(order),
+                "outcome": outcome,
+                "admitted_per_class": [
+                    {"class_id": class_id, "admitted": count} for class_id, count in sorted(admitted.items())
+                ]
+            }
+        }
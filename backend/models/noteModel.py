@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
 from db.database import db
+from asyncpg import Record  # type: ignore
 
 
 class NoteModel:
@@ -63,7 +64,7 @@ class NoteModel:
         return result[0] if result else None
 
     @staticmethod
-    async def get_notes_by_session(class_id: int, session_id: int) -> List[Dict[str, Any]]:
+    async def get_notes_by_session(class_id: int, session_id: int) -> List[Record]:
         """
         Get all notes for a specific session
         """
@@ -83,10 +84,10 @@ class NoteModel:
             WHERE n.class_id = $1 AND n.session_id = $2
             ORDER BY n.id DESC
         """
-        return await db.execute_query(query, class_id, session_id)
+        return await db.fetch_records(query, class_id, session_id)
 
     @staticmethod
-    async def get_notes_by_class(class_id: int) -> List[Dict[str, Any]]:
+    async def get_notes_by_class(class_id: int) -> List[Record]:
         """
         Get all notes for a specific class
         """
@@ -106,7 +107,7 @@ class NoteModel:
             WHERE n.class_id = $1
             ORDER BY n.session_id ASC, n.id DESC
         """
-        return await db.execute_query(query, class_id)
+        return await db.fetch_records(query, class_id)
 
     @staticmethod
     async def update_note(note_id: int, note_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
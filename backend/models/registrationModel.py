@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
 from db.database import db
+from models.timetableModel import TimetableModel
 from datetime import datetime, timezone
 
 class RegistrationModel:
@@ -9,6 +10,7 @@ class RegistrationModel:
         Register a mentee for a class
         """
         # Check if class exists and has space
+        # The class row is locked so concurrent registrations cannot overfill it
         class_query = """
             SELECT 
                 id,
@@ -20,14 +22,8 @@ class RegistrationModel:
                 (registration_deadline < NOW()) as deadline_passed
             FROM classes
             WHERE id = $1
+            FOR UPDATE
         """
-        class_info = await db.execute_query(class_query, class_id)
-        
-        if not class_info:
-            return {"success": False, "error": "Class not found"}
-        
-        class_data = class_info[0]
-
         # Check if already registered for the SAME SUBJECT in SAME SEMESTER
         conflict_query = """
             SELECT 
@@ -41,56 +37,61 @@ class RegistrationModel:
             AND c1.semester = $2
             AND c1.subject_id = $3
         """
-        conflicts = await db.execute_query(
-            conflict_query, 
-            mentee_id, 
-            class_data['semester'],
-            class_data['subject_id']  # Thêm subject_id
-        )
-        
-        if conflicts:
-            conflict_info = conflicts[0]
-            return {
-                "success": False,
-                "error": f"Already registered for {conflict_info['subject_code']} - {conflict_info['subject_name']} (Class ID: {conflict_info['conflicting_class_id']}) in semester {class_data['semester']}"
-            }
-
-        # Check if registration deadline has passed
-        # Để PostgreSQL tự xử lý timezone comparison
-        if class_data['registration_deadline'] and class_data['deadline_passed']:
-            return {"success": False, "error": "Registration deadline has passed"}
-        
-        # Check if class is full
-        if class_data['current_enrolled'] >= class_data['capacity']:
-            return {"success": False, "error": "Class is full"}
-        
-        # Check if already registered
         check_query = """
             SELECT class_id, mentee_id FROM class_registrations
             WHERE class_id = $1 AND mentee_id = $2
         """
-        existing = await db.execute_query(check_query, class_id, mentee_id)
-        
-        if existing:
-            return {"success": False, "error": "Already registered for this class"}
-        
-        # Insert registration
         insert_query = """
             INSERT INTO class_registrations (class_id, mentee_id, registration_log)
             VALUES ($1, $2, NOW())
             RETURNING class_id, mentee_id, registration_log
         """
-        result = await db.execute_query(insert_query, class_id, mentee_id)
-        
-        # Update class enrollment count
         update_query = """
             UPDATE classes
             SET current_enrolled = current_enrolled + 1
             WHERE id = $1
         """
-        await db.execute_query(update_query, class_id)
-        
-        return {"success": True, "data": result[0]}
+
+        # One connection, one transaction: checks, insert and counter update commit together
+        async with db.unit_of_work() as uow:
+            class_data = await uow.execute_single(class_query, class_id)
+            
+            if not class_data:
+                return {"success": False, "error": "Class not found"}
+
+            conflicts = await uow.execute_query(
+                conflict_query, 
+                mentee_id, 
+                class_data['semester'],
+                class_data['subject_id']  # Thêm subject_id
+            )
+            
+            if conflicts:
+                conflict_info = conflicts[0]
+                return {
+                    "success": False,
+                    "error": f"Already registered for {conflict_info['subject_code']} - {conflict_info['subject_name']} (Class ID: {conflict_info['conflicting_class_id']}) in semester {class_data['semester']}"
+                }
+
+            # Check if registration deadline has passed
+            # Để PostgreSQL tự xử lý timezone comparison
+            if class_data['registration_deadline'] and class_data['deadline_passed']:
+                return {"success": False, "error": "Registration deadline has passed"}
+            
+            # Check if class is full
+            if class_data['current_enrolled'] >= class_data['capacity']:
+                return {"success": False, "error": "Class is full"}
+            
+            # Check if already registered
+            existing = await uow.execute_single(check_query, class_id, mentee_id)
+            
+            if existing:
+                return {"success": False, "error": "Already registered for this class"}
+            
+            result = await uow.execute_single(insert_query, class_id, mentee_id)
+            await uow.execute_command(update_query, class_id)
+        
+        return {"success": True, "data": result}
     
     @staticmethod
     async def cancel_registration(class_id: int, mentee_id: str) -> Dict[str, Any]:
@@ -108,38 +109,55 @@ class RegistrationModel:
             JOIN classes c ON cr.class_id = c.id
             WHERE cr.class_id = $1 AND cr.mentee_id = $2
         """
-        existing = await db.execute_query(check_query, class_id, mentee_id)
-        
-        if not existing:
-            return {"success": False, "error": "Registration not found"}
-        
-        reg_data = existing[0]
-        
-        # Check if registration deadline has passed
-        if reg_data['registration_deadline'] and reg_data['deadline_passed']:
-            return {
-                "success": False, 
-                "error": "Cannot cancel registration - registration deadline has passed"
-            }
-        
-        # Delete registration
+        # Delete registration, free the seat and hand it to the waitlist head atomically
         delete_query = """
             DELETE FROM class_registrations
             WHERE class_id = $1 AND mentee_id = $2
             RETURNING class_id, mentee_id
         """
-        result = await db.execute_query(delete_query, class_id, mentee_id)
-        
-        # Decrease class enrollment count
         decrease_query = """
             UPDATE classes
             SET current_enrolled = current_enrolled - 1
             WHERE id = $1 AND current_enrolled > 0
         """
-        await db.execute_query(decrease_query, class_id)
-        
-        return {"success": True, "data": result[0]}
+        async with db.unit_of_work() as uow:
+            reg_data = await uow.execute_single(check_query, class_id, mentee_id)
+            
+            if not reg_data:
+                return {"success": False, "error": "Registration not found"}
+            
+            # Check if registration deadline has passed
+            if reg_data['registration_deadline'] and reg_data['deadline_passed']:
+                return {
+                    "success": False, 
+                    "error": "Cannot cancel registration - registration deadline has passed"
+                }
+
+            deleted = await uow.execute_single(delete_query, class_id, mentee_id)
+            if not deleted:
+                return {"success": False, "error": "Registration not found"}
+
+            await uow.execute_command(decrease_query, class_id)
+            promoted_mentee_id = await uow.fetch_value(
+                "SELECT promote_waitlist_head($1)", class_id
+            )
+
+        data = deleted
+        data["promoted_mentee_id"] = promoted_mentee_id
+        return {"success": True, "data": data}
     
+    # Status codes returned by reschedule_registration() -> API error messages
+    RESCHEDULE_ERRORS = {
+        "class_not_found": "One or both classes not found",
+        "subject_mismatch": "Both classes must be in the same subject",
+        "registration_not_found": "Original registration not found",
+        "old_deadline_passed": "Cannot reschedule - registration deadline for current class has passed",
+        "new_deadline_passed": "Registration deadline for new class has passed",
+        "new_class_full": "New class is full",
+        "already_registered": "Already registered for the new class",
+        "time_conflict": "Time conflict with other registered classes"
+    }
+
     @staticmethod
     async def reschedule_class(
         old_class_id: int, 
@@ -147,163 +165,29 @@ class RegistrationModel:
         mentee_id: str
     ) -> Dict[str, Any]:
         """
-        Reschedule from old class to new class
-        Steps:
-        1. Validate old registration exists
-        2. Check old class deadline hasn't passed
-        3. Validate new class exists and has space
-        4. Check new class deadline hasn't passed
-        5. Check no time conflict with other classes (excluding old class)
-        6. Update registration (atomic operation)
+        Reschedule from old class to new class in one atomic round trip.
+        reschedule_registration() (see system_schema.sql) locks both class rows in id order, then:
+        1. Validate both classes exist and share the subject
+        2. Validate old registration exists and its deadline hasn't passed
+        3. Check new class deadline and capacity
+        4. Check no time conflict with other classes (excluding old class)
+        5. Move the registration and adjust both enrollment counts
         """
-
-        # check 2 class have same subject id
-        subject_check_query = """
-            SELECT 
-                c1.subject_id as old_subject_id,
-                c2.subject_id as new_subject_id 
-            FROM classes c1
-            CROSS JOIN classes c2
-            WHERE c1.id = $1 AND c2.id = $2
-            """
-        subject_check = await db.execute_query(subject_check_query, old_class_id, new_class_id)
-        
-        if not subject_check:
-            return {"success": False, "error": "One or both classes not found"}
-
-        subject_data = subject_check[0]
-        if subject_data['old_subject_id'] != subject_data['new_subject_id']:
-            return {"success": False, "error": "Both classes must be in the same subject"}
-        
-        # Step 1 & 2: Check old registration and deadline
-        old_class_query = """
-            SELECT 
-                cr.class_id,
-                cr.mentee_id,
-                cr.registration_log,
-                c.registration_deadline,
-                (c.registration_deadline < NOW()) as deadline_passed
-            FROM class_registrations cr
-            JOIN classes c ON cr.class_id = c.id
-            WHERE cr.class_id = $1 AND cr.mentee_id = $2
-        """
-        old_registration = await db.execute_query(old_class_query, old_class_id, mentee_id)
-        
-        if not old_registration:
-            return {"success": False, "error": "Original registration not found"}
-        
-        old_reg_data = old_registration[0]
-        
-        # Check if old class deadline has passed
-        if old_reg_data['registration_deadline'] and old_reg_data['deadline_passed']:
-            return {
-                "success": False, 
-                "error": "Cannot reschedule - registration deadline for current class has passed"
-            }
-        
-        # Step 3: Check new class exists and has space
-        new_class_query = """
-            SELECT 
-                id, 
-                capacity, 
-                current_enrolled,
-                registration_deadline,
-                (registration_deadline < NOW()) as deadline_passed,
-                week_day,
-                semester,
-                start_time,
-                end_time
-            FROM classes
-            WHERE id = $1
-        """
-        new_class_info = await db.execute_query(new_class_query, new_class_id)
-        
-        if not new_class_info:
-            return {"success": False, "error": "New class not found"}
-        
-        new_class_data = new_class_info[0]
-        
-        # Step 4: Check new class deadline
-        if new_class_data['registration_deadline'] and new_class_data['deadline_passed']:
-            return {"success": False, "error": "Registration deadline for new class has passed"}
-        
-        # Check if new class is full
-        if new_class_data['current_enrolled'] >= new_class_data['capacity']:
-            return {"success": False, "error": "New class is full"}
-        
-        # Check if already registered in new class
-        check_new_query = """
-            SELECT class_id FROM class_registrations
-            WHERE class_id = $1 AND mentee_id = $2
-        """
-        existing_new = await db.execute_query(check_new_query, new_class_id, mentee_id)
-        
-        if existing_new:
-            return {"success": False, "error": "Already registered for the new class"}
-        
-        # Step 5: Check time conflict (excluding old class)
-        conflict_query = """
-            SELECT DISTINCT
-                c1.id as conflicting_class_id,
-                s1.subject_name as conflicting_subject,
-                s1.subject_code as conflicting_subject_code,
-                c1.week_day,
-                c1.start_time as conflicting_start_time,
-                c1.end_time as conflicting_end_time
-            FROM class_registrations cr
-            JOIN classes c1 ON cr.class_id = c1.id
-            JOIN subjects s1 ON c1.subject_id = s1.id
-            WHERE cr.mentee_id = $1
-            AND c1.id != $2  -- Exclude old class
-            AND c1.week_day = $3
-            AND (
-                c1.start_time <= $5 AND c1.end_time >= $4
-            )
+        query = """
+            SELECT status, rescheduled_at, conflicts
+            FROM reschedule_registration($1, $2, $3)
         """
-        conflicts = await db.execute_query(
-            conflict_query,
-            mentee_id,
-            old_class_id,
-            new_class_data['week_day'],
-            new_class_data['start_time'],
-            new_class_data['end_time']
-        )
+        result = await db.execute_single(query, mentee_id, old_class_id, new_class_id)
 
-        if conflicts:
-            return {
+        if result["status"] != "rescheduled":
+            error = {
                 "success": False,
-                "error": "Time conflict with other registered classes",
-                "conflicts": conflicts
+                "error": RegistrationModel.RESCHEDULE_ERRORS.get(result["status"], "Reschedule failed")
             }
-        
-        # Step 6: Atomic update - reschedule
-        # Update registration to new class
-        update_query = """
-            UPDATE class_registrations
-            SET class_id = $1, registration_log = NOW()
-            WHERE class_id = $2 AND mentee_id = $3
-            RETURNING class_id, mentee_id, registration_log
-        """
-        result = await db.execute_query(update_query, new_class_id, old_class_id, mentee_id)
-        
-        # Update enrollment counts
-        # Decrease old class
-        decrease_query = """
-            UPDATE classes
-            SET current_enrolled = current_enrolled - 1
-            WHERE id = $1 AND current_enrolled > 0
-        """
-        await db.execute_query(decrease_query, old_class_id)
-        
-        # Increase new class
-        increase_query = """
-            UPDATE classes
-            SET current_enrolled = current_enrolled + 1
-            WHERE id = $1
-        """
+            if result["conflicts"]:
+                error["conflicts"] = result["conflicts"]
+            return error
 
-        await db.execute_query(increase_query, new_class_id)
-        
         return {
             "success": True,
             "message": "Successfully rescheduled",
@@ -311,7 +195,7 @@ class RegistrationModel:
                 "old_class_id": old_class_id,
                 "new_class_id": new_class_id,
                 "mentee_id": mentee_id,
-                "rescheduled_at": result[0]['registration_log']
+                "rescheduled_at": result['rescheduled_at']
             }
         }
     
@@ -348,11 +232,26 @@ class RegistrationModel:
         registrations = await db.execute_query(query, mentee_id)
         return registrations
 
+    @staticmethod
+    async def get_class_ids_by_mentee(mentee_id: str) -> List[int]:
+        """
+        Ids of the classes a mentee is registered in
+        """
+        query = "SELECT class_id FROM class_registrations WHERE mentee_id = $1"
+        rows = await db.execute_query(query, mentee_id)
+        return [row["class_id"] for row in rows]
+
     @staticmethod
     async def check_time_conflict(mentee_id: str, class_id: int) -> Dict[str, Any]:
         """
         Check if registering for a class would create a time conflict
         """
+        # Fast path: one AND against the occupancy grid proves there is no conflict.
+        # Only when it overlaps (or no grid exists) do we need the detailed query.
+        busy = await TimetableModel.class_overlaps_mentee(mentee_id, class_id)
+        if busy is False:
+            return {"has_conflict": False, "conflicts": []}
+
         query = """
             SELECT DISTINCT
                 c1.id as conflicting_class_id,
@@ -387,6 +286,259 @@ class RegistrationModel:
             "conflicts": conflicts
         }
 
+    # Reasons a bulk registration row can be rejected (report codes)
+    BULK_REJECT_REASONS = {
+        "class_not_found": "Class not found",
+        "mentee_not_found": "Mentee not found",
+        "duplicate_row": "Duplicate of an earlier row",
+        "already_registered": "Already registered for this class",
+        "deadline_passed": "Registration deadline has passed",
+        "subject_taken": "Already registered for this subject in the semester",
+        "time_conflict": "Time conflict with registered classes",
+        "subject_in_batch": "Same subject as an earlier row for this mentee",
+        "time_conflict_in_batch": "Time conflict with an earlier row for this mentee",
+        "class_full": "Class is full"
+    }
+
+    @staticmethod
+    async def bulk_register(rows: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Enroll many (mentee, class) pairs at once.
+        rows: (row_no, mentee_id UUID, class_id int). Database checks run set-wise over a
+        temp table; then one pass in row order settles in-batch subject/time clashes and
+        seats against the rows accepted so far, so a rejected row never blocks a later one.
+        Accepted rows are COPY'd into class_registrations and current_enrolled is bumped
+        once per class. Returns one {"row", "mentee_id", "class_id", "status", "reason"} per row.
+        """
+        validation_query = """
+            WITH src AS (
+                SELECT
+                    b.row_no,
+                    b.mentee_id,
+                    b.class_id,
+                    c.id IS NOT NULL as class_exists,
+                    m.user_id IS NOT NULL as mentee_exists,
+                    c.subject_id,
+                    c.semester::TEXT as semester,
+                    c.capacity,
+                    c.current_enrolled,
+                    (c.registration_deadline < NOW()) as deadline_passed,
+                    timetable_class_mask(c.week_day, c.start_time, c.end_time, 'mentee') as mask
+                FROM bulk_registrations b
+                LEFT JOIN classes c ON c.id = b.class_id
+                LEFT JOIN mentee m ON m.user_id = b.mentee_id
+            ),
+            checked AS (
+                SELECT
+                    s.*,
+                    CASE
+                        WHEN NOT s.class_exists THEN 'class_not_found'
+                        WHEN NOT s.mentee_exists THEN 'mentee_not_found'
+                        WHEN EXISTS (
+                            SELECT 1 FROM bulk_registrations d
+                            WHERE d.mentee_id = s.mentee_id AND d.class_id = s.class_id AND d.row_no < s.row_no
+                        ) THEN 'duplicate_row'
+                        WHEN EXISTS (
+                            SELECT 1 FROM class_registrations cr
+                            WHERE cr.class_id = s.class_id AND cr.mentee_id = s.mentee_id
+                        ) THEN 'already_registered'
+                        WHEN s.deadline_passed THEN 'deadline_passed'
+                        WHEN EXISTS (
+                            SELECT 1 FROM class_registrations cr
+                            JOIN classes c2 ON c2.id = cr.class_id
+                            WHERE cr.mentee_id = s.mentee_id
+                            AND c2.semester::TEXT = s.semester
+                            AND c2.subject_id = s.subject_id
+                        ) THEN 'subject_taken'
+                        WHEN EXISTS (
+                            SELECT 1 FROM timetable_occupancy o
+                            WHERE o.user_id = s.mentee_id
+                            AND o.semester = s.semester
+                            AND o.role = 'mentee'
+                            AND (o.slots & s.mask) <> repeat('0', 105)::BIT(105)
+                        ) THEN 'time_conflict'
+                    END as reason
+                FROM src s
+            )
+            SELECT
+                row_no,
+                mentee_id,
+                class_id,
+                subject_id,
+                semester,
+                capacity,
+                current_enrolled,
+                mask::TEXT as mask,
+                reason
+            FROM checked
+            ORDER BY row_no
+        """
+        async with db.unit_of_work() as uow:
+            await uow.execute_command("""
+                CREATE TEMP TABLE bulk_registrations (
+                    row_no INTEGER PRIMARY KEY,
+                    mentee_id UUID NOT NULL,
+                    class_id INTEGER NOT NULL
+                ) ON COMMIT DROP
+            """)
+            await uow.copy_records_to_table(
+                "bulk_registrations",
+                records=rows,
+                columns=["row_no", "mentee_id", "class_id"]
+            )
+            await uow.execute_command("ANALYZE bulk_registrations")
+
+            # Lock the target classes (id order) so capacity cannot move under us
+            await uow.execute_command("""
+                SELECT id FROM classes
+                WHERE id IN (SELECT DISTINCT class_id FROM bulk_registrations)
+                ORDER BY id
+                FOR UPDATE
+            """)
+
+            # In-batch rules in row order, against accepted rows only (like draw_lottery)
+            checked = []
+            taken = set()
+            grids: Dict[tuple, int] = {}
+            seats: Dict[int, int] = {}
+            for row in await uow.fetch_records(validation_query):
+                reason = row["reason"]
+                if reason is None:
+                    subject_key = (row["mentee_id"], row["semester"], row["subject_id"])
+                    grid_key = (row["mentee_id"], row["semester"])
+                    mask = int(row["mask"], 2) if row["mask"] else 0
+                    # A class without a capacity takes no one
+                    seats.setdefault(
+                        row["class_id"],
+                        row["capacity"] - (row["current_enrolled"] or 0) if row["capacity"] is not None else 0
+                    )
+                    if subject_key in taken:
+                        reason = "subject_in_batch"
+                    elif grids.get(grid_key, 0) & mask:
+                        reason = "time_conflict_in_batch"
+                    elif seats[row["class_id"]] <= 0:
+                        reason = "class_full"
+                    else:
+                        taken.add(subject_key)
+                        grids[grid_key] = grids.get(grid_key, 0) | mask
+                        seats[row["class_id"]] -= 1
+                checked.append({
+                    "row_no": row["row_no"],
+                    "mentee_id": row["mentee_id"],
+                    "class_id": row["class_id"],
+                    "reason": reason
+                })
+            accepted = [row for row in checked if row["reason"] is None]
+
+            if accepted:
+                registered_at = datetime.now(timezone.utc)
+                await uow.copy_records_to_table(
+                    "class_registrations",
+                    records=[(row["class_id"], row["mentee_id"], registered_at) for row in accepted],
+                    columns=["class_id", "mentee_id", "registration_log"]
+                )
+
+                per_class: Dict[int, int] = {}
+                for row in accepted:
+                    per_class[row["class_id"]] = per_class.get(row["class_id"], 0) + 1
+                await uow.execute_command(
+                    """
+                    UPDATE classes c
+                    SET current_enrolled = COALESCE(c.current_enrolled, 0) + a.accepted
+                    FROM unnest($1::int[], $2::int[]) AS a(class_id, accepted)
+                    WHERE c.id = a.class_id
+                    """,
+                    list(per_class.keys()),
+                    list(per_class.values())
+                )
+
+        return [
+            {
+                "row": row["row_no"],
+                "mentee_id": row["mentee_id"],
+                "class_id": row["class_id"],
+                "status": "accepted" if row["reason"] is None else "rejected",
+                "reason": RegistrationModel.BULK_REJECT_REASONS.get(row["reason"]) if row["reason"] else None
+            }
+            for row in checked
+        ]
+
+    @staticmethod
+    async def join_waitlist(class_id: int, mentee_id: str) -> Dict[str, Any]:
+        """
+        Queue a mentee for a full class
+        """
+        class_query = """
+            SELECT 
+                c.capacity,
+                c.current_enrolled,
+                (c.registration_deadline < NOW()) as deadline_passed,
+                EXISTS (
+                    SELECT 1 FROM class_registrations cr
+                    WHERE cr.class_id = c.id AND cr.mentee_id = $2
+                ) as registered
+            FROM classes c
+            WHERE c.id = $1
+        """
+        class_data = await db.execute_single(class_query, class_id, mentee_id)
+
+        if not class_data:
+            return {"success": False, "error": "Class not found"}
+        if class_data['registered']:
+            return {"success": False, "error": "Already registered for this class"}
+        if class_data['deadline_passed']:
+            return {"success": False, "error": "Registration deadline has passed"}
+        if class_data['current_enrolled'] < class_data['capacity']:
+            return {"success": False, "error": "Class is not full, register directly"}
+
+        insert_query = """
+            INSERT INTO class_waitlist (class_id, mentee_id)
+            VALUES ($1, $2)
+            ON CONFLICT (class_id, mentee_id) DO NOTHING
+            RETURNING joined_at
+        """
+        inserted = await db.execute_single(insert_query, class_id, mentee_id)
+        if not inserted:
+            return {"success": False, "error": "Already on the waitlist for this class"}
+
+        position = await RegistrationModel.get_waitlist_position(class_id, mentee_id)
+        return {"success": True, "data": position}
+
+    @staticmethod
+    async def leave_waitlist(class_id: int, mentee_id: str) -> Dict[str, Any]:
+        query = """
+            DELETE FROM class_waitlist
+            WHERE class_id = $1 AND mentee_id = $2
+            RETURNING class_id, mentee_id
+        """
+        result = await db.execute_single(query, class_id, mentee_id)
+        if not result:
+            return {"success": False, "error": "Not on the waitlist for this class"}
+        return {"success": True, "data": result}
+
+    @staticmethod
+    async def get_waitlist_position(class_id: int, mentee_id: str) -> Optional[Dict[str, Any]]:
+        """
+        1-based position of the mentee in the class waitlist (index range scan on (class_id, id))
+        """
+        query = """
+            SELECT 
+                w.class_id,
+                w.mentee_id,
+                w.joined_at,
+                (
+                    SELECT COUNT(*) FROM class_waitlist ahead
+                    WHERE ahead.class_id = w.class_id AND ahead.id <= w.id
+                ) as position,
+                (
+                    SELECT COUNT(*) FROM class_waitlist total
+                    WHERE total.class_id = w.class_id
+                ) as waitlist_size
+            FROM class_waitlist w
+            WHERE w.class_id = $1 AND w.mentee_id = $2
+        """
+        return await db.execute_single(query, class_id, mentee_id)
+
     @staticmethod
     async def get_mentees_by_class(class_id: int) -> List[Dict[str, Any]]:
         """
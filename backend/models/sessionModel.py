@@ -1,43 +1,166 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+from datetime import date
 from db.database import db
+from asyncpg import Record  # type: ignore
 
 
 class SessionModel:
     @staticmethod
-    async def get_sessions_by_mentee(mentee_id: str) -> List[Dict[str, Any]]:
+    def encode_cursor(session: Dict[str, Any]) -> str:
+        """Keyset cursor of a session row: <session_date>_<class_id>_<session_id>"""
+        return f"{session['session_date'].isoformat()}_{session['class_id']}_{session['session_id']}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[date, int, int]:
+        """Raises ValueError for a malformed cursor"""
+        session_date, class_id, session_id = cursor.split("_")
+        return date.fromisoformat(session_date), int(class_id), int(session_id)
+
+    @staticmethod
+    def _window(
+        conditions: List[str],
+        params: List[Any],
+        prefix: str,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        upcoming: bool,
+        after: Optional[Tuple[date, int, int]],
+        limit: Optional[int]
+    ) -> str:
         """
-        Get all sessions for a mentee (from classes they registered)
+        Append date window / keyset conditions and return the ORDER BY ... LIMIT tail.
+        Paged or upcoming reads are ordered by (session_date, class_id, session_id) so
+        the keyset predicate and the index agree; plain reads keep date, start_time order.
+        Sessions without a date cannot be placed on that keyset, so paged reads skip
+        them; they only show up in the plain listing.
         """
-        query = """
+        paged = limit is not None or after is not None or upcoming
+        if date_from is not None:
+            params.append(date_from)
+            conditions.append(f"{prefix}session_date >= ${len(params)}")
+        if date_to is not None:
+            params.append(date_to)
+            conditions.append(f"{prefix}session_date <= ${len(params)}")
+        if upcoming:
+            conditions.append(f"{prefix}session_date >= CURRENT_DATE")
+        if after is not None:
+            params.extend(after)
+            conditions.append(
+                f"({prefix}session_date, {prefix}class_id, {prefix}session_id) > "
+                f"(${len(params) - 2}, ${len(params) - 1}, ${len(params)})"
+            )
+
+        if not paged:
+            return f"ORDER BY {prefix}session_date ASC, {prefix}start_time ASC"
+
+        conditions.append(f"{prefix}session_date IS NOT NULL")
+
+        tail = f"ORDER BY {prefix}session_date ASC, {prefix}class_id ASC, {prefix}session_id ASC"
+        if limit is not None:
+            params.append(limit)
+            tail += f" LIMIT ${len(params)}"
+        return tail
+
+    @staticmethod
+    def _mentee_sessions_query(
+        mentee_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        upcoming: bool = False,
+        after: Optional[Tuple[date, int, int]] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[str, List[Any]]:
+        """Query and params behind get_sessions_by_mentee / stream_sessions_by_mentee"""
+        conditions = ["mentee_id = $1"]
+        params: List[Any] = [mentee_id]
+        tail = SessionModel._window(conditions, params, "", date_from, date_to, upcoming, after, limit)
+
+        query = f"""
             SELECT 
-                s.class_id,
-                s.session_id,
-                s.session_date,
-                s.session_status,
-                s.location,
-                s.start_time,
-                s.end_time,
-                s.week_day,
-                s.created_at,
-                s.updated_at,
-                c.semester,
-                c.class_status,
-                sub.subject_name,
-                sub.subject_code,
-                u.full_name as tutor_name,
-                u.email as tutor_email
-            FROM sessions s
-            JOIN classes c ON s.class_id = c.id
-            JOIN subjects sub ON c.subject_id = sub.id
-            LEFT JOIN "user" u ON c.tutor_id = u.id
-            JOIN class_registrations cr ON c.id = cr.class_id
-            WHERE cr.mentee_id = $1
-            ORDER BY s.session_date ASC, s.start_time ASC
+                class_id,
+                session_id,
+                session_date,
+                session_status,
+                location,
+                start_time,
+                end_time,
+                week_day,
+                created_at,
+                updated_at,
+                semester,
+                class_status,
+                subject_name,
+                subject_code,
+                tutor_name,
+                tutor_email
+            FROM mentee_schedule
+            WHERE {" AND ".join(conditions)}
+            {tail}
+        """
+        return query, params
+
+    @staticmethod
+    async def get_sessions_by_mentee(
+        mentee_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        upcoming: bool = False,
+        after: Optional[Tuple[date, int, int]] = None,
+        limit: Optional[int] = None
+    ) -> List[Record]:
+        """
+        Get sessions for a mentee (from classes they registered).
+        Reads the mentee_schedule projection (kept in sync by triggers), optionally
+        limited to session_date between date_from and date_to (inclusive), to sessions
+        from today on (upcoming) and/or to rows after a keyset cursor.
+        """
+        query, params = SessionModel._mentee_sessions_query(mentee_id, date_from, date_to, upcoming, after, limit)
+        return await db.fetch_records(query, *params)
+
+    @staticmethod
+    def stream_sessions_by_mentee(mentee_id: str) -> AsyncIterator[Record]:
+        """All sessions of the mentee through a cursor (used by the .ics feed)"""
+        query, params = SessionModel._mentee_sessions_query(mentee_id)
+        return db.stream(query, *params)
+
+    @staticmethod
+    async def get_schedule_stamp(user_id: str, role: str) -> Dict[str, Any]:
+        """
+        Version stamp of a user's schedule: row count and an md5 over every row's
+        identity and write time. Unlike MAX(updated_at) it changes when sessions are
+        swapped for others (reschedule) or names change, never moves backwards.
+        Mentees hash mentee_schedule.projected_at (rewritten on every refresh);
+        tutors hash the session and class timestamps plus the subject name/code.
         """
-        return await db.execute_query(query, mentee_id)
+        if role == "tutor":
+            query = """
+                SELECT
+                    COUNT(*) as count,
+                    md5(COALESCE(string_agg(
+                        format('%s:%s:%s:%s:%s:%s', s.class_id, s.session_id, s.updated_at,
+                               c.updated_at, sub.subject_code, sub.subject_name),
+                        ',' ORDER BY s.class_id, s.session_id
+                    ), '')) as version
+                FROM sessions s
+                JOIN classes c ON s.class_id = c.id
+                JOIN subjects sub ON c.subject_id = sub.id
+                WHERE c.tutor_id = $1
+            """
+        else:
+            query = """
+                SELECT
+                    COUNT(*) as count,
+                    md5(COALESCE(string_agg(
+                        format('%s:%s:%s', class_id, session_id, projected_at),
+                        ',' ORDER BY class_id, session_id
+                    ), '')) as version
+                FROM mentee_schedule
+                WHERE mentee_id = $1
+            """
+        return await db.execute_single(query, user_id)
 
     @staticmethod
-    async def get_sessions_by_mentee_and_class(mentee_id: str, class_id: int) -> List[Dict[str, Any]]:
+    async def get_sessions_by_mentee_and_class(mentee_id: str, class_id: int) -> List[Record]:
         """
         Get all sessions for a mentee in a specific class
         """
@@ -76,14 +199,23 @@ class SessionModel:
             WHERE s.class_id = $1
             ORDER BY s.session_date ASC, s.start_time ASC
         """
-        return await db.execute_query(query, class_id)
+        return await db.fetch_records(query, class_id)
 
     @staticmethod
-    async def get_sessions_by_tutor(tutor_id: str) -> List[Dict[str, Any]]:
-        """
-        Get all sessions for a tutor (from classes they teach)
-        """
-        query = """
+    def _tutor_sessions_query(
+        tutor_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        upcoming: bool = False,
+        after: Optional[Tuple[date, int, int]] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[str, List[Any]]:
+        """Query and params behind get_sessions_by_tutor / stream_sessions_by_tutor"""
+        conditions = ["c.tutor_id = $1"]
+        params: List[Any] = [tutor_id]
+        tail = SessionModel._window(conditions, params, "s.", date_from, date_to, upcoming, after, limit)
+
+        query = f"""
             SELECT 
                 s.class_id,
                 s.session_id,
@@ -104,13 +236,35 @@ class SessionModel:
             FROM sessions s
             JOIN classes c ON s.class_id = c.id
             JOIN subjects sub ON c.subject_id = sub.id
-            WHERE c.tutor_id = $1
-            ORDER BY s.session_date ASC, s.start_time ASC
+            WHERE {" AND ".join(conditions)}
+            {tail}
         """
-        return await db.execute_query(query, tutor_id)
+        return query, params
+
+    @staticmethod
+    async def get_sessions_by_tutor(
+        tutor_id: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        upcoming: bool = False,
+        after: Optional[Tuple[date, int, int]] = None,
+        limit: Optional[int] = None
+    ) -> List[Record]:
+        """
+        Get sessions for a tutor (from classes they teach), with the same
+        window/cursor options as get_sessions_by_mentee
+        """
+        query, params = SessionModel._tutor_sessions_query(tutor_id, date_from, date_to, upcoming, after, limit)
+        return await db.fetch_records(query, *params)
+
+    @staticmethod
+    def stream_sessions_by_tutor(tutor_id: str) -> AsyncIterator[Record]:
+        """All sessions of the tutor through a cursor (used by the .ics feed)"""
+        query, params = SessionModel._tutor_sessions_query(tutor_id)
+        return db.stream(query, *params)
 
     @staticmethod
-    async def get_sessions_by_tutor_and_class(tutor_id: str, class_id: int) -> List[Dict[str, Any]]:
+    async def get_sessions_by_tutor_and_class(tutor_id: str, class_id: int) -> List[Record]:
         """
         Get all sessions for a tutor in a specific class
         """
@@ -148,7 +302,7 @@ class SessionModel:
             WHERE s.class_id = $1
             ORDER BY s.session_date ASC, s.start_time ASC
         """
-        return await db.execute_query(query, class_id)
+        return await db.fetch_records(query, class_id)
 
     @staticmethod
     async def get_session_by_id(class_id: int, session_id: int) -> Optional[Dict[str, Any]]:
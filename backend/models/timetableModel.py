@@ -0,0 +1,104 @@
+from typing import List, Dict, Any, Optional
+from db.database import db
+
+# Weekly grid: 7 days x 15 periods (2..16), see timetable_occupancy in system_schema.sql
+WEEK_DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+FIRST_PERIOD = 2
+LAST_PERIOD = 16
+PERIODS_PER_DAY = LAST_PERIOD - FIRST_PERIOD + 1
+GRID_BITS = len(WEEK_DAYS) * PERIODS_PER_DAY
+
+
+class TimetableModel:
+    @staticmethod
+    async def has_overlap(
+        user_id: str,
+        semester: str,
+        role: str,
+        week_day: str,
+        start_time: int,
+        end_time: int
+    ) -> Optional[bool]:
+        """
+        AND a class slot against the user's occupancy grid.
+        Returns None when the user has no grid for the semester yet (caller must fall back).
+        """
+        query = """
+            SELECT (slots & timetable_class_mask($4::week_day, $5, $6, $3)) <> repeat('0', 105)::BIT(105) AS busy
+            FROM timetable_occupancy
+            WHERE user_id = $1 AND semester = $2 AND role = $3
+        """
+        row = await db.execute_single(query, user_id, str(semester), role, week_day, start_time, end_time)
+        return row["busy"] if row else None
+
+    @staticmethod
+    async def class_overlaps_mentee(mentee_id: str, class_id: int) -> Optional[bool]:
+        """
+        Same as has_overlap for a mentee and an existing class, in one round trip.
+        Note the grid includes the class itself if the mentee is already registered.
+        """
+        query = """
+            SELECT (o.slots & timetable_class_mask(c.week_day, c.start_time, c.end_time, 'mentee'))
+                   <> repeat('0', 105)::BIT(105) AS busy
+            FROM classes c
+            JOIN timetable_occupancy o
+                ON o.user_id = $1
+                AND o.semester = c.semester::TEXT
+                AND o.role = 'mentee'
+            WHERE c.id = $2
+        """
+        row = await db.execute_single(query, mentee_id, class_id)
+        return row["busy"] if row else None
+
+    @staticmethod
+    async def get_occupancy(user_id: str, semester: str, role: str) -> Optional[Dict[str, Any]]:
+        query = """
+            SELECT user_id, semester, role, slots::TEXT AS slots, updated_at
+            FROM timetable_occupancy
+            WHERE user_id = $1 AND semester = $2 AND role = $3
+        """
+        return await db.execute_single(query, user_id, str(semester), role)
+
+    @staticmethod
+    def class_mask(week_day: Optional[str], start_time: Optional[int], end_time: Optional[int], role: str) -> int:
+        """
+        Python twin of timetable_class_mask(): the class slot as an int whose binary
+        form (GRID_BITS wide) reads like the BIT(105) string, i.e. int(slots, 2)
+        """
+        # Unscheduled classes (NULL day or periods) occupy nothing, as in SQL
+        if week_day not in WEEK_DAYS or start_time is None or end_time is None:
+            return 0
+        last_period = max(start_time, end_time - 1) if role == "tutor" else end_time
+        first_period = max(start_time, FIRST_PERIOD)
+        last_period = min(last_period, LAST_PERIOD)
+        if first_period > last_period:
+            return 0
+        offset = WEEK_DAYS.index(week_day) * PERIODS_PER_DAY + first_period - FIRST_PERIOD
+        width = last_period - first_period + 1
+        return ((1 << width) - 1) << (GRID_BITS - offset - width)
+
+    @staticmethod
+    def decode_free_slots(slots: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Turn a 105-char bit string into free periods per day.
+        free_ranges groups consecutive free periods (both ends inclusive).
+        """
+        slots = slots or "0" * GRID_BITS
+        days = []
+        for day_index, week_day in enumerate(WEEK_DAYS):
+            day_bits = slots[day_index * PERIODS_PER_DAY:(day_index + 1) * PERIODS_PER_DAY]
+            free_periods = [FIRST_PERIOD + i for i, bit in enumerate(day_bits) if bit == "0"]
+
+            free_ranges = []
+            for period in free_periods:
+                if free_ranges and free_ranges[-1]["end_time"] == period - 1:
+                    free_ranges[-1]["end_time"] = period
+                else:
+                    free_ranges.append({"start_time": period, "end_time": period})
+
+            days.append({
+                "week_day": week_day,
+                "free_periods": free_periods,
+                "free_ranges": free_ranges
+            })
+        return days
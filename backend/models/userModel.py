@@ -1,6 +1,6 @@
 from typing import List, Dict, Any, Optional
 from db.database import db
-import bcrypt
+from middleware.password import password_hasher
 
 class UserModel:
     @staticmethod
@@ -22,50 +22,47 @@ class UserModel:
 
     @staticmethod
     async def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
-        # Hash password before storing
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(user_data["password"].encode('utf-8'), salt)
+        # Hash password before storing (off the event loop)
+        hashed_password = await password_hasher.hash(user_data["password"])
         role = user_data.get("role")
         
         # Insert new user
-        async with db.pool.acquire() as conn:
-            async with conn.transaction():
-                
-                insert_user_query = """
-                    INSERT INTO "user" (email, password, full_name, created_at, updated_at)
-                    VALUES ($1, $2, $3, NOW(), NOW())
-                    RETURNING id;
+        async with db.unit_of_work() as uow:
+            insert_user_query = """
+                INSERT INTO "user" (email, password, full_name, created_at, updated_at)
+                VALUES ($1, $2, $3, NOW(), NOW())
+                RETURNING id;
+            """
+            user_id = await uow.fetch_value(
+                insert_user_query,
+                user_data["email"],
+                hashed_password,
+                user_data["full_name"]
+            )
+            
+            insert_role_query = """
+                INSERT INTO user_roles (user_id, role) VALUES ($1, $2);
+            """
+            await uow.execute_command(insert_role_query, user_id, role)
+            
+            if role == "mentee":
+                insert_mentee_query = """
+                    INSERT INTO mentee (user_id) VALUES ($1);
                 """
-                user_id = await conn.fetchval(
-                    insert_user_query,
-                    user_data["email"],
-                    hashed_password.decode('utf-8'),
-                    user_data["full_name"]
-                )
-                
-                insert_role_query = """
-                    INSERT INTO user_roles (user_id, role) VALUES ($1, $2);
+                await uow.execute_command(insert_mentee_query, user_id)
+            
+            elif role == "tutor":
+                insert_tutor_query = """
+                    INSERT INTO tutor (user_id) VALUES ($1);
                 """
-                await conn.execute(insert_role_query, user_id, role)
-                
-                if role == "mentee":
-                    insert_mentee_query = """
-                        INSERT INTO mentee (user_id) VALUES ($1);
-                    """
-                    await conn.execute(insert_mentee_query, user_id)
-                
-                elif role == "tutor":
-                    insert_tutor_query = """
-                        INSERT INTO tutor (user_id) VALUES ($1);
-                    """
-                    await conn.execute(insert_tutor_query, user_id)
-                
-                return {
-                    "id": user_id,
-                    "email": user_data["email"],
-                    "full_name": user_data["full_name"],
-                    "role": role
-                }
+                await uow.execute_command(insert_tutor_query, user_id)
+            
+            return {
+                "id": user_id,
+                "email": user_data["email"],
+                "full_name": user_data["full_name"],
+                "role": role
+            }
 
     @staticmethod
     async def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
@@ -84,6 +81,15 @@ class UserModel:
         result = await db.execute_query(query, email)
         return result[0] if result else None
 
+    @staticmethod
+    async def update_password_hash(user_id: str, hashed_password: str) -> None:
+        query = """
+            UPDATE "user"
+            SET password = $2, updated_at = NOW()
+            WHERE id = $1;
+        """
+        await db.execute_command(query, user_id, hashed_password)
+
     @staticmethod
     async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
         """Return user profile joined with mentee/tutor details."""
@@ -114,37 +120,36 @@ class UserModel:
 
         field should be one of: 'learning_needs' (for mentee) or 'expertise_areas' (for tutor)
         """
-        # Use pool directly for transactional upsert
-        async with db.pool.acquire() as conn:
-            async with conn.transaction():
-                if role == "mentee" and field == "learning_needs":
-                    # Try update first
-                    res = await conn.execute(
-                        "UPDATE mentee SET learning_needs=$1 WHERE user_id=$2",
-                        value,
+        # Transactional upsert on one connection
+        async with db.unit_of_work() as uow:
+            if role == "mentee" and field == "learning_needs":
+                # Try update first
+                res = await uow.execute_command(
+                    "UPDATE mentee SET learning_needs=$1 WHERE user_id=$2",
+                    value,
+                    user_id,
+                )
+                if res == "UPDATE 0":
+                    await uow.execute_command(
+                        "INSERT INTO mentee (user_id, learning_needs) VALUES ($1, $2)",
                         user_id,
+                        value,
                     )
-                    if res == "UPDATE 0":
-                        await conn.execute(
-                            "INSERT INTO mentee (user_id, learning_needs) VALUES ($1, $2)",
-                            user_id,
-                            value,
-                        )
 
-                elif role == "tutor" and field == "expertise_areas":
-                    res = await conn.execute(
-                        "UPDATE tutor SET expertise_areas=$1 WHERE user_id=$2",
-                        value,
+            elif role == "tutor" and field == "expertise_areas":
+                res = await uow.execute_command(
+                    "UPDATE tutor SET expertise_areas=$1 WHERE user_id=$2",
+                    value,
+                    user_id,
+                )
+                if res == "UPDATE 0":
+                    await uow.execute_command(
+                        "INSERT INTO tutor (user_id, expertise_areas) VALUES ($1, $2)",
                         user_id,
+                        value,
                     )
-                    if res == "UPDATE 0":
-                        await conn.execute(
-                            "INSERT INTO tutor (user_id, expertise_areas) VALUES ($1, $2)",
-                            user_id,
-                            value,
-                        )
-                else:
-                    raise ValueError("Invalid role/field combination")
+            else:
+                raise ValueError("Invalid role/field combination")
 
         # Return the updated profile
         return await UserModel.get_user_by_id(user_id)
@@ -0,0 +1,44 @@
+from typing import Optional
+from db.database import db
+
+
+class VersionModel:
+    """
+    Cheap version stamps for conditional GETs (see middleware/conditional.py).
+    A stamp changes whenever the data behind a read endpoint may have changed;
+    it is made of row counts and max(updated_at), never of the rows themselves.
+    """
+
+    @staticmethod
+    async def get_classes_stamp(subject_id: Optional[str] = None) -> str:
+        """
+        Classes listings (all classes or one subject's), which also show
+        subject and tutor names. Subjects are insert-only, so count/max(id) is enough.
+        """
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM classes WHERE $1::int IS NULL OR subject_id = $1) as classes,
+                (SELECT MAX(updated_at) FROM classes WHERE $1::int IS NULL OR subject_id = $1) as classes_at,
+                (SELECT COUNT(*) FROM subjects) as subjects,
+                (SELECT MAX(id) FROM subjects) as subjects_max_id,
+                (SELECT MAX(updated_at) FROM "user") as users_at
+        """
+        row = await db.execute_single(query, int(subject_id) if subject_id is not None else None)
+        return ":".join(str(value) for value in row.values())
+
+    @staticmethod
+    async def get_class_stamp(class_id: str) -> str:
+        query = """
+            SELECT c.updated_at, u.updated_at as tutor_at
+            FROM classes c
+            LEFT JOIN "user" u ON c.tutor_id = u.id
+            WHERE c.id = $1
+        """
+        row = await db.execute_single(query, int(class_id))
+        return ":".join(str(value) for value in row.values()) if row else "missing"
+
+    @staticmethod
+    async def get_subjects_stamp() -> str:
+        query = "SELECT COUNT(*) as subjects, MAX(id) as max_id FROM subjects"
+        row = await db.execute_single(query)
+        return f"{row['subjects']}:{row['max_id']}"
@@ -2,8 +2,9 @@ from fastapi import APIRouter, HTTPException, status
 from typing import List
 import asyncpg 
 
-from models.FeedbackAndProgressTracking.assignmentModel import AssignmentCreate, AssignmentResponse
+from models.FeedbackAndProgressTracking.assignmentModel import AssignmentCreate, AssignmentResponse, AssignmentAnswersUpdate
 from controllers.FeedbackAndProgressTracking.assignmentController import AssignmentController
+from controllers.FeedbackAndProgressTracking.submissionController import SubmissionController
 # from middleware.auth import authorize # Uncomment when needed
 
 router = APIRouter(
@@ -56,7 +57,30 @@ async def get_assignment_detail_endpoint(class_id: int, session_id: int):
     return assignment
 
 # =================================================================
-# 4. DELETE ASSIGNMENT
+# 4. UPDATE ANSWER KEY (optionally re-grading existing submissions)
+# =================================================================
+@router.patch("/{class_id}/{session_id}/answers")
+async def update_assignment_answers_endpoint(
+    class_id: int,
+    session_id: int,
+    payload: AssignmentAnswersUpdate,
+    # current_user: dict = Depends(authorize(["tutor", "coordinator"]))
+):
+    updated = await AssignmentController.update_answers(class_id, session_id, payload.answers)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Assignment not found.")
+
+    regrade = None
+    if payload.regrade:
+        regrade = await SubmissionController.regrade_submissions(class_id, session_id)
+
+    return {
+        "assignment": AssignmentResponse.model_validate(updated),
+        "regrade": regrade
+    }
+
+# =================================================================
+# 5. DELETE ASSIGNMENT
 # =================================================================
 @router.delete("/{class_id}/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_assignment_endpoint(
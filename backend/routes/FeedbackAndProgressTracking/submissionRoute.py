@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from uuid import UUID
+import asyncio
 from middleware.auth import authorize 
 
 from models.FeedbackAndProgressTracking.submissionModel import (
     SubmissionCreate, SubmissionResponse
 )
 from controllers.FeedbackAndProgressTracking.submissionController import SubmissionController
+from controllers.FeedbackAndProgressTracking.submissionQueue import submission_queue
 
 router = APIRouter(
     prefix="/submission",
@@ -50,7 +52,79 @@ async def create_submission_endpoint(
 
 
 # =================================================================
-# 2. GET SUBMISSION BY ID
+# 1b. QUEUED SUBMISSION (deadline bursts)
+# =================================================================
+@router.post("/queued", status_code=status.HTTP_202_ACCEPTED)
+async def create_queued_submission_endpoint(
+    data: SubmissionCreate,
+    current_user: dict = Depends(authorize(["mentee"]))
+):
+    """
+    Nộp bài ở chế độ hàng đợi: trả về ticket ngay sau khi kiểm tra hợp lệ,
+    bài được chấm và lưu theo lô. Dùng GET /submission/ticket/{ticket_id} để lấy kết quả.
+    """
+    mentee_id = UUID(current_user.get("sub"))
+
+    try:
+        ticket = await submission_queue.enqueue(mentee_id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Submission queue is full, please retry shortly.",
+            headers={"Retry-After": "2"}
+        )
+
+    return {
+        "ticket_id": ticket["ticket_id"],
+        "status": ticket["status"],
+        "poll_url": f"/submission/ticket/{ticket['ticket_id']}"
+    }
+
+
+@router.get("/ticket/{ticket_id}")
+async def get_submission_ticket_endpoint(
+    ticket_id: str,
+    current_user: dict = Depends(authorize(["mentee"]))
+):
+    """
+    Trạng thái của bài nộp trong hàng đợi: queued, graded (kèm submission) hoặc failed.
+    """
+    ticket = submission_queue.get_ticket(ticket_id)
+    if not ticket or str(ticket["mentee_id"]) != current_user.get("sub"):
+        raise HTTPException(status_code=404, detail="Ticket not found or expired")
+
+    return {
+        "ticket_id": ticket["ticket_id"],
+        "status": ticket["status"],
+        "submission": ticket["submission"],
+        "error": ticket["error"]
+    }
+
+
+# =================================================================
+# 2. RE-GRADE SUBMISSIONS OF A SESSION
+# =================================================================
+@router.post("/regrade/{class_id}/{session_id}")
+async def regrade_submissions_endpoint(
+    class_id: int,
+    session_id: int,
+    current_user: dict = Depends(authorize(["tutor", "coordinator"]))
+):
+    """
+    Chấm lại toàn bộ bài nộp của session theo đáp án hiện tại của Assignment.
+    """
+    try:
+        return await SubmissionController.regrade_submissions(class_id, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# =================================================================
+# 3. GET SUBMISSION BY ID
 # =================================================================
 @router.get("/{submission_id}", response_model=SubmissionResponse)
 async def get_submission_detail_endpoint(
@@ -66,7 +140,7 @@ async def get_submission_detail_endpoint(
 
 
 # =================================================================
-# 3. GET SUBMISSIONS BY SESSION (History)
+# 4. GET SUBMISSIONS BY SESSION (History)
 # =================================================================
 @router.get("/history/{class_id}/{session_id}", response_model=List[SubmissionResponse])
 async def get_submission_history_endpoint(
@@ -5,10 +5,12 @@ Includes dashboard statistics, activity feeds, conflict detection, user manageme
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from middleware.auth import verify_token, authorize
+from middleware.json_response import FastJSONResponse
 from models.adminModel import AdminModel
 from models.reportModel import ReportModel
+from db.profiler import query_profiler
 from typing import Dict, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter(
     prefix="/api/admin",
@@ -21,6 +23,13 @@ class DeactivateUserRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class ProfilerSettingsRequest(BaseModel):
+    enabled: Optional[bool] = None
+    slow_query_ms: Optional[int] = Field(None, ge=0)
+    explain: Optional[bool] = None
+    explain_sample_rate: Optional[float] = Field(None, ge=0, le=1)
+
+
 @router.get("/stats")
 async def get_dashboard_stats(
     current_user: dict = Depends(authorize(["admin"]))
@@ -170,11 +179,11 @@ async def get_all_users(
             limit=limit,
             offset=offset
         )
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": users_data,
             "message": "Users retrieved successfully"
-        }
+        })
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -570,3 +579,134 @@ async def get_class_utilization(
             }
         )
 
+
+# ==================== DIAGNOSTICS ENDPOINTS ====================
+
+@router.get("/diagnostics/queries")
+async def get_query_profile(
+    sort: str = Query("total", pattern="^(total|count|p95|rows)$", description="Order by total time, count, p95 or rows"),
+    limit: int = Query(50, ge=1, le=500, description="Number of fingerprints to return"),
+    current_user: dict = Depends(authorize(["admin"]))
+) -> Dict[str, Any]:
+    """
+    Per-query statistics collected by the query profiler (this worker only)
+    
+    Query Parameters:
+        - sort: total | count | p95 | rows (default: total)
+        - limit: Number of fingerprints to return (default: 50, max: 500)
+    
+    Returns:
+        - profiler: enabled flag, slow query threshold and counters
+        - queries: one entry per normalized query with count, errors, total/avg/p95/max ms,
+          rows and the calling methods
+    
+    Covers every statement issued through the db helpers or db.unit_of_work(),
+    COPY included (as "COPY table (columns) FROM STDIN"); rows streamed through
+    db.stream() cursors are not timed.
+    
+    Requires: Admin role
+    """
+    return {
+        "success": True,
+        "data": {
+            "profiler": query_profiler.status(),
+            "queries": query_profiler.report(sort, limit)
+        },
+        "message": "Query profile retrieved successfully"
+    }
+
+
+@router.patch("/diagnostics/profiler")
+async def update_query_profiler(
+    request: ProfilerSettingsRequest,
+    current_user: dict = Depends(authorize(["admin"]))
+) -> Dict[str, Any]:
+    """
+    Turn the query profiler on/off or change the slow query threshold at runtime
+    
+    Request Body:
+        - enabled: Optional bool
+        - slow_query_ms: Optional threshold in milliseconds
+        - explain: Optional bool, diagnostics mode (capture EXPLAIN ANALYZE of slow reads;
+          only active while the profiler is enabled)
+        - explain_sample_rate: Optional share (0-1) of slow reads whose plan is captured
+    
+    Requires: Admin role
+    """
+    status = query_profiler.configure(
+        request.enabled,
+        request.slow_query_ms,
+        request.explain,
+        request.explain_sample_rate
+    )
+    return {
+        "success": True,
+        "data": status,
+        "message": "Query profiler updated successfully"
+    }
+
+
+@router.delete("/diagnostics/queries")
+async def reset_query_profile(
+    current_user: dict = Depends(authorize(["admin"]))
+) -> Dict[str, Any]:
+    """
+    Clear the collected query statistics
+    
+    Requires: Admin role
+    """
+    query_profiler.reset()
+    return {
+        "success": True,
+        "data": query_profiler.status(),
+        "message": "Query profile cleared successfully"
+    }
+
+
+@router.get("/diagnostics/plans")
+async def get_query_plans(
+    current_user: dict = Depends(authorize(["admin"]))
+) -> Dict[str, Any]:
+    """
+    Query plans captured in diagnostics mode (this worker only), slowest first
+    
+    Returns:
+        - plans: fingerprint, SQL, caller, observed and EXPLAIN execution/planning time,
+          capture time and error (plan bodies via /diagnostics/plans/{fingerprint})
+    
+    Requires: Admin role
+    """
+    return {
+        "success": True,
+        "data": {
+            "plans": query_profiler.plans()
+        },
+        "message": "Query plans retrieved successfully"
+    }
+
+
+@router.get("/diagnostics/plans/{fingerprint}")
+async def get_query_plan(
+    fingerprint: str = Path(..., description="Query fingerprint from /diagnostics/queries"),
+    current_user: dict = Depends(authorize(["admin"]))
+) -> Dict[str, Any]:
+    """
+    Full EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output captured for a query fingerprint
+    
+    Requires: Admin role
+    """
+    plan = query_profiler.get_plan(fingerprint)
+    if plan is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "error": "Query plan not found",
+                "details": f"No plan captured for fingerprint: {fingerprint}"
+            }
+        )
+    return {
+        "success": True,
+        "data": plan,
+        "message": "Query plan retrieved successfully"
+    }
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Any
 from controllers.attendanceController import AttendanceController
 from middleware.auth import authorize
+from schemas.attendance_schema import AttendanceSyncSchema
 
 router = APIRouter(
     prefix="/attendance",
@@ -9,6 +10,24 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+@router.post("/sync")
+async def sync_attendance(
+    payload: AttendanceSyncSchema,
+    current_user: dict = Depends(authorize(["tutor"]))
+):
+    """
+    Apply a queue of offline attendance marks, possibly spanning many sessions, in one transaction.
+    Every record carries a client-generated idempotency_key, so re-sending a batch is a no-op.
+    Returns one {"key", "status"} result per record; status is applied, duplicate or rejected.
+    """
+    tutor_id = current_user.get("sub")
+    records = [record.model_dump() for record in payload.records]
+    result = await AttendanceController.sync_attendance(tutor_id, records)
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(status_code=500, detail=result["error"])
+
 @router.get("/session/{class_id}/{session_id}")
 async def get_attendance_for_session(
     class_id: int,
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from typing import Optional, List
 from controllers.classController import ClassController
 from middleware.auth import verify_token, authorize
+from middleware.conditional import conditional_get
+from middleware.json_response import FastJSONResponse
+from models.versionModel import VersionModel
 from schemas.class_schema import CreateClassSchema
 
 
@@ -13,19 +16,20 @@ router = APIRouter(
 )
 
 
-@router.get("/")
-async def get_all_classes():
+@router.get("/", dependencies=[Depends(conditional_get(VersionModel.get_classes_stamp))])
+async def get_all_classes(response: Response):
     """
     Get all classes
     """
     result = await ClassController.get_all_classes()
     
     if result["success"]:
-        return result
+        # Largest public listing: render with orjson, keep the ETag set by conditional_get
+        return FastJSONResponse(result, headers=response.headers)
     else:
         raise HTTPException(status_code=500, detail=result["error"])
     
-@router.get("/{class_id}")
+@router.get("/{class_id}", dependencies=[Depends(conditional_get(VersionModel.get_class_stamp))])
 async def get_class_by_id(class_id: int):
     """
     Get a class by its ID
@@ -36,15 +40,15 @@ async def get_class_by_id(class_id: int):
     else:
         raise HTTPException(status_code=404, detail=result["error"])
     
-@router.get("/subject/{subject_id}")
-async def get_class_by_subject(subject_id: int):
+@router.get("/subject/{subject_id}", dependencies=[Depends(conditional_get(VersionModel.get_classes_stamp))])
+async def get_class_by_subject(subject_id: int, response: Response):
     """
     Get classes by subject ID
     """
     result = await ClassController.get_class_by_subject(subject_id)
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result, headers=response.headers)
     else:
         raise HTTPException(status_code=500, detail=result["error"])
 
@@ -73,7 +77,7 @@ async def get_classes_by_tutor(
     result = await ClassController.get_classes_by_tutor(tutor_id)
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result)
     else:
         raise HTTPException(status_code=500, detail=result["error"])
 
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from controllers.eventController import EventController
+from middleware.auth import verify_token_or_query
+
+
+# Create router
+router = APIRouter(
+    prefix="/events",
+    tags=["events"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    class_id: Optional[List[int]] = Query(None),
+    current_user: dict = Depends(verify_token_or_query)
+):
+    """
+    Server-Sent Events stream of session, class and registration changes.
+    Pass class_id=... (repeatable) to follow specific classes; otherwise mentees
+    follow their registrations and tutors their own classes.
+    EventSource cannot send headers, so the token may be given as ?access_token=...
+    Events: session_created/updated/deleted, class_updated, registration_changed,
+    waitlist_promoted and resync (refetch, some events may have been missed).
+    """
+    result = await EventController.subscribe(current_user.get("sub"), current_user.get("role"), class_id)
+
+    if not result["success"]:
+        if "at most" in result["error"].lower():
+            raise HTTPException(status_code=400, detail=result["error"])
+        raise HTTPException(status_code=500, detail=result["error"])
+
+    return StreamingResponse(
+        EventController.stream(request, result["subscription"]),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from controllers.noteController import NoteController
 from middleware.auth import authorize
+from middleware.json_response import FastJSONResponse
 from schemas.note_schema import CreateNoteSchema, UpdateNoteSchema
 
 
@@ -61,7 +62,7 @@ async def get_notes_by_session(
     result = await NoteController.get_notes_by_session(class_id, session_id)
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result)
     else:
         raise HTTPException(status_code=500, detail=result["error"])
 
@@ -77,7 +78,7 @@ async def get_notes_by_class(
     result = await NoteController.get_notes_by_class(class_id)
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result)
     else:
         raise HTTPException(status_code=500, detail=result["error"])
 
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
 from controllers.registrationController import RegistrationController
+from middleware.auth import authorize
 
 # Request schemas
 class RegisterRequest(BaseModel):
@@ -11,6 +14,16 @@ class CancelRequest(BaseModel):
     class_id: int
     mentee_id: str
 
+class WaitlistRequest(BaseModel):
+    class_id: int
+    mentee_id: str
+
+class LotteryRequest(BaseModel):
+    class_id: Optional[int] = None
+    semester: Optional[str] = None
+    opens_at: Optional[datetime] = None
+    closes_at: datetime
+
 class RescheduleRequest(BaseModel):
     old_class_id: int
     new_class_id: int
@@ -82,6 +95,118 @@ async def reschedule_class(request: RescheduleRequest):
         )
     
 
+@router.post("/bulk")
+async def bulk_register(
+    request: Request,
+    current_user: dict = Depends(authorize(["coordinator", "admin"]))
+):
+    """
+    Pre-enroll a cohort: body is CSV (mentee_id,class_id), NDJSON or a JSON array of
+    {"mentee_id", "class_id"}. Every row is validated and reported individually.
+    """
+    result = await RegistrationController.bulk_register(
+        request.stream(),
+        request.headers.get("content-type", "text/csv")
+    )
+
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(
+            status_code=400 if "invalid" in result.get("error", "").lower() else 500,
+            detail=result.get("error", "Bulk registration failed")
+        )
+
+@router.post("/waitlist/join")
+async def join_waitlist(request: WaitlistRequest):
+    """
+    Join the waitlist of a full class instead of retrying registration
+    """
+    result = await RegistrationController.join_waitlist(
+        request.class_id,
+        request.mentee_id
+    )
+
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(
+            status_code=404 if "not found" in result.get("error", "").lower() else 400,
+            detail=result.get("error", "Failed to join waitlist")
+        )
+
+@router.post("/waitlist/leave")
+async def leave_waitlist(request: WaitlistRequest):
+    """
+    Leave a class waitlist
+    """
+    result = await RegistrationController.leave_waitlist(
+        request.class_id,
+        request.mentee_id
+    )
+
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(status_code=404, detail=result["error"])
+
+@router.get("/waitlist/position")
+async def get_waitlist_position(class_id: int, mentee_id: str):
+    """
+    Get a mentee's position in a class waitlist
+    """
+    result = await RegistrationController.get_waitlist_position(class_id, mentee_id)
+
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(status_code=404, detail=result["error"])
+
+@router.post("/lottery")
+async def create_lottery(
+    request: LotteryRequest,
+    current_user: dict = Depends(authorize(["coordinator", "admin"]))
+):
+    """
+    Open a lottery for a class or semester: until the draw, /register only records entries
+    """
+    result = await RegistrationController.create_lottery(current_user.get("sub"), request.model_dump())
+
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(status_code=400, detail=result["error"])
+
+@router.post("/lottery/{lottery_id}/draw")
+async def draw_lottery(
+    lottery_id: int,
+    current_user: dict = Depends(authorize(["coordinator", "admin"]))
+):
+    """
+    Assign seats for a closed lottery in one batched pass
+    """
+    result = await RegistrationController.draw_lottery(lottery_id)
+
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(
+            status_code=404 if "not found" in result.get("error", "").lower() else 400,
+            detail=result.get("error", "Draw failed")
+        )
+
+@router.get("/lottery/{lottery_id}/mentee/{mentee_id}")
+async def get_lottery_entries(lottery_id: int, mentee_id: str):
+    """
+    Get a mentee's lottery entries and their results (pending until the draw)
+    """
+    result = await RegistrationController.get_lottery_entries(lottery_id, mentee_id)
+
+    if result["success"]:
+        return result
+    else:
+        raise HTTPException(status_code=500, detail=result["error"])
+
 @router.get("/check-conflict")
 async def check_time_conflict(mentee_id: str, class_id: int):
     """
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import date
 from controllers.sessionController import SessionController
-from middleware.auth import authorize
+from controllers.calendarController import CalendarController
+from middleware.auth import authorize, create_feed_token, verify_feed_token
+from middleware.json_response import FastJSONResponse
 
 
+# Largest page / upcoming count a client can ask for
+MAX_PAGE_SIZE = 500
+
 # Create router
 router = APIRouter(
     prefix="/sessions",
@@ -15,17 +23,30 @@ router = APIRouter(
 
 @router.get("/mentee/all")
 async def get_sessions_by_mentee(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    upcoming: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(authorize(["mentee"]))
 ):
     """
-    Get all sessions for current mentee (from registered classes)
+    Get sessions for current mentee (from registered classes).
+    - from/to (YYYY-MM-DD): session_date window, inclusive
+    - upcoming=N: the next N sessions from today
+    - limit + cursor: keyset pages on (session_date, class_id, session_id); pass next_cursor back
+      (sessions without a date are only listed when neither limit, cursor nor upcoming is given)
     """
     mentee_id = current_user.get("sub")
-    result = await SessionController.get_sessions_by_mentee(mentee_id)
+    result = await SessionController.get_sessions_by_mentee(
+        mentee_id, date_from, date_to, upcoming, limit, cursor
+    )
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result)
     else:
+        if "invalid cursor" in result["error"].lower():
+            raise HTTPException(status_code=400, detail=result["error"])
         raise HTTPException(status_code=500, detail=result["error"])
 
 
@@ -41,7 +62,7 @@ async def get_sessions_by_mentee_and_class(
     result = await SessionController.get_sessions_by_mentee_and_class(mentee_id, class_id)
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result)
     else:
         if "not registered" in result["error"].lower():
             raise HTTPException(status_code=403, detail=result["error"])
@@ -52,17 +73,27 @@ async def get_sessions_by_mentee_and_class(
 
 @router.get("/tutor/all")
 async def get_sessions_by_tutor(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    upcoming: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(authorize(["tutor"]))
 ):
     """
-    Get all sessions for current tutor (from classes they teach)
+    Get sessions for current tutor (from classes they teach).
+    Same from/to, upcoming and limit/cursor options as /sessions/mentee/all.
     """
     tutor_id = current_user.get("sub")
-    result = await SessionController.get_sessions_by_tutor(tutor_id)
+    result = await SessionController.get_sessions_by_tutor(
+        tutor_id, date_from, date_to, upcoming, limit, cursor
+    )
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result)
     else:
+        if "invalid cursor" in result["error"].lower():
+            raise HTTPException(status_code=400, detail=result["error"])
         raise HTTPException(status_code=500, detail=result["error"])
 
 
@@ -78,7 +109,7 @@ async def get_sessions_by_tutor_and_class(
     result = await SessionController.get_sessions_by_tutor_and_class(tutor_id, class_id)
     
     if result["success"]:
-        return result
+        return FastJSONResponse(result)
     else:
         if "permission" in result["error"].lower():
             raise HTTPException(status_code=403, detail=result["error"])
@@ -128,6 +159,48 @@ async def complete_session(
         raise HTTPException(status_code=400, detail=result["error"])
 
 
+# ==================== CALENDAR FEED ====================
+
+@router.get("/calendar/link")
+async def get_calendar_link(
+    request: Request,
+    current_user: dict = Depends(authorize(["mentee", "tutor"]))
+):
+    """
+    Get the personal .ics subscription URL of the current mentee/tutor
+    """
+    token = create_feed_token(current_user.get("sub"), current_user.get("role"))
+    return {
+        "success": True,
+        "url": str(request.url_for("get_calendar_feed", token=token)),
+        "message": "Calendar link created successfully"
+    }
+
+
+@router.get("/calendar/{token}.ics")
+async def get_calendar_feed(token: str, request: Request):
+    """
+    iCalendar feed for calendar apps (auth via the token in the URL).
+    Answers 304 when If-None-Match still matches.
+    """
+    payload = verify_feed_token(token)
+    result = await CalendarController.get_feed(
+        payload.get("sub"),
+        payload.get("role"),
+        request.headers.get("if-none-match")
+    )
+
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["error"])
+    if result["not_modified"]:
+        return Response(status_code=304, headers=result["headers"])
+    return StreamingResponse(
+        result["body"],
+        media_type="text/calendar; charset=utf-8",
+        headers=result["headers"]
+    )
+
+
 # ==================== COMMON ENDPOINTS ====================
 # Note: This route must be placed LAST because it uses path parameters
 # that could match other routes like /mentee/all or /tutor/all
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from controllers.subjectController import SubjectController
 from schemas.subject_schema import CreateSubjectSchema
 from middleware.auth import authorize
+from middleware.conditional import conditional_get
+from models.versionModel import VersionModel
 
 router = APIRouter(
     prefix="/subjects",
@@ -9,7 +11,7 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(conditional_get(VersionModel.get_subjects_stamp))])
 async def get_all_subjects():
     """Get all subjects"""
     result = await SubjectController.get_all_subjects()
@@ -1,5 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from db.database import db
+from middleware.password import password_hasher
+from middleware.metrics import render_prometheus
+from db.events import event_broker
 
 # Create router for general/system endpoints
 router = APIRouter(
@@ -22,10 +26,33 @@ async def health_check():
         "status": "healthy",
         "message": "API is operational",
         "database": db_status,
+        "password_hasher": password_hasher.stats(),
+        "event_broker": event_broker.stats(),
         "version": "1.0.0"
     }
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus scrape endpoint: per-route request counts, 5xx counts and latency
+    histograms, process (RSS, CPU, event-loop lag, GC pauses) and pool metrics.
+    Values are per worker process.
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/metrics/pool")
+async def pool_metrics():
+    """
+    Connection pool saturation for this worker: size / idle / in use, waiters,
+    acquire timeouts and histograms of acquire wait and connection hold time.
+    """
+    return {
+        "pool": db.pool_stats()
+    }
+
+
 @router.get("/test-db")
 async def test_database():
     """Test database connection (legacy endpoint)"""
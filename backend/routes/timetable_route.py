@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from controllers.timetableController import TimetableController
+from middleware.auth import authorize
+
+
+# Create router
+router = APIRouter(
+    prefix="/timetable",
+    tags=["timetable"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+@router.get("/free-slots")
+async def get_free_slots(
+    semester: str,
+    user_id: Optional[str] = None,
+    role: Optional[str] = None,
+    current_user: dict = Depends(authorize(["mentee", "tutor", "coordinator", "admin"]))
+):
+    """
+    Free periods per week day for a semester.
+    Mentees and tutors get their own timetable; coordinators/admins pass user_id and role.
+    """
+    if current_user.get("role") in ("mentee", "tutor"):
+        user_id = current_user.get("sub")
+        role = current_user.get("role")
+    elif not user_id or not role:
+        raise HTTPException(status_code=400, detail="user_id and role are required")
+
+    result = await TimetableController.get_free_slots(user_id, semester, role)
+
+    if result["success"]:
+        return result
+    else:
+        if "role must be" in result["error"].lower():
+            raise HTTPException(status_code=400, detail=result["error"])
+        raise HTTPException(status_code=500, detail=result["error"])
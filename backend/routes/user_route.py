@@ -33,6 +33,8 @@ async def register_user(user_data: UserRegisterSchema):
         if "user" in result and "password" in result["user"]:
             del result["user"]["password"]
         return result
+    elif result.get("busy"):
+        raise HTTPException(status_code=503, detail=result["error"], headers={"Retry-After": "1"})
     else:
         raise HTTPException(status_code=400, detail=result["error"])
 
@@ -43,6 +45,8 @@ async def login_user(credentials: UserLoginSchema):
     result = await UserController.login_user(credentials)
     if result["success"]:
         return result
+    elif result.get("busy"):
+        raise HTTPException(status_code=503, detail=result["error"], headers={"Retry-After": "1"})
     else:
         raise HTTPException(status_code=401, detail=result["error"])
 
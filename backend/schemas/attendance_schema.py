@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import List
+from uuid import UUID
+
+
+class AttendanceDeltaSchema(BaseModel):
+    idempotency_key: str = Field(..., min_length=1, max_length=128, description="Client-generated key, unique per mark")
+    class_id: int = Field(..., ge=1, description="Class ID")
+    session_id: int = Field(..., ge=1, description="Session ID")
+    mentee_id: UUID = Field(..., description="Mentee ID")
+    attended: bool = Field(..., description="Attendance mark")
+
+
+class AttendanceSyncSchema(BaseModel):
+    records: List[AttendanceDeltaSchema] = Field(..., min_length=1, max_length=5000, description="Queued attendance marks, oldest first")
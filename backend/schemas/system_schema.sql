@@ -460,3 +460,695 @@ CREATE POLICY "Tutors/Coordinators can manage marks"
 CREATE POLICY "Mentees can view their own marks" 
   ON public.progress_marks FOR SELECT
   USING (auth.uid() = mentee_id);
+
+
+-- attendance_sync_log
+-- One row per client-generated idempotency key that has already been applied
+-- by POST /attendance/sync. Replayed keys are answered from this table.
+
+CREATE TABLE IF NOT EXISTS public.attendance_sync_log (
+  idempotency_key TEXT PRIMARY KEY,
+  tutor_id UUID NOT NULL,
+  mentee_id UUID NOT NULL,
+  class_id INTEGER NOT NULL,
+  session_id INTEGER NOT NULL,
+  attendance_mark BOOLEAN NOT NULL,
+  applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_sync_log_session
+  ON public.attendance_sync_log (class_id, session_id);
+
+
+-- timetable_occupancy
+-- One 7x15 bit grid per (user, semester, role): bit day*15 + (period - 2) is set
+-- when the user is busy in that period (day 0 = monday, periods 2..16).
+-- Mentee grids mark periods start_time..end_time inclusive, matching the
+-- registration conflict rule; tutor grids mark start_time..end_time-1, matching
+-- the class creation rule. Maintained by the triggers below.
+
+CREATE TABLE IF NOT EXISTS public.timetable_occupancy (
+  user_id UUID NOT NULL REFERENCES public."user"(id) ON DELETE CASCADE,
+  semester TEXT NOT NULL,
+  role TEXT NOT NULL CHECK (role IN ('mentee', 'tutor')),
+  slots BIT(105) NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (user_id, semester, role)
+);
+
+CREATE OR REPLACE FUNCTION public.timetable_slot_mask(
+  p_week_day week_day,
+  p_first_period INTEGER,
+  p_last_period INTEGER
+) RETURNS BIT(105)
+LANGUAGE sql IMMUTABLE AS $$
+  SELECT CASE
+    WHEN p_week_day IS NULL OR p_first_period IS NULL OR p_last_period IS NULL
+      OR GREATEST(p_first_period, 2) > LEAST(p_last_period, 16)
+    THEN repeat('0', 105)::BIT(105)
+    ELSE (
+      repeat('0', (array_position(enum_range(NULL::week_day), p_week_day) - 1) * 15 + GREATEST(p_first_period, 2) - 2)
+      || repeat('1', LEAST(p_last_period, 16) - GREATEST(p_first_period, 2) + 1)
+      || repeat('0', 105 - (array_position(enum_range(NULL::week_day), p_week_day) - 1) * 15 - LEAST(p_last_period, 16) + 1)
+    )::BIT(105)
+  END;
+$$;
+
+-- Mask of one class as seen by a mentee (inclusive) or its tutor (end exclusive)
+CREATE OR REPLACE FUNCTION public.timetable_class_mask(
+  p_week_day week_day,
+  p_start_time INTEGER,
+  p_end_time INTEGER,
+  p_role TEXT
+) RETURNS BIT(105)
+LANGUAGE sql IMMUTABLE AS $$
+  SELECT CASE p_role
+    WHEN 'tutor' THEN public.timetable_slot_mask(p_week_day, p_start_time, GREATEST(p_start_time, p_end_time - 1))
+    ELSE public.timetable_slot_mask(p_week_day, p_start_time, p_end_time)
+  END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.refresh_timetable_occupancy(
+  p_user_id UUID,
+  p_semester TEXT,
+  p_role TEXT
+) RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+  v_slots BIT(105);
+BEGIN
+  IF p_user_id IS NULL OR p_semester IS NULL THEN
+    RETURN;
+  END IF;
+
+  IF p_role = 'tutor' THEN
+    SELECT bit_or(public.timetable_class_mask(c.week_day, c.start_time, c.end_time, 'tutor'))
+    INTO v_slots
+    FROM public.classes c
+    WHERE c.tutor_id = p_user_id
+      AND c.semester::TEXT = p_semester
+      AND c.class_status IS DISTINCT FROM 'cancelled';
+  ELSE
+    SELECT bit_or(public.timetable_class_mask(c.week_day, c.start_time, c.end_time, 'mentee'))
+    INTO v_slots
+    FROM public.class_registrations cr
+    JOIN public.classes c ON c.id = cr.class_id
+    WHERE cr.mentee_id = p_user_id
+      AND c.semester::TEXT = p_semester;
+  END IF;
+
+  INSERT INTO public.timetable_occupancy (user_id, semester, role, slots, updated_at)
+  VALUES (p_user_id, p_semester, p_role, COALESCE(v_slots, repeat('0', 105)::BIT(105)), NOW())
+  ON CONFLICT (user_id, semester, role)
+  DO UPDATE SET slots = EXCLUDED.slots, updated_at = EXCLUDED.updated_at;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_registration_occupancy()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  v_semester TEXT;
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    SELECT c.semester::TEXT INTO v_semester FROM public.classes c WHERE c.id = OLD.class_id;
+    IF FOUND THEN
+      PERFORM public.refresh_timetable_occupancy(OLD.mentee_id, v_semester, 'mentee');
+    ELSE
+      -- Cascade from a deleted class: the semester is gone with it, rebuild them all
+      PERFORM public.refresh_timetable_occupancy(o.user_id, o.semester, 'mentee')
+      FROM public.timetable_occupancy o
+      WHERE o.user_id = OLD.mentee_id AND o.role = 'mentee';
+    END IF;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.refresh_timetable_occupancy(NEW.mentee_id, c.semester::TEXT, 'mentee')
+    FROM public.classes c WHERE c.id = NEW.class_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_class_occupancy()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.refresh_timetable_occupancy(OLD.tutor_id, OLD.semester::TEXT, 'tutor');
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.refresh_timetable_occupancy(NEW.tutor_id, NEW.semester::TEXT, 'tutor');
+  END IF;
+  -- Moving a class in time changes the grid of everyone registered in it
+  IF TG_OP = 'UPDATE' AND (
+    OLD.week_day IS DISTINCT FROM NEW.week_day
+    OR OLD.start_time IS DISTINCT FROM NEW.start_time
+    OR OLD.end_time IS DISTINCT FROM NEW.end_time
+    OR OLD.semester IS DISTINCT FROM NEW.semester
+  ) THEN
+    PERFORM public.refresh_timetable_occupancy(cr.mentee_id, OLD.semester::TEXT, 'mentee')
+    FROM public.class_registrations cr WHERE cr.class_id = NEW.id;
+    PERFORM public.refresh_timetable_occupancy(cr.mentee_id, NEW.semester::TEXT, 'mentee')
+    FROM public.class_registrations cr WHERE cr.class_id = NEW.id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS sync_registration_occupancy ON public.class_registrations;
+CREATE TRIGGER sync_registration_occupancy
+  AFTER INSERT OR DELETE OR UPDATE OF class_id, mentee_id ON public.class_registrations
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_registration_occupancy();
+
+DROP TRIGGER IF EXISTS sync_class_occupancy ON public.classes;
+CREATE TRIGGER sync_class_occupancy
+  AFTER INSERT OR DELETE OR UPDATE OF tutor_id, week_day, start_time, end_time, semester, class_status ON public.classes
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_class_occupancy();
+
+-- Backfill grids for existing data
+SELECT public.refresh_timetable_occupancy(t.user_id, t.semester, t.role)
+FROM (
+  SELECT DISTINCT cr.mentee_id AS user_id, c.semester::TEXT AS semester, 'mentee' AS role
+  FROM public.class_registrations cr
+  JOIN public.classes c ON c.id = cr.class_id
+  UNION
+  SELECT DISTINCT c.tutor_id, c.semester::TEXT, 'tutor'
+  FROM public.classes c
+) t;
+
+
+-- reschedule_registration
+-- Moves a mentee from one class to another in a single statement. Both class
+-- rows are locked in id order so concurrent reschedules between the same pair
+-- of classes cannot deadlock, and current_enrolled is adjusted under that lock.
+-- Returns a status code; RegistrationModel.reschedule_class maps it to the
+-- user-facing error message.
+
+CREATE OR REPLACE FUNCTION public.reschedule_registration(
+  p_mentee_id UUID,
+  p_old_class_id INTEGER,
+  p_new_class_id INTEGER
+) RETURNS TABLE (status TEXT, rescheduled_at TIMESTAMPTZ, conflicts JSONB)
+LANGUAGE plpgsql AS $$
+DECLARE
+  v_old public.classes%ROWTYPE;
+  v_new public.classes%ROWTYPE;
+  v_busy BOOLEAN;
+  v_conflicts JSONB;
+  v_rescheduled_at TIMESTAMPTZ;
+BEGIN
+  PERFORM 1 FROM public.classes
+  WHERE id IN (p_old_class_id, p_new_class_id)
+  ORDER BY id
+  FOR UPDATE;
+
+  SELECT * INTO v_old FROM public.classes WHERE id = p_old_class_id;
+  SELECT * INTO v_new FROM public.classes WHERE id = p_new_class_id;
+
+  IF v_old.id IS NULL OR v_new.id IS NULL THEN
+    RETURN QUERY SELECT 'class_not_found'::TEXT, NULL::TIMESTAMPTZ, NULL::JSONB;
+    RETURN;
+  END IF;
+
+  IF v_old.subject_id IS DISTINCT FROM v_new.subject_id THEN
+    RETURN QUERY SELECT 'subject_mismatch'::TEXT, NULL::TIMESTAMPTZ, NULL::JSONB;
+    RETURN;
+  END IF;
+
+  PERFORM 1 FROM public.class_registrations
+  WHERE class_id = p_old_class_id AND mentee_id = p_mentee_id
+  FOR UPDATE;
+  IF NOT FOUND THEN
+    RETURN QUERY SELECT 'registration_not_found'::TEXT, NULL::TIMESTAMPTZ, NULL::JSONB;
+    RETURN;
+  END IF;
+
+  IF v_old.registration_deadline < NOW() THEN
+    RETURN QUERY SELECT 'old_deadline_passed'::TEXT, NULL::TIMESTAMPTZ, NULL::JSONB;
+    RETURN;
+  END IF;
+
+  IF v_new.registration_deadline < NOW() THEN
+    RETURN QUERY SELECT 'new_deadline_passed'::TEXT, NULL::TIMESTAMPTZ, NULL::JSONB;
+    RETURN;
+  END IF;
+
+  -- Capacity guard, evaluated while the new class row is locked
+  IF v_new.current_enrolled >= v_new.capacity THEN
+    RETURN QUERY SELECT 'new_class_full'::TEXT, NULL::TIMESTAMPTZ, NULL::JSONB;
+    RETURN;
+  END IF;
+
+  PERFORM 1 FROM public.class_registrations
+  WHERE class_id = p_new_class_id AND mentee_id = p_mentee_id;
+  IF FOUND THEN
+    RETURN QUERY SELECT 'already_registered'::TEXT, NULL::TIMESTAMPTZ, NULL::JSONB;
+    RETURN;
+  END IF;
+
+  -- Time conflict (excluding the old class): the occupancy grid rules it out
+  -- cheaply, the detailed scan only runs to list the clashing classes
+  SELECT (o.slots & public.timetable_class_mask(v_new.week_day, v_new.start_time, v_new.end_time, 'mentee'))
+         <> repeat('0', 105)::BIT(105)
+  INTO v_busy
+  FROM public.timetable_occupancy o
+  WHERE o.user_id = p_mentee_id AND o.semester = v_new.semester::TEXT AND o.role = 'mentee';
+
+  IF v_busy IS DISTINCT FROM FALSE THEN
+    SELECT jsonb_agg(DISTINCT jsonb_build_object(
+      'conflicting_class_id', c1.id,
+      'conflicting_subject', s1.subject_name,
+      'conflicting_subject_code', s1.subject_code,
+      'week_day', c1.week_day,
+      'conflicting_start_time', c1.start_time,
+      'conflicting_end_time', c1.end_time
+    ))
+    INTO v_conflicts
+    FROM public.class_registrations cr
+    JOIN public.classes c1 ON cr.class_id = c1.id
+    JOIN public.subjects s1 ON c1.subject_id = s1.id
+    WHERE cr.mentee_id = p_mentee_id
+      AND c1.id <> p_old_class_id
+      AND c1.week_day = v_new.week_day
+      AND c1.start_time <= v_new.end_time
+      AND c1.end_time >= v_new.start_time;
+
+    IF v_conflicts IS NOT NULL THEN
+      RETURN QUERY SELECT 'time_conflict'::TEXT, NULL::TIMESTAMPTZ, v_conflicts;
+      RETURN;
+    END IF;
+  END IF;
+
+  UPDATE public.class_registrations
+  SET class_id = p_new_class_id, registration_log = NOW()
+  WHERE class_id = p_old_class_id AND mentee_id = p_mentee_id
+  RETURNING registration_log INTO v_rescheduled_at;
+
+  UPDATE public.classes
+  SET current_enrolled = current_enrolled - 1
+  WHERE id = p_old_class_id AND current_enrolled > 0;
+
+  UPDATE public.classes
+  SET current_enrolled = current_enrolled + 1
+  WHERE id = p_new_class_id;
+
+  -- The seat freed in the old class goes to its waitlist head
+  PERFORM public.promote_waitlist_head(p_old_class_id);
+
+  RETURN QUERY SELECT 'rescheduled'::TEXT, v_rescheduled_at, NULL::JSONB;
+END;
+$$;
+
+
+-- class_waitlist
+-- FIFO queue of mentees waiting for a seat in a full class; id gives the order.
+-- promote_waitlist_head() is called in the same transaction that frees a seat
+-- (cancel_registration, reschedule_registration) and announces the promotion
+-- on the waitlist_promoted channel.
+
+CREATE TABLE IF NOT EXISTS public.class_waitlist (
+  id BIGSERIAL PRIMARY KEY,
+  class_id INTEGER NOT NULL REFERENCES public.classes(id) ON DELETE CASCADE,
+  mentee_id UUID NOT NULL REFERENCES public."user"(id) ON DELETE CASCADE,
+  joined_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  UNIQUE (class_id, mentee_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_class_waitlist_queue
+  ON public.class_waitlist (class_id, id);
+
+CREATE OR REPLACE FUNCTION public.promote_waitlist_head(p_class_id INTEGER)
+RETURNS UUID
+LANGUAGE plpgsql AS $$
+DECLARE
+  v_class public.classes%ROWTYPE;
+  v_mentee_id UUID;
+  v_busy BOOLEAN;
+BEGIN
+  SELECT * INTO v_class FROM public.classes WHERE id = p_class_id FOR UPDATE;
+  IF v_class.id IS NULL
+    OR v_class.current_enrolled >= v_class.capacity
+    OR v_class.registration_deadline < NOW()
+  THEN
+    RETURN NULL;
+  END IF;
+
+  LOOP
+    DELETE FROM public.class_waitlist
+    WHERE id = (
+      SELECT w.id FROM public.class_waitlist w
+      WHERE w.class_id = p_class_id
+      ORDER BY w.id
+      LIMIT 1
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING mentee_id INTO v_mentee_id;
+
+    IF v_mentee_id IS NULL THEN
+      RETURN NULL;
+    END IF;
+
+    -- Waiters who have since become ineligible are dropped, the next one is tried
+    CONTINUE WHEN EXISTS (
+      SELECT 1
+      FROM public.class_registrations cr
+      JOIN public.classes c ON c.id = cr.class_id
+      WHERE cr.mentee_id = v_mentee_id
+        AND c.semester = v_class.semester
+        AND c.subject_id = v_class.subject_id
+    );
+
+    SELECT (o.slots & public.timetable_class_mask(v_class.week_day, v_class.start_time, v_class.end_time, 'mentee'))
+           <> repeat('0', 105)::BIT(105)
+    INTO v_busy
+    FROM public.timetable_occupancy o
+    WHERE o.user_id = v_mentee_id AND o.semester = v_class.semester::TEXT AND o.role = 'mentee';
+    CONTINUE WHEN v_busy;
+
+    INSERT INTO public.class_registrations (class_id, mentee_id, registration_log)
+    VALUES (p_class_id, v_mentee_id, NOW());
+
+    UPDATE public.classes
+    SET current_enrolled = current_enrolled + 1
+    WHERE id = p_class_id;
+
+    PERFORM pg_notify(
+      'waitlist_promoted',
+      json_build_object('class_id', p_class_id, 'mentee_id', v_mentee_id)::TEXT
+    );
+    RETURN v_mentee_id;
+  END LOOP;
+END;
+$$;
+
+
+-- registration_lotteries / lottery_entries
+-- Optional lottery admission for a class or a whole semester. While a lottery
+-- is open, POST /registrations/register only records an entry; the draw
+-- (POST /registrations/lottery/{id}/draw) assigns seats in one batched pass
+-- in a random order derived from the stored seed.
+
+CREATE TABLE IF NOT EXISTS public.registration_lotteries (
+  id SERIAL PRIMARY KEY,
+  class_id INTEGER REFERENCES public.classes(id) ON DELETE CASCADE,
+  semester TEXT,
+  opens_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  closes_at TIMESTAMPTZ NOT NULL,
+  status TEXT NOT NULL DEFAULT 'open' CHECK (status IN ('open', 'drawn')),
+  seed BIGINT NOT NULL,
+  created_by UUID,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  drawn_at TIMESTAMPTZ,
+  CHECK (class_id IS NOT NULL OR semester IS NOT NULL)
+);
+
+CREATE INDEX IF NOT EXISTS idx_registration_lotteries_open_class
+  ON public.registration_lotteries (class_id) WHERE status = 'open';
+
+CREATE INDEX IF NOT EXISTS idx_registration_lotteries_open_semester
+  ON public.registration_lotteries (semester) WHERE status = 'open';
+
+CREATE TABLE IF NOT EXISTS public.lottery_entries (
+  lottery_id INTEGER NOT NULL REFERENCES public.registration_lotteries(id) ON DELETE CASCADE,
+  class_id INTEGER NOT NULL REFERENCES public.classes(id) ON DELETE CASCADE,
+  mentee_id UUID NOT NULL REFERENCES public."user"(id) ON DELETE CASCADE,
+  entered_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  result TEXT,
+  PRIMARY KEY (lottery_id, class_id, mentee_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_lottery_entries_mentee
+  ON public.lottery_entries (mentee_id, lottery_id);
+
+
+-- mentee_schedule
+-- Denormalized copy of every session a mentee attends (sessions x classes x
+-- subjects x tutor x class_registrations), one row per (mentee, session).
+-- Kept current by the triggers below so /sessions/mentee/all reads a single
+-- index range instead of a five-way join.
+
+CREATE TABLE IF NOT EXISTS public.mentee_schedule (
+  mentee_id UUID NOT NULL,
+  class_id INTEGER NOT NULL,
+  session_id INTEGER NOT NULL,
+  session_date DATE,
+  session_status TEXT,
+  location TEXT,
+  start_time INTEGER,
+  end_time INTEGER,
+  week_day TEXT,
+  created_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ,
+  semester TEXT,
+  class_status TEXT,
+  subject_name TEXT,
+  subject_code TEXT,
+  tutor_name TEXT,
+  tutor_email TEXT,
+  projected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (mentee_id, class_id, session_id)
+);
+
+-- When the row was last written by refresh_mentee_schedule; the .ics feed's ETag
+-- hashes it, so renames and re-registrations change the stamp
+ALTER TABLE public.mentee_schedule
+  ADD COLUMN IF NOT EXISTS projected_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_mentee_schedule_date
+  ON public.mentee_schedule (mentee_id, session_date, start_time);
+
+-- Upsert the projection rows of one class, optionally narrowed to a mentee or a session
+CREATE OR REPLACE FUNCTION public.refresh_mentee_schedule(
+  p_class_id INTEGER,
+  p_mentee_id UUID DEFAULT NULL,
+  p_session_id INTEGER DEFAULT NULL
+) RETURNS VOID
+LANGUAGE sql AS $$
+  INSERT INTO public.mentee_schedule (
+    mentee_id, class_id, session_id, session_date, session_status, location,
+    start_time, end_time, week_day, created_at, updated_at,
+    semester, class_status, subject_name, subject_code, tutor_name, tutor_email
+  )
+  SELECT
+    cr.mentee_id,
+    s.class_id,
+    s.session_id,
+    s.session_date,
+    s.session_status::TEXT,
+    s.location,
+    s.start_time,
+    s.end_time,
+    s.week_day::TEXT,
+    s.created_at,
+    s.updated_at,
+    c.semester::TEXT,
+    c.class_status::TEXT,
+    sub.subject_name,
+    sub.subject_code,
+    u.full_name,
+    u.email
+  FROM public.sessions s
+  JOIN public.classes c ON s.class_id = c.id
+  JOIN public.subjects sub ON c.subject_id = sub.id
+  LEFT JOIN public."user" u ON c.tutor_id = u.id
+  JOIN public.class_registrations cr ON c.id = cr.class_id
+  WHERE s.class_id = p_class_id
+    AND (p_mentee_id IS NULL OR cr.mentee_id = p_mentee_id)
+    AND (p_session_id IS NULL OR s.session_id = p_session_id)
+  ON CONFLICT (mentee_id, class_id, session_id) DO UPDATE SET
+    session_date = EXCLUDED.session_date,
+    session_status = EXCLUDED.session_status,
+    location = EXCLUDED.location,
+    start_time = EXCLUDED.start_time,
+    end_time = EXCLUDED.end_time,
+    week_day = EXCLUDED.week_day,
+    created_at = EXCLUDED.created_at,
+    updated_at = EXCLUDED.updated_at,
+    semester = EXCLUDED.semester,
+    class_status = EXCLUDED.class_status,
+    subject_name = EXCLUDED.subject_name,
+    subject_code = EXCLUDED.subject_code,
+    tutor_name = EXCLUDED.tutor_name,
+    tutor_email = EXCLUDED.tutor_email,
+    projected_at = NOW();
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_registration_schedule()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM public.mentee_schedule
+    WHERE mentee_id = OLD.mentee_id AND class_id = OLD.class_id;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.refresh_mentee_schedule(NEW.class_id, NEW.mentee_id);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_session_schedule()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    DELETE FROM public.mentee_schedule
+    WHERE class_id = OLD.class_id AND session_id = OLD.session_id;
+  ELSE
+    PERFORM public.refresh_mentee_schedule(NEW.class_id, NULL, NEW.session_id);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_class_schedule()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM public.refresh_mentee_schedule(NEW.id);
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_subject_schedule()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM public.refresh_mentee_schedule(c.id)
+  FROM public.classes c WHERE c.subject_id = NEW.id;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_tutor_schedule()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM public.refresh_mentee_schedule(c.id)
+  FROM public.classes c WHERE c.tutor_id = NEW.id;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS sync_registration_schedule ON public.class_registrations;
+CREATE TRIGGER sync_registration_schedule
+  AFTER INSERT OR DELETE OR UPDATE OF class_id, mentee_id ON public.class_registrations
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_registration_schedule();
+
+DROP TRIGGER IF EXISTS sync_session_schedule ON public.sessions;
+CREATE TRIGGER sync_session_schedule
+  AFTER INSERT OR DELETE OR UPDATE ON public.sessions
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_session_schedule();
+
+DROP TRIGGER IF EXISTS sync_class_schedule ON public.classes;
+CREATE TRIGGER sync_class_schedule
+  AFTER UPDATE OF semester, class_status, subject_id, tutor_id ON public.classes
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_class_schedule();
+
+DROP TRIGGER IF EXISTS sync_subject_schedule ON public.subjects;
+CREATE TRIGGER sync_subject_schedule
+  AFTER UPDATE OF subject_name, subject_code ON public.subjects
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_subject_schedule();
+
+DROP TRIGGER IF EXISTS sync_tutor_schedule ON public."user";
+CREATE TRIGGER sync_tutor_schedule
+  AFTER UPDATE OF full_name, email ON public."user"
+  FOR EACH ROW
+  EXECUTE FUNCTION public.sync_tutor_schedule();
+
+-- Backfill
+SELECT public.refresh_mentee_schedule(c.id) FROM public.classes c;
+
+
+-- Indexes for windowed / keyset session listings
+-- (session_date, class_id, session_id) is the keyset order of /sessions/*/all
+CREATE INDEX IF NOT EXISTS idx_mentee_schedule_keyset
+  ON public.mentee_schedule (mentee_id, session_date, class_id, session_id);
+
+CREATE INDEX IF NOT EXISTS idx_classes_tutor
+  ON public.classes (tutor_id);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_class_date
+  ON public.sessions (class_id, session_date, session_id);
+
+
+-- Change notifications for GET /events/stream (Server-Sent Events)
+-- Each trigger publishes a small JSON payload on the schedule_events channel;
+-- db/events.py LISTENs and fans events out to subscribers by class or user.
+
+CREATE OR REPLACE FUNCTION public.notify_session_event()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  r RECORD;
+BEGIN
+  IF TG_OP = 'DELETE' THEN r := OLD; ELSE r := NEW; END IF;
+  PERFORM pg_notify('schedule_events', json_build_object(
+    'type', CASE TG_OP WHEN 'INSERT' THEN 'session_created' WHEN 'DELETE' THEN 'session_deleted' ELSE 'session_updated' END,
+    'class_id', r.class_id,
+    'session_id', r.session_id,
+    'session_status', r.session_status,
+    'session_date', r.session_date,
+    'location', r.location
+  )::TEXT);
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.notify_class_event()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM pg_notify('schedule_events', json_build_object(
+    'type', 'class_updated',
+    'class_id', NEW.id,
+    'class_status', NEW.class_status,
+    'current_enrolled', NEW.current_enrolled,
+    'capacity', NEW.capacity
+  )::TEXT);
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.notify_registration_event()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM pg_notify('schedule_events', json_build_object(
+      'type', 'registration_changed', 'op', 'DELETE', 'class_id', OLD.class_id, 'mentee_id', OLD.mentee_id
+    )::TEXT);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM pg_notify('schedule_events', json_build_object(
+      'type', 'registration_changed', 'op', 'INSERT', 'class_id', NEW.class_id, 'mentee_id', NEW.mentee_id
+    )::TEXT);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS notify_session_event ON public.sessions;
+CREATE TRIGGER notify_session_event
+  AFTER INSERT OR DELETE OR UPDATE OF session_status, session_date, location, start_time, end_time ON public.sessions
+  FOR EACH ROW
+  EXECUTE FUNCTION public.notify_session_event();
+
+DROP TRIGGER IF EXISTS notify_class_event ON public.classes;
+CREATE TRIGGER notify_class_event
+  AFTER UPDATE OF current_enrolled, capacity, class_status ON public.classes
+  FOR EACH ROW
+  EXECUTE FUNCTION public.notify_class_event();
+
+DROP TRIGGER IF EXISTS notify_registration_event ON public.class_registrations;
+CREATE TRIGGER notify_registration_event
+  AFTER INSERT OR DELETE OR UPDATE OF class_id, mentee_id ON public.class_registrations
+  FOR EACH ROW
+  EXECUTE FUNCTION public.notify_registration_event();
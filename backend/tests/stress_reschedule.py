@@ -0,0 +1,184 @@
+"""
+Concurrency stress check for reschedule_registration() (opt-in, writes data).
+
+    cd backend
+    STRESS_DATABASE_URL=postgresql://... python -m tests.stress_reschedule --class-a 12 --class-b 13
+
+Takes two classes of the same subject on a staging database. Every round, each
+mentee registered in either class is rescheduled to the other one, all at once,
+so reschedules in both directions race for the same two class rows. After every
+round it checks that:
+- no call failed with a deadlock, a lock timeout or any other exception
+- current_enrolled == COUNT(class_registrations) and <= capacity for both classes
+- every tracked mentee holds exactly one of the two classes
+Mentees are moved back to their original class at the end. Waitlists of the two
+classes are promoted as usual, so promoted mentees stay registered.
+
+Refuses to run without STRESS_DATABASE_URL or when it equals DATABASE_URL.
+Exit code 0 when every round passed, 1 otherwise.
+"""
+from typing import Dict, Any, List
+from collections import Counter
+import argparse
+import asyncio
+import os
+import sys
+
+from db.config import settings
+from db.database import db
+from models.registrationModel import RegistrationModel
+
+
+async def snapshot(class_ids: List[int], mentee_ids: List[Any]) -> Dict[str, Any]:
+    classes = await db.execute_query(
+        """
+        SELECT c.id, c.capacity, c.current_enrolled, COUNT(cr.mentee_id) AS registered
+        FROM classes c
+        LEFT JOIN class_registrations cr ON cr.class_id = c.id
+        WHERE c.id = ANY($1::int[])
+        GROUP BY c.id
+        ORDER BY c.id
+        """,
+        class_ids
+    )
+    holdings = await db.execute_query(
+        """
+        SELECT mentee_id, array_agg(class_id) AS class_ids
+        FROM class_registrations
+        WHERE class_id = ANY($1::int[]) AND mentee_id = ANY($2::uuid[])
+        GROUP BY mentee_id
+        """,
+        class_ids,
+        mentee_ids
+    )
+    return {
+        "classes": classes,
+        "holdings": {row["mentee_id"]: row["class_ids"] for row in holdings}
+    }
+
+
+def violations(state: Dict[str, Any], mentee_ids: List[Any]) -> List[str]:
+    problems = []
+    for row in state["classes"]:
+        if row["current_enrolled"] != row["registered"]:
+            problems.append(
+                f"class {row['id']}: current_enrolled={row['current_enrolled']} "
+                f"but {row['registered']} registrations"
+            )
+        if row["current_enrolled"] > row["capacity"]:
+            problems.append(f"class {row['id']}: {row['current_enrolled']} enrolled over capacity {row['capacity']}")
+    for mentee_id in mentee_ids:
+        held = state["holdings"].get(mentee_id, [])
+        if len(held) != 1:
+            problems.append(f"mentee {mentee_id}: holds {sorted(held)}")
+    return problems
+
+
+async def run_round(state: Dict[str, Any], class_a: int, class_b: int, timeout: float) -> Counter:
+    moves = []
+    for mentee_id, held in state["holdings"].items():
+        old_class_id = held[0]
+        new_class_id = class_b if old_class_id == class_a else class_a
+        moves.append(RegistrationModel.reschedule_class(old_class_id, new_class_id, str(mentee_id)))
+
+    results = await asyncio.wait_for(asyncio.gather(*moves, return_exceptions=True), timeout)
+    outcome: Counter = Counter()
+    for result in results:
+        if isinstance(result, BaseException):
+            outcome[f"EXCEPTION {type(result).__name__}: {result}"] += 1
+        elif result["success"]:
+            outcome["rescheduled"] += 1
+        else:
+            outcome[result["error"]] += 1
+    return outcome
+
+
+async def main(args: argparse.Namespace) -> int:
+    url = os.environ.get("STRESS_DATABASE_URL")
+    if not url:
+        print("❌ Set STRESS_DATABASE_URL to a staging database (this script writes registrations)")
+        return 1
+    if url == settings.DATABASE_URL:
+        print("❌ STRESS_DATABASE_URL must not be the application's DATABASE_URL")
+        return 1
+
+    settings.DATABASE_URL = url
+    settings.DB_POOL_MAX_SIZE = args.concurrency
+    settings.DB_POOL_MIN_SIZE = min(settings.DB_POOL_MIN_SIZE, args.concurrency)
+    await db.initialize()
+    class_ids = sorted([args.class_a, args.class_b])
+    failed = False
+    try:
+        registered = await db.execute_query(
+            "SELECT mentee_id, class_id FROM class_registrations WHERE class_id = ANY($1::int[])",
+            class_ids
+        )
+        original = {row["mentee_id"]: row["class_id"] for row in registered}
+        mentee_ids = list(original.keys())
+        if not mentee_ids:
+            print("❌ Neither class has registrations to move")
+            return 1
+        print(f"🔄 {len(mentee_ids)} mentees, classes {class_ids}, {args.rounds} rounds")
+
+        state = await snapshot(class_ids, mentee_ids)
+        problems = violations(state, mentee_ids)
+        if problems:
+            print("❌ Invariants already broken before the run:")
+            for problem in problems:
+                print(f"   - {problem}")
+            return 1
+
+        for round_no in range(1, args.rounds + 1):
+            try:
+                outcome = await run_round(state, args.class_a, args.class_b, args.timeout)
+            except asyncio.TimeoutError:
+                print(f"❌ Round {round_no}: reschedules still running after {args.timeout}s (lock wait?)")
+                failed = True
+                break
+            state = await snapshot(class_ids, mentee_ids)
+            problems = violations(state, mentee_ids)
+            problems += [f"{count} x {name}" for name, count in outcome.items() if name.startswith("EXCEPTION")]
+            summary = ", ".join(f"{name}: {count}" for name, count in outcome.most_common())
+            if problems:
+                failed = True
+                print(f"❌ Round {round_no} ({summary})")
+                for problem in problems:
+                    print(f"   - {problem}")
+            else:
+                print(f"✅ Round {round_no} ({summary})")
+
+        # Put everyone back where they started; with both classes nearly full a move
+        # only fits after one in the other direction, so retry until nothing moves
+        pending = {
+            mentee_id: held[0]
+            for mentee_id, held in (await snapshot(class_ids, mentee_ids))["holdings"].items()
+            if held and held[0] != original[mentee_id]
+        }
+        errors: Dict[Any, str] = {}
+        progress = True
+        while pending and progress:
+            progress = False
+            for mentee_id, current in list(pending.items()):
+                result = await RegistrationModel.reschedule_class(current, original[mentee_id], str(mentee_id))
+                if result["success"]:
+                    del pending[mentee_id]
+                    progress = True
+                else:
+                    errors[mentee_id] = result["error"]
+        for mentee_id, current in pending.items():
+            print(f"⚠️ mentee {mentee_id} left in class {current}: {errors[mentee_id]}")
+    finally:
+        await db.close()
+
+    print("❌ Stress run failed" if failed else "✅ Stress run passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent reschedule stress check")
+    parser.add_argument("--class-a", type=int, required=True)
+    parser.add_argument("--class-b", type=int, required=True)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20, help="pool size, i.e. reschedules in flight")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds a round may take")
+    sys.exit(asyncio.run(main(parser.parse_args())))